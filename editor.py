@@ -1,3 +1,12 @@
+import bisect
+import hashlib
+import marshal
+import os
+import queue
+import re
+import threading
+
+
 class Editor:
     """
     Initial selection is at 0:
@@ -22,43 +31,276 @@ class Editor:
             else:
                 parse = json_parse
                 pretty = json_pretty
-            return cls(f.read(), parse, pretty, path=path)
+            return cls(
+                f.read(), parse, pretty, path=path, parse_cache=ParseCache.default()
+            )
 
-    def __init__(self, text, parse, pretty, path=None):
-        self.text = ""
+    def __init__(self, text, parse, pretty, path=None, parse_cache=None):
+        self.text = Rope()
+        self.tree = None
+        self.lines = None
+        self.line_starts = None
+        self.overlay = Overlay()
         self.selection = Range(0, 0)
         self.parse = parse
         self.pretty = pretty
         self.path = path
-        self.update_text(text)
+        self.worker = None
+        self.generation = 0
+        self.parsed_generation = 0
+        self.submitted_generation = 0
+        self.pending_edit = None
+        self.reformat_delay = None
+        self.compact_size = 1000000
+        self.load_text(text, parse_cache)
         self.selection = Range(0, 0)
 
+    def load_text(self, text, parse_cache):
+        """
+        With a parse cache, text that has been loaded before is not parsed
+        and pretty printed again:
+
+        >>> import tempfile
+        >>> directory = tempfile.TemporaryDirectory()
+        >>> cache = ParseCache(directory.name, version="test")
+        >>> editor = Editor("[1,2]", json_parse, json_pretty, parse_cache=cache)
+        >>> print(editor.text, end="")
+        [
+            1,
+            2
+        ]
+
+        An entry that json_pretty would not produce shows that the cache is
+        used:
+
+        >>> cache.store("json_parse", "[1,2]", "[1, 2]", json_parse("[1, 2]"))
+        >>> editor = Editor("[1,2]", json_parse, json_pretty, parse_cache=cache)
+        >>> print(editor.text)
+        [1, 2]
+        >>> editor.select(Range(4))
+        >>> editor.get_path()
+        ['Document', 'List', 'Number']
+        >>> directory.cleanup()
+        """
+        if parse_cache is not None:
+            cached = parse_cache.load(self.parse.__name__, text)
+            if cached is not None:
+                pretty_text, tree = cached
+                self.replace_text(0, len(self.text), pretty_text)
+                self.set_tree(tree)
+                return
+        self.update_text(text)
+        if parse_cache is not None and self.tree is not None:
+            parse_cache.store(self.parse.__name__, text, str(self.text), self.tree)
+
     def save(self):
         if self.path is not None:
             with open(self.path, "w") as f:
-                f.write(self.text)
+                f.write(str(self.text))
 
     def delete_whole_or_before(self):
         if self.selection.size == 0:
-            self.selection.extend_left(1)
+            self.selection = Range(max(0, self.selection.start - 1), self.selection.end)
         self.update_text("")
 
     def delete_whole_or_after(self):
         if self.selection.size == 0:
-            self.selection.extend_right(1)
+            self.selection = Range(
+                self.selection.start, min(len(self.text), self.selection.end + 1)
+            )
         self.update_text("")
 
     def update_text(self, text):
-        self.text = (
-            self.text[: self.selection.start] + text + self.text[self.selection.end :]
-        )
+        """
+        Only the edited part is parsed again, and if pretty printing changes
+        the text, only the part that changed is parsed again:
+
+        >>> editor = Editor.from_text('[1, "hello"]', json_parse, json_pretty)
+        >>> document = editor.tree
+        >>> list_node = editor.tree.children[0]
+        >>> editor.select(Range(19))
+        >>> editor.update_text("o")
+        >>> print(editor.text, end="")
+        [
+            1,
+            "helloo"
+        ]
+        >>> editor.tree.children[0] is list_node
+        True
+        >>> editor.tree.children[0].children[1].value
+        'helloo'
+
+        >>> editor.select(Range(7))
+        >>> editor.update_text(", 2")
+        >>> print(editor.text, end="")
+        [
+            1,
+            2,
+            "helloo"
+        ]
+        >>> editor.tree is document
+        True
+
+        With a worker, the text is updated right away and shown unparsed
+        until the result from the worker is handed back. The worker parses
+        again only what changed since the text it last parsed:
+
+        >>> results = []
+        >>> worker = ParseWorker(deliver=lambda *result: results.append(result))
+        >>> editor.parse_in_background(worker)
+        >>> editor.select(Range(14))
+        >>> editor.update_text("3")
+        >>> editor.update_text("4")
+        >>> [token[0] for token in editor.raw_tokens]
+        ['Unknown']
+        >>> worker.wait()
+        >>> for result in results:
+        ...     editor.set_parse_result(*result)
+        >>> print(editor.text, end="")
+        [
+            1,
+            234,
+            "helloo"
+        ]
+        >>> [token[0] for token in editor.raw_tokens][:3]
+        ['List', 'Number', 'List']
+
+        Results for text that has been edited since are ignored:
+
+        >>> editor.set_parse_result(editor.generation - 1, "[]", None)
+        >>> editor.tree is None
+        False
+
+        With a reformat delay, edits only patch the text until reformat is
+        called, and then all of them are parsed and pretty printed at once:
+
+        >>> editor = Editor.from_text('[1, "hello"]', json_parse, json_pretty)
+        >>> editor.reformat_delay = 0.3
+        >>> editor.select(Range(7))
+        >>> for char in ",2,3":
+        ...     editor.update_text(char)
+        >>> print(editor.text, end="")
+        [
+            1,2,3,
+            "hello"
+        ]
+        >>> editor.reformat()
+        >>> print(editor.text, end="")
+        [
+            1,
+            2,
+            3,
+            "hello"
+        ]
+        """
+        if self.pending_edit is not None:
+            self.pending_edit = self.pending_edit.then(self.selection, len(text))
+        elif self.tree is not None and self.parsed_generation == self.generation:
+            self.pending_edit = Edit(self.tree, self.selection, len(text))
+        self.replace_text(self.selection.start, self.selection.end, text)
         self.selection = Range(self.selection.start + len(text))
+        self.generation += 1
+        if self.reformat_delay is None:
+            self.reformat()
+        else:
+            self.set_tree(None)
+
+    def reformat(self, wait=False):
+        """
+        Parse and pretty print the text if it has been edited since it was
+        last parsed. With a worker, the text is handed to the worker unless
+        wait is true.
+        """
+        if self.parsed_generation == self.generation:
+            return
+        if self.worker is not None and not wait:
+            self.pending_edit = None
+            self.set_tree(None)
+            if self.submitted_generation != self.generation:
+                self.submitted_generation = self.generation
+                self.worker.submit(
+                    self.generation, str(self.text), self.parse, self.pretty
+                )
+            return
+        edit = self.pending_edit
+        self.pending_edit = None
+        self.parsed_generation = self.generation
         try:
-            self.text = self.pretty(self.parse(self.text))
+            tree = self.parse(self.text, edit)
+            pretty_text = self.pretty(tree)
         except SystemExit:
-            self.raw_tokens = Node("Unknown", 0, len(self.text), None).tokenize()
+            self.set_tree(None)
         else:
-            self.raw_tokens = self.parse(self.text).tokenize()
+            edit = Edit.between(tree, self.text, pretty_text)
+            if edit.range.size > 0 or edit.length > 0:
+                start = edit.range.start
+                self.replace_text(
+                    start, edit.range.end, pretty_text[start : start + edit.length]
+                )
+                tree = self.parse(self.text, edit)
+            self.set_tree(tree)
+
+    def set_tree(self, tree):
+        """
+        Trees for texts of at least compact_size characters are kept as a
+        CompactTree. Edits parse again only the node around them, and the
+        new nodes are spliced into the arrays:
+
+        >>> editor = Editor.from_text('[1, [2]]', json_parse, json_pretty)
+        >>> editor.compact_size = 0
+        >>> editor.select(Range(24))
+        >>> editor.update_text("3")
+        >>> editor.select(Range(23))
+        >>> editor.get_path(), type(editor.tree).__name__
+        (['Document', 'List', 'List', 'Number'], 'CompactNode')
+        >>> editor.select(Range(6))
+        >>> editor.select_next_node()
+        >>> print(editor.text_with_selection_markers, end="")
+        [
+            1,
+            <[
+                23
+            ]>
+        ]
+        >>> compact_tree = editor.tree.tree
+        >>> editor.select(Range(25))
+        >>> editor.update_text("4")
+        >>> editor.tree.tree is compact_tree
+        True
+        >>> editor.tree.as_list()[2]
+        ['List', '', ['Number', 1], ['List', '', ['Number', 234]]]
+        """
+        if isinstance(tree, Node) and len(self.text) >= self.compact_size:
+            tree = CompactTree.from_node(tree).get_root()
+        elif isinstance(tree, CompactNode) and len(self.text) < self.compact_size:
+            tree = tree.tree.to_node()
+        self.tree = tree
+        if tree is None:
+            tree = Node("Unknown", 0, len(self.text), None)
+        self.tokenized_tree = tree
+        self.token_index = TokenIndex(tree)
+        self.lines = None
+
+    def parse_in_background(self, worker):
+        self.worker = worker
+
+    def set_parse_result(self, generation, text, tree):
+        """
+        Use a result from the worker if the text has not been edited since
+        it was handed to the worker.
+        """
+        if generation != self.generation or generation == self.parsed_generation:
+            return
+        self.parsed_generation = generation
+        edit = Edit.between(None, self.text, text)
+        if edit.range.size > 0 or edit.length > 0:
+            start = edit.range.start
+            self.replace_text(start, edit.range.end, text[start : start + edit.length])
+            self.selection = Range(
+                min(self.selection.start, len(self.text)),
+                min(self.selection.end, len(self.text)),
+            )
+        self.set_tree(tree)
 
     def selection_expand(self):
         """
@@ -155,7 +397,21 @@ class Editor:
           r = .:x
         }
         >
+
+        Pending edits are parsed first:
+
+        >>> editor = Editor.from_text('[1, 2]', json_parse, json_pretty)
+        >>> editor.reformat_delay = 0.3
+        >>> editor.select(Range(13))
+        >>> editor.update_text("3")
+        >>> editor.selection_expand()
+        >>> print(editor.text_with_selection_markers, end="")
+        [
+            1,
+            <32>
+        ]
         """
+        self.reformat(wait=True)
         node = self.get_selected_node()
         if node.range.is_same(self.selection) and node.parent:
             self.selection = node.parent.range
@@ -163,38 +419,43 @@ class Editor:
             self.selection = node.range
 
     def selection_contract(self):
+        self.reformat(wait=True)
         node = self.get_selected_node()
         xxx = node.range
-        while node.get_first_child() is not node:
+        while node.get_first_child() != node:
             node = node.get_first_child()
             if not node.range.is_same(xxx):
                 break
         self.selection = node.range
 
     def select_next_node(self):
+        self.reformat(wait=True)
         self.selection = self.get_selected_node().get_next_sibling().range
 
     def select_previous_node(self):
+        self.reformat(wait=True)
         self.selection = self.get_selected_node().get_previous_sibling().range
 
     def get_selected_node(self):
-        for line in self.get_lines():
-            for token in line:
-                if token.range.contains(self.selection.start):
-                    return self.get_outermost_node(token.node)
-        raise ValueError("Could not find node with selection.")
+        node = self.token_index.get_node_at(self.selection.start)
+        if node is None:
+            raise ValueError("Could not find node with selection.")
+        return self.get_outermost_node(node)
 
     def get_outermost_node(self, node):
-        if node.parent and node.parent.range.overlap(self.selection).is_same(
+        while node.parent and node.parent.range.overlap(self.selection).is_same(
             node.parent.range
         ):
-            return self.get_outermost_node(node.parent)
-        else:
-            return node
+            node = node.parent
+        return node
 
     def select(self, range_):
         self.selection = range_
 
+    @property
+    def raw_tokens(self):
+        return list(self.tokenized_tree.tokenize())
+
     @property
     def text_with_selection_markers(self):
         return "".join(
@@ -259,9 +520,92 @@ class Editor:
           Token Invisible '\\\\n' Range(9, 10)
         Line 4
           Token Invisible 'EOF' Range(10, 10)
+
+        Lines are only built again when the text changes. The selection is
+        looked up when tokens are drawn:
+
+        >>> lines = editor.get_lines()
+        >>> [token.cursor for token in lines[1]]
+        [None, None, None]
+        >>> editor.select(Range(6))
+        >>> editor.get_lines() is lines
+        True
+        >>> [token.cursor for token in lines[1]]
+        [None, 0, None]
+        """
+        self.overlay.selection = self.selection
+        if self.lines is None:
+            self.lines = self.build_lines()
+        return self.lines
+
+    def get_visible_lines(self, first, last):
+        """
+        Lines from index first up to last, built only from the tokens in
+        them, for drawing part of a large document:
+
+        >>> editor = Editor.from_text("[1, 2]", json_parse, json_pretty)
+        >>> for line in editor.get_visible_lines(2, 10):
+        ...     print(line.number, [token.text for token in line])
+        3 ['    ', '2', '\\\\n']
+        4 [']', '\\\\n']
+        5 ['EOF']
+        """
+        self.overlay.selection = self.selection
+        line_starts = self.get_line_starts()
+        if first >= min(last, len(line_starts)):
+            return []
+        if last < len(line_starts):
+            end = line_starts[last]
+        else:
+            end = len(self.text)
+        lines = self.build_lines(Range(line_starts[first], end), first + 1)
+        return lines[: last - first]
+
+    def get_line_count(self):
+        return len(self.get_line_starts())
+
+    def get_line_index(self, position):
         """
-        lines = Lines()
-        for name, start, end, node in self.raw_tokens:
+        >>> editor = Editor.from_text("[1]", json_parse, json_pretty)
+        >>> [editor.get_line_index(position) for position in [0, 1, 2, 9, 10]]
+        [0, 0, 1, 2, 3]
+        """
+        return max(0, bisect.bisect_right(self.get_line_starts(), position) - 1)
+
+    def replace_text(self, start, end, text):
+        """
+        Replace part of the text. Line starts after the replaced part are
+        shifted and only the new text is scanned for line breaks:
+
+        >>> editor = Editor.from_text("[1, 2]", json_parse, json_pretty)
+        >>> editor.get_line_starts()
+        [0, 2, 9, 15, 17]
+        >>> editor.replace_text(2, 9, "")
+        >>> editor.get_line_starts()
+        [0, 2, 8, 10]
+        >>> editor.replace_text(3, 3, "\\n\\n")
+        >>> editor.get_line_starts()
+        [0, 2, 4, 5, 10, 12]
+        """
+        self.text.replace(start, end, text)
+        if self.line_starts is not None:
+            first = bisect.bisect_right(self.line_starts, start)
+            last = bisect.bisect_right(self.line_starts, end)
+            shift = len(text) - (end - start)
+            self.line_starts[first:] = [
+                start + match.end() for match in re.finditer("\n", text)
+            ] + [line_start + shift for line_start in self.line_starts[last:]]
+
+    def get_line_starts(self):
+        if self.line_starts is None:
+            self.line_starts = [0] + [
+                match.end() for match in re.finditer("\n", str(self.text))
+            ]
+        return self.line_starts
+
+    def build_lines(self, window=None, number=1):
+        lines = Lines(number)
+        for name, start, end, node in self.tokenized_tree.tokenize(window):
             text = self.text[start:end]
             pos = start
             for index, sub_part in enumerate(text.split("\n")):
@@ -271,7 +615,7 @@ class Editor:
                             name="Invisible",
                             text="\\n",
                             range_=Range(pos, pos + 1),
-                            selection=self.selection,
+                            overlay=self.overlay,
                             node=node,
                         )
                     )
@@ -284,38 +628,441 @@ class Editor:
                             name=name,
                             text=sub_part,
                             range_=range_,
-                            selection=self.selection,
+                            overlay=self.overlay,
                             node=node,
                         )
                     )
                     pos += range_.size
-        lines.add_token(
-            Token(
-                name="Invisible",
-                text="EOF",
-                range_=Range(end),
-                selection=self.selection,
-                node=node,
+        if window is None or window.end == len(self.text):
+            lines.add_token(
+                Token(
+                    name="Invisible",
+                    text="EOF",
+                    range_=Range(len(self.text)),
+                    overlay=self.overlay,
+                    node=self.token_index.get_node_at(len(self.text)),
+                )
             )
-        )
         return list(lines.get())
 
 
+class ParseWorker:
+    """
+    Parses and pretty prints on a background thread. Only the latest request
+    is worked on if several are waiting. Results are passed to deliver from
+    the worker thread, so deliver must hand them over to the thread that owns
+    the editor.
+
+    The worker keeps its own tree for the last text it parsed, so that only
+    the part of a new text that differs is parsed again. For texts of at
+    least compact_size characters that tree is a CompactTree. Delivered
+    trees are CompactTree copies that the editor can change without
+    affecting the worker:
+
+    >>> results = []
+    >>> worker = ParseWorker(deliver=lambda *result: results.append(result))
+    >>> worker.submit(1, "[1, [2]]", json_parse, json_pretty)
+    >>> worker.wait()
+    >>> list_node = worker.tree.children[0]
+    >>> text = results[-1][1].replace("2", "23")
+    >>> worker.submit(2, text, json_parse, json_pretty)
+    >>> worker.wait()
+    >>> worker.tree.children[0] is list_node
+    True
+    >>> print(results[-1][1], end="")
+    [
+        1,
+        [
+            23
+        ]
+    ]
+
+    A parse that fails in any way is delivered as a failed result, and the
+    worker keeps going:
+
+    >>> def broken_parse(text, edit=None):
+    ...     raise RecursionError()
+    >>> results = []
+    >>> worker = ParseWorker(deliver=lambda *result: results.append(result))
+    >>> worker.submit(1, "[1]", broken_parse, json_pretty)
+    >>> worker.wait()
+    >>> worker.submit(2, "[2]", json_parse, json_pretty)
+    >>> worker.wait()
+    >>> [(generation, tree is None) for generation, text, tree in results]
+    [(1, True), (2, False)]
+    """
+
+    def __init__(self, deliver, compact_size=1000000):
+        self.deliver = deliver
+        self.compact_size = compact_size
+        self.tree = None
+        self.tree_text = None
+        self.tree_parse = None
+        self.requests = queue.Queue()
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+
+    def submit(self, generation, text, parse, pretty):
+        self.requests.put((generation, text, parse, pretty))
+
+    def wait(self):
+        self.requests.join()
+
+    def run(self):
+        while True:
+            request = self.requests.get()
+            while not self.requests.empty():
+                self.requests.task_done()
+                request = self.requests.get()
+            generation, text, parse, pretty = request
+            try:
+                tree = self.parse(text, parse)
+                pretty_text = pretty(tree)
+                if pretty_text != text:
+                    tree = self.parse(pretty_text, parse)
+            except (SystemExit, Exception):
+                self.deliver(generation, text, None)
+            else:
+                if isinstance(tree, CompactNode):
+                    tree = tree.tree.copy()
+                else:
+                    tree = CompactTree.from_node(tree)
+                self.deliver(generation, pretty_text, tree.get_root())
+            finally:
+                self.requests.task_done()
+
+    def parse(self, text, parse):
+        """
+        Parse text, only again where it differs from the text of the kept
+        tree. A failed parse leaves the kept tree as it was, but anything
+        unexpected might have left it half changed, so it is dropped.
+        """
+        edit = None
+        if self.tree is not None and self.tree_parse is parse:
+            edit = Edit.between(self.tree, self.tree_text, text)
+        try:
+            tree = parse(text, edit)
+        except Exception:
+            self.tree = None
+            raise
+        if isinstance(tree, Node) and len(text) >= self.compact_size:
+            tree = CompactTree.from_node(tree).get_root()
+        self.tree, self.tree_text, self.tree_parse = tree, text, parse
+        return tree
+
+
+class ParseCache:
+    """
+    Parse results stored in files named by a hash of the parsed text, the
+    language, and the version of the program. The version is a hash of the
+    program file by default, so compiling a changed grammar into the
+    program makes old results unused:
+
+    >>> import tempfile
+    >>> directory = tempfile.TemporaryDirectory()
+    >>> cache = ParseCache(directory.name, version="1")
+    >>> cache.load("json_parse", "[1]") is None
+    True
+    >>> cache.store("json_parse", "[1]", "[1]", json_parse("[1]"))
+    >>> text, tree = cache.load("json_parse", "[1]")
+    >>> text, tree.as_list()
+    ('[1]', ['Document', '', ['List', '', ['Number', 1]]])
+    >>> ParseCache(cache.directory, version="2").load("json_parse", "[1]") is None
+    True
+
+    When the entries take more than max_size bytes, the least recently used
+    ones are removed:
+
+    >>> path = cache.get_path("json_parse", "[1]")
+    >>> cache.max_size = 2 * os.path.getsize(path)
+    >>> os.utime(path, (0, 0))
+    >>> for text in ["[2]", "[3]"]:
+    ...     cache.store("json_parse", text, text, json_parse(text))
+    >>> [cache.load("json_parse", text) is None for text in ["[1]", "[2]", "[3]"]]
+    [True, False, False]
+    >>> directory.cleanup()
+    """
+
+    @classmethod
+    def default(cls):
+        directory = os.path.join(
+            os.environ.get("XDG_CACHE_HOME") or os.path.expanduser("~/.cache"),
+            "rleditor",
+        )
+        with open(__file__, "rb") as f:
+            version = hashlib.sha256(f.read()).hexdigest()
+        return cls(directory, version)
+
+    def __init__(self, directory, version, max_size=256 * 1024 * 1024):
+        self.directory = directory
+        self.version = version
+        self.max_size = max_size
+
+    def get_path(self, language, text):
+        key = hashlib.sha256(
+            "\0".join([self.version, language, text]).encode("utf-8")
+        ).hexdigest()
+        return os.path.join(self.directory, key)
+
+    def load(self, language, text):
+        """
+        Return the pretty printed text and its tree as a CompactNode, or None
+        if there is no usable entry.
+        """
+        path = self.get_path(language, text)
+        try:
+            with open(path, "rb") as f:
+                pretty_text, tree_bytes = marshal.load(f)
+            tree = CompactTree.from_bytes(tree_bytes).get_root()
+        except (OSError, EOFError, ValueError, TypeError):
+            return None
+        try:
+            os.utime(path)
+        except OSError:
+            pass
+        return pretty_text, tree
+
+    def store(self, language, text, pretty_text, tree):
+        """
+        Entries are written to a temporary file first, so that a reader never
+        sees half an entry. The cache only saves time, so failures to write
+        are ignored.
+        """
+        if isinstance(tree, Node):
+            tree = CompactTree.from_node(tree)
+        else:
+            tree = tree.tree
+        path = self.get_path(language, text)
+        temporary_path = f"{path}.{os.getpid()}.{threading.get_ident()}"
+        try:
+            data = marshal.dumps((pretty_text, tree.to_bytes()))
+            os.makedirs(self.directory, exist_ok=True)
+            with open(temporary_path, "wb") as f:
+                f.write(data)
+            os.replace(temporary_path, path)
+        except (OSError, ValueError):
+            return
+        self.evict()
+
+    def evict(self):
+        """
+        Remove entries, least recently used first, until they take at most
+        max_size bytes. Loading an entry marks it as used.
+        """
+        try:
+            with os.scandir(self.directory) as items:
+                entries = [
+                    (item.stat().st_mtime, item.stat().st_size, item.path)
+                    for item in items
+                ]
+        except OSError:
+            return
+        size = sum(entry_size for _, entry_size, _ in entries)
+        for _, entry_size, path in sorted(entries):
+            if size <= self.max_size:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            size -= entry_size
+
+
+class TokenIndex:
+    """
+    Finds nodes by position in a Node or CompactNode tree with a binary
+    search, and tokenizes only the window asked for, so that nothing is
+    built for every part of the document:
+
+    >>> index = TokenIndex(json_parse("[1, [2]]"))
+    >>> index.get_node_at(5).name
+    'Number'
+    >>> index.get_node_at(8).name
+    'List'
+    >>> index.get_node_at(9) is None
+    True
+    >>> [node.name for node in index.get_nodes_overlapping(Range(3, 6))]
+    ['Document', 'List', 'List', 'Number']
+
+    >>> index = TokenIndex(CompactTree.from_node(json_parse("[1, [2]]")).get_root())
+    >>> [node.name for node in index.get_nodes_overlapping(Range(3, 6))]
+    ['Document', 'List', 'List', 'Number']
+    """
+
+    def __init__(self, root):
+        self.root = root
+
+    def get_node_at(self, position):
+        """
+        The node that owns the text at position. The position just after the
+        document belongs to the node that owns its last character.
+        """
+        range_ = self.root.range
+        if position == range_.end and range_.size > 0:
+            position -= 1
+        return self.root.get_node_at(position)
+
+    def get_nodes_overlapping(self, range_):
+        """
+        All nodes that range_ overlaps, parents before children, in document
+        order. An empty range overlaps the node at its position.
+        """
+        if range_.size == 0:
+            node = self.get_node_at(range_.start)
+            owners = [] if node is None else [node]
+        else:
+            owners = [token[3] for token in self.root.tokenize(range_)]
+        nodes = []
+        seen = set()
+        for owner in owners:
+            path = []
+            node = owner
+            while node is not None and node not in seen:
+                seen.add(node)
+                path.append(node)
+                node = node.parent
+            nodes.extend(reversed(path))
+        return nodes
+
+
+class Rope:
+    """
+    Text stored as a list of chunks so that an edit only copies the chunk it
+    touches. Chunk sizes are kept in a Fenwick tree so that finding the chunk
+    for a position, and updating a size, is O(log n).
+
+    >>> rope = Rope("hello world")
+    >>> rope.replace(5, 11, " there")
+    >>> str(rope)
+    'hello there'
+    >>> rope[6:9], rope[0], rope[-1], len(rope)
+    ('the', 'h', 'e', 11)
+
+    >>> rope = Rope("abcdefghij", chunk_size=3)
+    >>> rope.chunks
+    ['abc', 'def', 'ghi', 'j']
+    >>> rope.replace(2, 7, "XY")
+    >>> rope.chunks, rope[1:5]
+    (['abX', 'Yhi', 'j'], 'bXYh')
+    >>> rope.replace(7, 7, "!")
+    >>> rope.chunks
+    ['abX', 'Yhi', 'j!']
+    """
+
+    def __init__(self, text="", chunk_size=4096):
+        self.chunk_size = chunk_size
+        self.set_chunks(self.split(text))
+
+    def split(self, text):
+        return [
+            text[index : index + self.chunk_size]
+            for index in range(0, len(text), self.chunk_size)
+        ]
+
+    def set_chunks(self, chunks):
+        self.chunks = chunks
+        self.length = 0
+        self.sizes = [0] * (len(chunks) + 1)
+        for index, chunk in enumerate(chunks, 1):
+            self.length += len(chunk)
+            self.sizes[index] += len(chunk)
+            parent = index + (index & -index)
+            if parent <= len(chunks):
+                self.sizes[parent] += self.sizes[index]
+        self.cache = (0, 0, "")
+
+    def resize_chunk(self, index, amount):
+        self.length += amount
+        index += 1
+        while index < len(self.sizes):
+            self.sizes[index] += amount
+            index += index & -index
+        self.cache = (0, 0, "")
+
+    def locate(self, position):
+        """
+        Return the index and start position of the chunk that position is in.
+        The end position belongs to the last chunk.
+        """
+        index = 0
+        start = 0
+        step = 1 << len(self.chunks).bit_length()
+        while step:
+            if (
+                index + step < len(self.sizes)
+                and start + self.sizes[index + step] <= position
+            ):
+                index += step
+                start += self.sizes[index]
+            step >>= 1
+        if index == len(self.chunks) and index > 0:
+            index -= 1
+            start -= len(self.chunks[index])
+        return index, start
+
+    def replace(self, start, end, text):
+        if not self.chunks:
+            self.set_chunks(self.split(text))
+            return
+        first, first_start = self.locate(start)
+        last, last_start = self.locate(end)
+        new = (
+            self.chunks[first][: start - first_start]
+            + text
+            + self.chunks[last][end - last_start :]
+        )
+        if first == last and 0 < len(new) <= 2 * self.chunk_size:
+            self.resize_chunk(first, len(new) - len(self.chunks[first]))
+            self.chunks[first] = new
+        else:
+            self.set_chunks(
+                self.chunks[:first] + self.split(new) + self.chunks[last + 1 :]
+            )
+
+    def __getitem__(self, key):
+        if isinstance(key, slice):
+            start, stop, _ = key.indices(self.length)
+            if start >= stop:
+                return ""
+            first, first_start = self.locate(start)
+            last, _ = self.locate(stop - 1)
+            text = "".join(self.chunks[first : last + 1])
+            return text[start - first_start : stop - first_start]
+        if key < 0:
+            key += self.length
+        chunk_start, chunk_end, chunk = self.cache
+        if not chunk_start <= key < chunk_end:
+            if not 0 <= key < self.length:
+                raise IndexError("rope index out of range")
+            index, chunk_start = self.locate(key)
+            chunk = self.chunks[index]
+            chunk_end = chunk_start + len(chunk)
+            self.cache = (chunk_start, chunk_end, chunk)
+        return chunk[key - chunk_start]
+
+    def __len__(self):
+        return self.length
+
+    def __str__(self):
+        return "".join(self.chunks)
+
+
 class Lines:
     """
     >>> lines = Lines()
     """
 
-    def __init__(self):
+    def __init__(self, number=1):
+        self.number = number
         self.lines = []
-        self.pending = Line(number=1)
+        self.pending = Line(number=number)
 
     def add_token(self, token):
         self.pending.add_token(token)
 
     def newline(self):
         self.lines.append(self.pending)
-        self.pending = Line(number=len(self.lines) + 1)
+        self.pending = Line(number=self.number + len(self.lines))
 
     def get(self):
         for line in self.lines:
@@ -326,6 +1073,8 @@ class Lines:
 
 class Line:
 
+    __slots__ = ["number", "tokens"]
+
     def __init__(self, number):
         self.number = number
         self.tokens = []
@@ -337,13 +1086,26 @@ class Line:
         return iter(self.tokens)
 
 
+class Overlay:
+    """
+    The selection that tokens are drawn with. It is shared by all tokens so
+    that moving the selection does not require building new tokens.
+    """
+
+    def __init__(self, selection=None):
+        if selection is None:
+            self.selection = Range(0, 0)
+        else:
+            self.selection = selection
+
+
 class Token:
     """
     >>> Token(
     ...     name="Invisible",
     ...     text="EOF",
     ...     range_=Range(4),
-    ...     selection=Range(0),
+    ...     overlay=Overlay(Range(0)),
     ...     node=None,
     ... ).cursor is None
     True
@@ -352,23 +1114,38 @@ class Token:
     ...     name="Invisible",
     ...     text="EOF",
     ...     range_=Range(4),
-    ...     selection=Range(4),
+    ...     overlay=Overlay(Range(4)),
     ...     node=None,
     ... ).cursor
     0
     """
 
-    def __init__(self, name, text, range_, selection, node):
+    __slots__ = ["name", "text", "range", "overlay", "node"]
+
+    def __init__(self, name, text, range_, overlay, node):
         self.name = name
         self.text = text
         self.range = range_
-        self.selection = range_.overlap(selection)
-        if range_.size == 0 and range_.start == selection.start:
-            self.cursor = 0
-            self.cursor_offset_percent = 0
-        elif range_.start <= selection.start < range_.end:
-            self.cursor = selection.start - range_.start
-            self.cursor_offset_percent = self.cursor / self.range.size
-        else:
-            self.cursor = None
+        self.overlay = overlay
         self.node = node
+
+    @property
+    def selection(self):
+        return self.range.overlap(self.overlay.selection)
+
+    @property
+    def cursor(self):
+        selection = self.overlay.selection
+        if self.range.size == 0 and self.range.start == selection.start:
+            return 0
+        elif self.range.start <= selection.start < self.range.end:
+            return selection.start - self.range.start
+        else:
+            return None
+
+    @property
+    def cursor_offset_percent(self):
+        if self.range.size == 0:
+            return 0
+        else:
+            return self.cursor / self.range.size
@@ -1,9 +1,11 @@
+import cairo
 import gi
 
 gi.require_version("Gtk", "3.0")
 
 from gi.repository import Gtk
 from gi.repository import Gdk
+from gi.repository import GLib
 
 
 class GtkUi:
@@ -24,8 +26,11 @@ class GtkUi:
         window = Gtk.Window()
         window.connect("destroy", Gtk.main_quit)
         gtk_editor = GtkEditor(editor)
+        scrolled_window = Gtk.ScrolledWindow()
+        scrolled_window.add(gtk_editor)
+        gtk_editor.scroll_with(scrolled_window.get_vadjustment())
         box = Gtk.Box(orientation=Gtk.Orientation.HORIZONTAL, spacing=0)
-        box.pack_start(gtk_editor, True, True, 0)
+        box.pack_start(scrolled_window, True, True, 0)
         window.add(box)
         window.show_all()
         Gtk.main()
@@ -45,67 +50,119 @@ class GtkEditor(Gtk.DrawingArea):
         self.connect("key-press-event", self.on_key_press_event)
         self.set_can_focus(True)
         self.editor = editor
+        self.editor.parse_in_background(
+            ParseWorker(
+                deliver=lambda *result: GLib.idle_add(self.on_parse_result, *result)
+            )
+        )
+        self.editor.reformat_delay = 0.3
+        self.reformat_source = None
+        self.vadjustment = None
+        self.gui_tokens = GuiTokens()
+        self.padding = 4
+        self.font_face = "Monospace"
+        self.font_size = 20
+        self.layout = self.create_layout()
+        self.line_height = self.layout.line_height
+        self.header_height = self.line_height + 2 * self.padding
+
+    def create_layout(self):
+        context = cairo.Context(cairo.ImageSurface(cairo.FORMAT_ARGB32, 1, 1))
+        context.select_font_face(self.font_face)
+        context.set_font_size(self.font_size)
+        ascent, _, height, _, _ = context.font_extents()
+        return MonospaceLayout(
+            measure=lambda text: context.text_extents(text).x_advance,
+            ascent=ascent,
+            line_height=height,
+        )
+
+    def scroll_with(self, vadjustment):
+        """
+        The header is kept at the top of the visible area, so everything has
+        to be drawn again when scrolling.
+        """
+        self.vadjustment = vadjustment
+        self.vadjustment.connect("value-changed", lambda adjustment: self.queue_draw())
+
+    def get_scroll_top(self):
+        if self.vadjustment is None:
+            return 0
+        return self.vadjustment.get_value()
+
+    def scroll_to_cursor(self):
+        if self.vadjustment is None:
+            return
+        index = self.editor.get_line_index(self.editor.selection.start)
+        line_top = self.header_height + index * self.line_height
+        scroll_top = self.get_scroll_top()
+        page_size = self.vadjustment.get_page_size()
+        if line_top - self.header_height < scroll_top:
+            self.vadjustment.set_value(line_top - self.header_height)
+        elif line_top + self.line_height > scroll_top + page_size:
+            self.vadjustment.set_value(line_top + self.line_height - page_size)
 
     def on_draw(self, widget, context):
         context.set_source_rgb(1, 0.7, 1)
         context.paint()
-        context.select_font_face("Monospace")
-        context.set_font_size(20)
-        self.gui_tokens = GuiTokens()
-        ascent, descent, font_height, _, _ = context.font_extents()
+        context.select_font_face(self.font_face)
+        context.set_font_size(self.font_size)
+        _, clip_top, _, clip_bottom = context.clip_extents()
+        line_count = self.editor.get_line_count()
+
+        padding = self.padding
+        ascent = self.layout.ascent
+        height = int(self.header_height + line_count * self.line_height + padding)
+        if self.get_size_request()[1] != height:
+            self.set_size_request(-1, height)
+
+        first = max(0, int((clip_top - self.header_height) // self.line_height))
+        last = min(
+            line_count, int((clip_bottom - self.header_height) // self.line_height) + 1
+        )
+        self.gui_tokens = self.layout.layout_lines(
+            self.editor.get_visible_lines(first, last),
+            x=padding,
+            y=self.header_height + first * self.line_height,
+        )
 
-        padding = 4
-        start_x = padding
-        x = start_x
-        y = padding + ascent
+        for gui_token in self.gui_tokens:
+            token = gui_token.token
+            rectangle = gui_token.rectangle
+            if token.selection.size > 0:
+                context.set_source_rgb(0.8, 0.5, 0.8)
+                context.rectangle(
+                    rectangle.x,
+                    rectangle.y,
+                    rectangle.width,
+                    rectangle.height,
+                )
+                context.fill()
+            if token.cursor is not None:
+                context.set_source_rgb(0.2, 0.2, 0.2)
+                context.rectangle(
+                    rectangle.x + rectangle.width * token.cursor_offset_percent,
+                    rectangle.y,
+                    2,
+                    rectangle.height,
+                )
+                context.fill()
+            context.set_source_rgb(*self.name_to_color(token.name))
+            context.move_to(rectangle.x, rectangle.y + ascent)
+            context.text_path(token.text)
+            context.fill()
 
+        scroll_top = self.get_scroll_top()
         context.set_source_rgb(0.9, 0.6, 0.9)
-        context.rectangle(0, 0, widget.get_allocated_width(), font_height + 2 * padding)
+        context.rectangle(
+            0, scroll_top, widget.get_allocated_width(), self.header_height
+        )
         context.fill()
 
         context.set_source_rgb(0.1, 0.1, 0.1)
-        context.move_to(x, y)
+        context.move_to(padding, scroll_top + padding + ascent)
         context.text_path(" > ".join(self.editor.get_path()))
         context.fill()
-        y += font_height + 2 * padding
-        x = start_x
-
-        for line in self.editor.get_lines():
-            for token in line:
-                context.set_source_rgb(0.1, 0.1, 0.1)
-                extents = context.text_extents(token.text)
-                rectangle = Rectangle(x, y - ascent, extents.x_advance, font_height)
-                self.gui_tokens.add(
-                    GuiToken(
-                        rectangle=rectangle,
-                        token=token,
-                    )
-                )
-                if token.selection.size > 0:
-                    context.set_source_rgb(0.8, 0.5, 0.8)
-                    context.rectangle(
-                        rectangle.x,
-                        rectangle.y,
-                        rectangle.width,
-                        rectangle.height,
-                    )
-                    context.fill()
-                if token.cursor is not None:
-                    context.set_source_rgb(0.2, 0.2, 0.2)
-                    context.rectangle(
-                        rectangle.x + rectangle.width * token.cursor_offset_percent,
-                        rectangle.y,
-                        2,
-                        rectangle.height,
-                    )
-                    context.fill()
-                context.set_source_rgb(*self.name_to_color(token.name))
-                context.move_to(x, y)
-                context.text_path(token.text)
-                context.fill()
-                x += extents.x_advance
-            y += font_height
-            x = start_x
 
     def name_to_color(self, name):
         names = [
@@ -130,8 +187,28 @@ class GtkEditor(Gtk.DrawingArea):
         else:
             return (0.1, 0.1, 0.1)
 
+    def schedule_reformat(self):
+        if self.reformat_source is not None:
+            GLib.source_remove(self.reformat_source)
+        self.reformat_source = GLib.timeout_add(
+            int(self.editor.reformat_delay * 1000), self.on_reformat
+        )
+
+    def on_reformat(self):
+        self.reformat_source = None
+        self.editor.reformat()
+        self.queue_draw()
+        return False
+
+    def on_parse_result(self, generation, text, tree):
+        self.editor.set_parse_result(generation, text, tree)
+        self.queue_draw()
+        return False
+
     def on_motion_notify_event(self, widget, event):
         x, y = self.translate_coordinates(self, event.x, event.y)
+        if y < self.get_scroll_top() + self.header_height:
+            return
         token = self.gui_tokens.hit(x, y)
         if token:
             self.editor.select(token.node.range)
@@ -165,4 +242,7 @@ class GtkEditor(Gtk.DrawingArea):
             self.editor.update_text(chr(unicode))
         else:
             return
+        if self.editor.parsed_generation != self.editor.generation:
+            self.schedule_reformat()
+        self.scroll_to_cursor()
         self.queue_draw()
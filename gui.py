@@ -1,19 +1,142 @@
+import bisect
+
+
+class MonospaceLayout:
+    """
+    Places tokens on a grid of fixed size cells. The cell width is measured
+    once and other widths are only measured for characters that might not
+    fit in a cell, so no drawing context is needed to lay out tokens:
+
+    >>> layout = MonospaceLayout(
+    ...     measure=lambda text: sum(20 if x == "語" else 10 for x in text),
+    ...     ascent=12,
+    ...     line_height=16,
+    ... )
+    >>> layout.text_width("abc"), layout.text_width("a語")
+    (30, 30)
+    >>> editor = Editor.from_text("[1]", json_parse, json_pretty)
+    >>> for gui_token in layout.layout_lines(editor.get_lines()[:2], x=4, y=8):
+    ...     rectangle = gui_token.rectangle
+    ...     print(
+    ...         f"{gui_token.token.text!r}: "
+    ...         f"{rectangle.x} {rectangle.y} {rectangle.width} {rectangle.height}"
+    ...     )
+    '[': 4 8 10 16
+    '\\\\n': 14 8 20 16
+    '    ': 4 24 40 16
+    '1': 44 24 10 16
+    '\\\\n': 54 24 20 16
+    """
+
+    def __init__(self, measure, ascent, line_height):
+        self.measure = measure
+        self.ascent = ascent
+        self.line_height = line_height
+        self.cell_width = measure("M")
+        self.widths = {}
+
+    def char_width(self, char):
+        if char not in self.widths:
+            self.widths[char] = self.measure(char)
+        return self.widths[char]
+
+    def text_width(self, text):
+        if text.isascii():
+            return len(text) * self.cell_width
+        return sum(self.char_width(char) for char in text)
+
+    def layout_lines(self, lines, x, y):
+        gui_tokens = GuiTokens()
+        for line in lines:
+            token_x = x
+            for token in line:
+                width = self.text_width(token.text)
+                gui_tokens.add(
+                    GuiToken(
+                        rectangle=Rectangle(token_x, y, width, self.line_height),
+                        token=token,
+                    )
+                )
+                token_x += width
+            y += self.line_height
+        return gui_tokens
+
+
 class GuiTokens:
+    """
+    Tokens are grouped into rows by their y position and sorted by x so that
+    hit testing is two binary searches:
+
+    >>> gui_tokens = GuiTokens()
+    >>> gui_tokens.add(GuiToken(Rectangle(0, 0, 10, 10), "a"))
+    >>> gui_tokens.add(GuiToken(Rectangle(10, 0, 10, 10), "b"))
+    >>> gui_tokens.add(GuiToken(Rectangle(0, 10, 30, 10), "c"))
+    >>> [gui_tokens.hit(x, y) for x, y in [(5, 5), (15, 5), (25, 5), (25, 15)]]
+    ['a', 'b', None, 'c']
+
+    On a shared edge, the token added first wins:
+
+    >>> gui_tokens.hit(10, 10)
+    'a'
+    """
 
     def __init__(self):
         self.gui_tokens = []
+        self.rows = None
 
     def add(self, ui_token):
         self.gui_tokens.append(ui_token)
+        self.rows = None
 
-    def hit(self, x, y):
+    def __iter__(self):
+        return iter(self.gui_tokens)
+
+    def build_rows(self):
+        by_y = {}
         for ui_token in self.gui_tokens:
-            if ui_token.contains(x, y):
-                return ui_token.token
+            by_y.setdefault(ui_token.rectangle.y, []).append(ui_token)
+        self.rows = []
+        self.row_bottoms = []
+        bottom = None
+        for y in sorted(by_y):
+            ui_tokens = sorted(by_y[y], key=lambda ui_token: ui_token.rectangle.x)
+            for ui_token in ui_tokens:
+                rectangle = ui_token.rectangle
+                if bottom is None or rectangle.y + rectangle.height > bottom:
+                    bottom = rectangle.y + rectangle.height
+            self.rows.append(
+                (
+                    y,
+                    [
+                        ui_token.rectangle.x + ui_token.rectangle.width
+                        for ui_token in ui_tokens
+                    ],
+                    ui_tokens,
+                )
+            )
+            self.row_bottoms.append(bottom)
+
+    def hit(self, x, y):
+        if self.rows is None:
+            self.build_rows()
+        index = bisect.bisect_left(self.row_bottoms, y)
+        while index < len(self.rows) and self.rows[index][0] <= y:
+            _, rights, ui_tokens = self.rows[index]
+            token_index = bisect.bisect_left(rights, x)
+            while (
+                token_index < len(ui_tokens)
+                and ui_tokens[token_index].rectangle.x <= x
+            ):
+                if ui_tokens[token_index].contains(x, y):
+                    return ui_tokens[token_index].token
+                token_index += 1
+            index += 1
 
 
 class GuiToken:
 
+    __slots__ = ["rectangle", "token"]
+
     def __init__(self, rectangle, token):
         self.rectangle = rectangle
         self.token = token
@@ -24,6 +147,8 @@ class GuiToken:
 
 class Rectangle:
 
+    __slots__ = ["x", "y", "width", "height"]
+
     def __init__(self, x, y, width, height):
         self.x = x
         self.y = y
@@ -1,4 +1,7 @@
-def json_parse(text):
+memoize["Parser"] = 100000
+
+
+def json_parse(text, edit=None):
     """
     String:
 
@@ -46,21 +49,65 @@ def json_parse(text):
 
     >>> for token in json_parse("[1, 2]").tokenize():
     ...     print(token[:3])
-    ['List', 0, 1]
-    ['Number', 1, 2]
-    ['List', 2, 4]
-    ['Number', 4, 5]
-    ['List', 5, 6]
+    ('List', 0, 1)
+    ('Number', 1, 2)
+    ('List', 2, 4)
+    ('Number', 4, 5)
+    ('List', 5, 6)
 
     >>> for token in json_parse('{"key": 4}').tokenize():
     ...     print(token[:3])
-    ['Dict', 0, 1]
-    ['Key', 1, 6]
-    ['Entry', 6, 8]
-    ['Number', 8, 9]
-    ['Dict', 9, 10]
+    ('Dict', 0, 1)
+    ('Key', 1, 6)
+    ('Entry', 6, 8)
+    ('Number', 8, 9)
+    ('Dict', 9, 10)
+
+    Incremental:
+
+    >>> tree = json_parse('[1, [2, 3], 4]')
+    >>> edit = Edit(tree, Range(8), 2)
+    >>> json_parse('[1, [2, 399], 4]', edit).as_list()
+    ['Document', '', ['List', '', ['Number', 1], ['List', '', ['Number', 2], ['Number', 399]], ['Number', 4]]]
+    >>> for token in tree.tokenize():
+    ...     print(token[:3])
+    ('List', 0, 1)
+    ('Number', 1, 2)
+    ('List', 2, 4)
+    ('List', 4, 5)
+    ('Number', 5, 6)
+    ('List', 6, 8)
+    ('Number', 8, 11)
+    ('List', 11, 12)
+    ('List', 12, 14)
+    ('Number', 14, 15)
+    ('List', 15, 16)
+
+    Deeply nested:
+
+    >>> tree = json_parse("[" * 5000 + "]" * 5000)
+    >>> len(list(tree.tokenize()))
+    9999
+    >>> len(json_pretty(json_parse("[" * 500 + "]" * 500)).splitlines())
+    999
     """
-    return compile_chain(["JsonParser.file"], text)
+    if edit is not None:
+        tree = run_deep(
+            reparse,
+            edit,
+            text,
+            {
+                "Dict": "JsonParser.dict",
+                "Entry": "JsonParser.dictItem",
+                "Key": "JsonParser.key",
+                "List": "JsonParser.list",
+                "Number": "JsonParser.number",
+                "String": "JsonParser.string",
+            },
+        )
+        if tree is not None:
+            return tree
+    return run_deep(compile_chain, ["JsonParser.file"], str(text), explain=False)
 
 
 def json_pretty(tree):
@@ -79,16 +126,20 @@ def json_pretty(tree):
         "there": "hello"
     }
     """
-    return compile_chain(["JsonPrettyPrinter.pretty"], tree.as_list())
+    return run_deep(compile_chain, ["JsonPrettyPrinter.pretty"], tree.as_list())
 
 
-def txt_list_parse(text):
+def txt_list_parse(text, edit=None):
     """
     >>> text = "* hello\\n* there\\n  hoho"
     >>> txt_list_parse(text).as_list()
     ['Document', '', ['Item', '', ['Line', 'hello']], ['Item', '', ['Line', 'there'], ['Line', 'hoho']]]
     """
-    return compile_chain(["TxtListParser.file"], text)
+    if edit is not None:
+        tree = run_deep(reparse, edit, text, {"Item": "TxtListParser.item"})
+        if tree is not None:
+            return tree
+    return run_deep(compile_chain, ["TxtListParser.file"], str(text), explain=False)
 
 
 def txt_list_pretty(tree):
@@ -99,11 +150,23 @@ def txt_list_pretty(tree):
     * there
       hoho
     """
-    return compile_chain(["TxtListPrettyPrinter.pretty"], tree.as_list())
+    return run_deep(compile_chain, ["TxtListPrettyPrinter.pretty"], tree.as_list())
 
 
-def rlmeta_parse(text):
-    return compile_chain(["Parser.file"], text)
+def rlmeta_parse(text, edit=None):
+    if edit is not None:
+        tree = run_deep(
+            reparse,
+            edit,
+            text,
+            {
+                "Namespace": "Parser.namespace",
+                "Rule": "Parser.rule",
+            },
+        )
+        if tree is not None:
+            return tree
+    return run_deep(compile_chain, ["Parser.file"], str(text), explain=False)
 
 
 def rlmeta_pretty(tree):
@@ -119,4 +182,4 @@ def rlmeta_pretty(tree):
       Rule = .:name -> "n":newline -> { "  " name " = " xs }
     }
     """
-    return compile_chain(["PrettyPrinter.pretty"], tree.as_list())
+    return run_deep(compile_chain, ["PrettyPrinter.pretty"], tree.as_list())
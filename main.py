@@ -1,10 +1,55 @@
 import doctest
+import json
 import sys
+import time
+import tracemalloc
+
+
+def benchmark():
+    """
+    Print how long parsing takes, how much memory it needs at most per
+    parsed character, and how much memory a parsed JSON tree holds per node.
+    """
+    json_text = json_pretty(
+        json_parse(json.dumps([{"key": [i, "value", [1, 2]]} for i in range(500)]))
+    )
+    rlmeta_text = "".join(
+        f"G{index} {{\n  x = 'a'-'z':x y*:ys -> {{ x ys }}\n  y = '0' | . \n}}\n"
+        for index in range(100)
+    )
+    for name, parse, text in [
+        ("json", json_parse, json_text),
+        ("rlmeta", rlmeta_parse, rlmeta_text),
+    ]:
+        start = time.perf_counter()
+        parse(text)
+        seconds = time.perf_counter() - start
+        tracemalloc.start()
+        parse(text)
+        _, peak = tracemalloc.get_traced_memory()
+        tracemalloc.stop()
+        print(
+            f"{name}: {seconds / len(text) * 1e6:.2f} us/char "
+            f"{peak / len(text):.0f} bytes/char"
+        )
+    tracemalloc.start()
+    tree = json_parse(json_text)
+    size, _ = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    nodes = 0
+    stack = [tree]
+    while stack:
+        node = stack.pop()
+        nodes += 1
+        stack.extend(node.children)
+    print(f"json tree: {size / nodes:.0f} bytes/node")
 
 
 if __name__ == "__main__":
     if "--selftest" in sys.argv:
         doctest.testmod(optionflags=doctest.REPORT_NDIFF | doctest.FAIL_FAST)
         print("ok")
+    elif "--benchmark" in sys.argv:
+        benchmark()
     else:
         GtkUi.create().run(sys.argv[1:])
@@ -4,6 +4,7 @@ set -e
 
 python ./rlmeta/rlmeta.py \
     --support \
+    --backend "${BACKEND:-classes}" \
     --compile json.rlmeta \
     --compile txtlist.rlmeta \
     --compile rlmeta/src/parser.rlmeta \
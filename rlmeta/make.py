@@ -30,6 +30,7 @@ def compile_rlmeta(rlmeta):
         "--support",
         "--compile", "src/parser.rlmeta",
         "--compile", "src/codegenerator.rlmeta",
+        "--copy", "src/optimizer.py",
         "--copy", "src/main.py",
     ])
 
@@ -44,9 +45,44 @@ def test(rlmeta):
         b"Grammar { x = % | . }",
         b"print(compile_chain(['Grammar.x'], ['foo']))"
     ) == b"foo\n"
+    log("Test: Functions backend")
+    assert test_grammar(
+        rlmeta,
+        b"Grammar { x = 'a' y:x -> { x x } y = 'b'* }",
+        b"print(compile_chain(['Grammar.x'], 'abb'))",
+        ["--backend", "functions"]
+    ) == b"bbbb\n"
+    log("Test: Character classes")
+    assert test_grammar(
+        rlmeta,
+        b"Grammar { x = ('a'-'c' | 'x')*:xs !. -> { xs } }",
+        b"print(compile_chain(['Grammar.x'], 'abxc'))"
+    ) == b"abxc\n"
+    log("Test: Repetitions of characters")
+    assert test_grammar(
+        rlmeta,
+        b"Grammar { x = c*:xs '\"' .*:ys -> { xs \"|\" ys } c = !'\"' . }",
+        b"print(compile_chain(['Grammar.x'], 'ab\"cd'))"
+    ) == b"ab|cd\n"
+    log("Test: Predicted choices")
+    assert test_grammar(
+        rlmeta,
+        b"Grammar { x = y*:xs !. -> { xs } y = 'a' -> \"A\" | 'b' -> \"B\" | . }",
+        b"print(compile_chain(['Grammar.x'], 'abxb'))"
+    ) == b"ABxB\n"
+    log("Test: Left recursion")
+    assert test_grammar(
+        rlmeta,
+        b"Grammar { x = y:x !. -> x y = y:a '-' z:b -> { \"(\" a \"-\" b \")\" } | z z = z:a '*' d:b -> { a \"*\" b } | d d = '0'-'9' }",
+        b"print(compile_chain(['Grammar.x'], '1-2*3-4'))"
+    ) == b"((1-2*3)-4)\n"
 
-def test_grammar(rlmeta, grammar, main_code):
-    compiled = run_rlmeta(rlmeta, ["--support", "--compile", "-"], grammar)
+def test_grammar(rlmeta, grammar, main_code, extra_args=[]):
+    compiled = run_rlmeta(
+        rlmeta,
+        ["--support"] + extra_args + ["--compile", "-"],
+        grammar
+    )
     total = compiled + main_code
     process = subprocess.Popen(
         ["python"],
@@ -1,116 +1,261 @@
-SUPPORT = 'rules = {}\n\n\nclass Stream:\n\n    def __init__(self, items):\n        self.items = items\n        self.index = 0\n        self.nesting = tuple()\n        self.latest_error = None\n        self.scope = None\n\n    def operator_or(self, matchers):\n        for matcher in matchers:\n            backtrack_index = self.index\n            try:\n                return matcher.run(self)\n            except MatchError:\n                self.index = backtrack_index\n        self.error("no or match")\n\n    def operator_and(self, matchers):\n        result = self.action()\n        for matcher in matchers:\n            result = matcher.run(self)\n        return result\n\n    def operator_star(self, matcher):\n        results = []\n        while True:\n            backtrack_index = self.index\n            try:\n                results.append(matcher.run(self))\n            except MatchError:\n                self.index = backtrack_index\n                return self.action(lambda self: [x.eval(self.runtime) for x in results])\n\n    def operator_not(self, matcher):\n        backtrack_index = self.index\n        try:\n            matcher.run(self)\n        except MatchError:\n            return self.action()\n        finally:\n            self.index = backtrack_index\n        self.error("not matched")\n\n    def action(self, fn=lambda self: None):\n        return SemanticAction(self.scope, fn)\n\n    def with_scope(self, matcher):\n        current_scope = self.scope\n        self.scope = {}\n        try:\n            return matcher.run(self)\n        finally:\n            self.scope = current_scope\n\n    def bind(self, name, semantic_action):\n        self.scope[name] = semantic_action\n        return semantic_action\n\n    def match_list(self, matcher):\n        if self.index < len(self.items):\n            items, index, nesting = self.items, self.index, self.nesting\n            try:\n                self.nesting = self.nesting + (self.index,)\n                self.items = self.items[self.index]\n                self.index = 0\n                result = matcher.run(self)\n                index += 1\n            finally:\n                self.items, self.index, self.nesting = items, index, nesting\n            return result\n        self.error("no list found")\n\n    def match_range(self, matcher):\n        start = self.index\n        matcher.run(self)\n        end = self.index\n        return self.action(lambda self: Range(start, end))\n\n    def match_call_rule(self, namespace):\n        try:\n            rule_name = self.items[self.index]\n        except:\n            self.error(f"Could not extract rule name.")\n        if not isinstance(rule_name, str):\n            self.error(f"Match call rule was not a string.")\n        name = namespace + "." + rule_name\n        if name in rules:\n            rule = rules[name]\n            self.index += 1\n            return rule.run(self)\n        else:\n            self.error("unknown rule")\n\n    def match(self, fn, description):\n        if self.index < len(self.items):\n            item = self.items[self.index]\n            if fn(item):\n                self.index += 1\n                return self.action(lambda self: item)\n        self.error(f"expected {description}")\n\n    def error(self, name):\n        if not self.latest_error or (\n            (self.nesting + (self.index,))\n            > (self.latest_error[3] + (self.latest_error[2],))\n        ):\n            self.latest_error = (name, self.items, self.index, self.nesting)\n        raise MatchError(*self.latest_error[:-1])\n\n\nclass MatchError(Exception):\n\n    def __init__(self, name, items, index):\n        Exception.__init__(self, name)\n        self.items = items\n        self.index = index\n\n\nclass SemanticAction:\n\n    def __init__(self, scope, fn):\n        self.scope = scope\n        self.fn = fn\n\n    def eval(self, runtime):\n        self.runtime = runtime\n        return self.fn(self)\n\n    def bind(self, name, value, continuation):\n        self.runtime = self.runtime.bind(name, value)\n        return continuation()\n\n    def lookup(self, name):\n        if name in self.scope:\n            return self.scope[name].eval(self.runtime)\n        else:\n            return self.runtime.lookup(name)\n\n\nclass Runtime:\n\n    def __init__(self, extra={"len": len, "repr": repr, "int": int}):\n        self.vars = extra\n\n    def bind(self, name, value):\n        return Runtime(dict(self.vars, **{name: value}))\n\n    def lookup(self, name):\n        if name in self.vars:\n            return self.vars[name]\n        else:\n            return getattr(self, name)\n\n    def append(self, list, thing):\n        list.append(thing)\n\n    def join(self, items, delimiter=""):\n        return delimiter.join(\n            self.join(item, delimiter) if isinstance(item, list) else str(item)\n            for item in items\n        )\n\n    def indent(self, text, prefix="    "):\n        return "".join(prefix + line for line in text.splitlines(True))\n\n    def splice(self, depth, item):\n        if depth == 0:\n            return [item]\n        else:\n            return self.concat([self.splice(depth - 1, subitem) for subitem in item])\n\n    def concat(self, lists):\n        return [x for xs in lists for x in xs]\n\n    def mult(self, x, y):\n        return x * y\n\n    def Node(self, name, range_, value, children=[]):\n        return Node(name, range_.start, range_.end, value, children)\n\n    def table(self, rows):\n        expanded = self.expand_rows(rows)\n        max_lengths = {}\n        for row in expanded:\n            for index, column in enumerate(row):\n                if index not in max_lengths:\n                    max_lengths[index] = len(column)\n                else:\n                    max_lengths[index] = max(len(column), max_lengths[index])\n        return "".join(\n            [\n                "".join(\n                    [\n                        column.ljust(max_lengths[index])\n                        for index, column in enumerate(row)\n                    ]\n                ).rstrip()\n                + "\\n"\n                for row in expanded\n            ]\n        )\n\n    def expand_rows(self, rows):\n        total = []\n        for row in rows:\n            expanded = []\n            extra = []\n            for column in row:\n                if isinstance(column, list):\n                    extra.extend(self.expand_rows(column))\n                else:\n                    expanded.append(column)\n            total.append(expanded)\n            total.extend(extra)\n        return total\n\n\nclass Node:\n\n    def __init__(self, name, start, end, value, children=[]):\n        self.name = name\n        self.range = Range(start, end)\n        self.value = value\n        self.children = children\n        self.parent = None\n        for child in self.children:\n            child.parent = self\n\n    def get_first_child(self):\n        for child in self.children:\n            return child\n        return self\n\n    def get_path(self):\n        if self.parent is None:\n            prefix = []\n        else:\n            prefix = self.parent.get_path()\n        return prefix + [self.name]\n\n    def get_next_sibling(self):\n        if self.parent is None:\n            return self\n        else:\n            return self.parent.get_sibling(self, +1)\n\n    def get_previous_sibling(self):\n        if self.parent is None:\n            return self\n        else:\n            return self.parent.get_sibling(self, -1)\n\n    def get_sibling(self, child, offset):\n        index = 0\n        for index, x in enumerate(self.children):\n            if x is child:\n                break\n        return self.children[(index + offset) % len(self.children)]\n\n    def tokenize(self):\n        pos = self.range.start\n        result = []\n        for child in self.children:\n            for name, child_start, child_end, d in child.tokenize():\n                if pos != child_start:\n                    result.append([self.name, pos, child_start, self])\n                result.append([name, child_start, child_end, d])\n                pos = child_end\n        if pos != self.range.end:\n            result.append([self.name, pos, self.range.end, self])\n        return result\n\n    def as_list(self):\n        return [\n            self.name,\n            self.value,\n        ] + [child.as_list() for child in self.children]\n\n    def pprint(self, indentation=0):\n        print(f"{\'  \'*indentation}{self.name} {self.range}")\n        for child in self.children:\n            child.pprint(indentation + 1)\n\n\nclass Range:\n\n    def __init__(self, start, end=None):\n        self.start = start\n        if end is None:\n            self.end = start\n        else:\n            self.end = end\n\n    def contains(self, value):\n        if value == self.start == self.end:\n            return True\n        else:\n            return self.start <= value < self.end\n\n    def extend_left(self, amount):\n        self.start -= amount\n\n    def extend_right(self, amount):\n        self.end += amount\n\n    @property\n    def size(self):\n        return self.end - self.start\n\n    def overlap(self, other):\n        """\n        >>> Range(0, 5).overlap(Range(1, 8))\n        Range(1, 5)\n        """\n        if other.end <= self.start:\n            return Range(0, 0)\n        elif other.start >= self.end:\n            return Range(0, 0)\n        else:\n            return Range(max(self.start, other.start), min(self.end, other.end))\n\n    def is_same(self, other):\n        return self.start == other.start and self.end == other.end\n\n    def __repr__(self):\n        return f"Range({self.start!r}, {self.end!r})"\n\n\ndef compile_chain(grammars, source):\n    import os\n    import sys\n    import pprint\n\n    runtime = Runtime()\n    for rule in grammars:\n        try:\n            source = rules[rule].run(Stream(source)).eval(runtime)\n        except MatchError as e:\n            marker = "<ERROR POSITION>"\n            if os.isatty(sys.stderr.fileno()):\n                marker = f"\\033[0;31m{marker}\\033[0m"\n            if isinstance(e.items, str):\n                stream_string = e.items[: e.index] + marker + e.items[e.index :]\n            else:\n                stream_string = pprint.pformat(e.items)\n            sys.exit(\n                "ERROR: {}\\nPOSITION: {}\\nSTREAM:\\n{}".format(\n                    str(e), e.index, runtime.indent(stream_string)\n                )\n            )\n    return source\n'
+SUPPORT = 'import array\nimport bisect\nimport collections\nimport marshal\nimport queue\nimport re\nimport sys\nimport threading\n\nrules = {}\nmemoize = {}\n\n\nFAIL = object()\n\n\nclass Stream:\n    """\n    Matchers return FAIL instead of raising when they do not match, and the\n    farthest failure is remembered in latest_error to report if the whole\n    match fails.\n    """\n\n    __slots__ = [\n        "items",\n        "predict",\n        "index",\n        "nesting",\n        "latest_error",\n        "scope",\n        "memo_size",\n        "memo",\n        "seeds",\n    ]\n\n    def __init__(self, items, memo_size=None, predict=True):\n        self.items = items\n        self.predict = predict\n        self.index = 0\n        self.nesting = tuple()\n        self.latest_error = None\n        self.scope = None\n        self.memo_size = memo_size\n        self.memo = collections.OrderedDict()\n        self.seeds = {}\n\n    def operator_or(self, matchers):\n        for matcher in matchers:\n            backtrack_index = self.index\n            result = matcher(self)\n            if result is not FAIL:\n                return result\n            self.index = backtrack_index\n        return self.fail("no or match")\n\n    def operator_dispatch(self, table, default, matchers):\n        indexes = range(len(matchers))\n        if self.predict:\n            if self.index >= len(self.items):\n                indexes = default\n            else:\n                item = self.items[self.index]\n                if isinstance(item, str) and len(item) == 1:\n                    indexes = table.get(item, default)\n        for index in indexes:\n            backtrack_index = self.index\n            result = matchers[index](self)\n            if result is not FAIL:\n                return result\n            self.index = backtrack_index\n        return self.fail("no or match")\n\n    def operator_and(self, matchers):\n        result = NONE\n        for matcher in matchers:\n            result = matcher(self)\n            if result is FAIL:\n                return FAIL\n        return result\n\n    def operator_star(self, matcher):\n        results = []\n        while True:\n            backtrack_index = self.index\n            result = matcher(self)\n            if result is FAIL:\n                self.index = backtrack_index\n                return ListAction(results)\n            results.append(result)\n\n    def operator_not(self, matcher):\n        backtrack_index = self.index\n        result = matcher(self)\n        self.index = backtrack_index\n        if result is FAIL:\n            return NONE\n        return self.fail("not matched")\n\n    def action(self, fn):\n        return SemanticAction(self.scope, fn)\n\n    def with_scope(self, matcher):\n        current_scope = self.scope\n        self.scope = {}\n        result = matcher(self)\n        self.scope = current_scope\n        return result\n\n    def bind(self, name, semantic_action):\n        if semantic_action is not FAIL:\n            self.scope[name] = semantic_action\n        return semantic_action\n\n    def match_list(self, matcher):\n        if self.index < len(self.items):\n            items, index, nesting = self.items, self.index, self.nesting\n            self.nesting = self.nesting + (self.index,)\n            self.items = self.items[self.index]\n            self.index = 0\n            result = matcher(self)\n            if result is not FAIL:\n                index += 1\n            self.items, self.index, self.nesting = items, index, nesting\n            return result\n        return self.fail("no list found")\n\n    def match_range(self, matcher):\n        start = self.index\n        if matcher(self) is FAIL:\n            return FAIL\n        end = self.index\n        return ValueAction(Range(start, end))\n\n    def match_call_rule(self, namespace):\n        try:\n            rule_name = self.items[self.index]\n        except:\n            return self.fail(f"Could not extract rule name.")\n        if not isinstance(rule_name, str):\n            return self.fail(f"Match call rule was not a string.")\n        name = namespace + "." + rule_name\n        if name in rules:\n            self.index += 1\n            return self.match_rule(name)\n        else:\n            return self.fail("unknown rule")\n\n    def match_rule(self, name):\n        if self.memo_size is None:\n            return rules[name](self)\n        key = (name, self.nesting, self.index)\n        entry = self.memo.get(key)\n        if entry is not None:\n            # A remembered failure already contributed to latest_error, so\n            # it is reported the same as if the rule was run again.\n            result, self.index = entry\n            return result\n        start = self.index\n        result = rules[name](self)\n        if not self.seeds:\n            # Results that depend on a seed that is still growing are not\n            # final.\n            self.remember(key, result, start if result is FAIL else self.index)\n        return result\n\n    def grow_seed(self, name, matcher):\n        """\n        Match a left recursive rule by first matching it with the recursive\n        call failing, and then matching it again with the recursive call\n        giving the previous result for as long as that matches more:\n\n        >>> def number(stream):\n        ...     return stream.match(str.isdigit, "digit")\n        >>> def minus(stream):\n        ...     x = stream.match_rule("Example.minus")\n        ...     if x is FAIL or stream.match_set("-", "\'-\'") is FAIL:\n        ...         return FAIL\n        ...     y = number(stream)\n        ...     if y is FAIL:\n        ...         return FAIL\n        ...     return stream.action(lambda self: [\n        ...         x.eval(self.runtime), "-", y.eval(self.runtime)\n        ...     ])\n        >>> rules["Example.minus"] = lambda stream: stream.grow_seed(\n        ...     "Example.minus", lambda stream: stream.operator_or([minus, number])\n        ... )\n        >>> stream = Stream("1-2-3")\n        >>> stream.match_rule("Example.minus").eval(Runtime())\n        [[\'1\', \'-\', \'2\'], \'-\', \'3\']\n        >>> stream.index\n        5\n        >>> del rules["Example.minus"]\n        """\n        key = (name, self.nesting, self.index)\n        if key in self.seeds:\n            result, self.index = self.seeds[key]\n            return result\n        start = self.index\n        self.seeds[key] = (FAIL, start)\n        while True:\n            self.index = start\n            result = matcher(self)\n            seed, end = self.seeds[key]\n            if result is FAIL or (seed is not FAIL and self.index <= end):\n                break\n            self.seeds[key] = (result, self.index)\n        result, self.index = self.seeds.pop(key)\n        return result\n\n    def remember(self, key, result, index):\n        self.memo[key] = (result, index)\n        if len(self.memo) > self.memo_size:\n            # Oldest entries are for positions the parser has most likely\n            # moved past.\n            self.memo.popitem(last=False)\n\n    def match(self, fn, description):\n        if self.index < len(self.items):\n            item = self.items[self.index]\n            if fn(item):\n                self.index += 1\n                return ValueAction(item)\n        return self.fail(f"expected {description}")\n\n    def match_set(self, items, description):\n        if self.index < len(self.items):\n            item = self.items[self.index]\n            if isinstance(item, str) and item in items:\n                self.index += 1\n                return ValueAction(item)\n        return self.fail(f"expected {description}")\n\n    def match_pattern(self, pattern, matcher):\n        if not isinstance(self.items, str):\n            return matcher(self)\n        start = self.index\n        end = pattern.match(self.items, start).end()\n        if end == start:\n            return matcher(self)\n        self.index = end\n        # The repetition that stops matcher fails here, and running it\n        # records the same error as it would have.\n        matcher(self)\n        return ValueAction(list(self.items[start:end]))\n\n    def fail(self, name):\n        latest = self.latest_error\n        if latest is None or (\n            self.index > latest[2]\n            if not self.nesting and not latest[3]\n            else self.nesting + (self.index,) > latest[3] + (latest[2],)\n        ):\n            self.latest_error = (name, self.items, self.index, self.nesting)\n        return FAIL\n\n    def get_error(self):\n        return MatchError(*self.latest_error[:-1])\n\n\nclass MatchError(Exception):\n\n    def __init__(self, name, items, index):\n        Exception.__init__(self, name)\n        self.items = items\n        self.index = index\n\n\nclass SemanticAction:\n\n    __slots__ = ["scope", "fn", "runtime"]\n\n    def __init__(self, scope, fn):\n        self.scope = scope\n        self.fn = fn\n\n    def eval(self, runtime):\n        self.runtime = runtime\n        return self.fn(self)\n\n    def bind(self, name, value, continuation):\n        self.runtime = self.runtime.bind(name, value)\n        return continuation()\n\n    def lookup(self, name):\n        if name in self.scope:\n            return self.scope[name].eval(self.runtime)\n        else:\n            return self.runtime.lookup(name)\n\n\nclass ValueAction:\n    """\n    The value of something matched that does not depend on the runtime.\n    """\n\n    __slots__ = ["value"]\n\n    def __init__(self, value):\n        self.value = value\n\n    def eval(self, runtime):\n        return self.value\n\n\nclass ListAction:\n    """\n    The values of all matches of a repetition.\n    """\n\n    __slots__ = ["actions"]\n\n    def __init__(self, actions):\n        self.actions = actions\n\n    def eval(self, runtime):\n        return [action.eval(runtime) for action in self.actions]\n\n\nNONE = ValueAction(None)\n\n\nclass Runtime:\n    """\n    Binding a name gives a new runtime that only holds the new variable\n    and refers to this one for the rest. Chains longer than max_depth are\n    flattened so that looking up a name stays cheap:\n\n    >>> runtime = Runtime().bind("x", 1).bind("y", 2).bind("x", 3)\n    >>> runtime.lookup("x"), runtime.lookup("y"), runtime.lookup("len")\n    (3, 2, <built-in function len>)\n    >>> for index in range(20):\n    ...     runtime = runtime.bind("x", index)\n    >>> runtime.depth <= runtime.max_depth\n    True\n    >>> runtime.lookup("x"), runtime.lookup("y")\n    (19, 2)\n    """\n\n    max_depth = 8\n\n    def __init__(self, extra={"len": len, "repr": repr, "int": int}, parent=None):\n        self.vars = extra\n        self.parent = parent\n        self.depth = 0 if parent is None else parent.depth + 1\n\n    def bind(self, name, value):\n        if self.depth < self.max_depth:\n            return Runtime({name: value}, self)\n        vars = {}\n        runtime = self\n        while runtime is not None:\n            for key, item in runtime.vars.items():\n                vars.setdefault(key, item)\n            runtime = runtime.parent\n        vars[name] = value\n        return Runtime(vars)\n\n    def lookup(self, name):\n        runtime = self\n        while runtime is not None:\n            if name in runtime.vars:\n                return runtime.vars[name]\n            runtime = runtime.parent\n        return getattr(self, name)\n\n    def append(self, list, thing):\n        list.append(thing)\n\n    def join(self, items, delimiter=""):\n        return delimiter.join(\n            self.join(item, delimiter) if isinstance(item, list) else str(item)\n            for item in items\n        )\n\n    def indent(self, text, prefix="    "):\n        return "".join(prefix + line for line in text.splitlines(True))\n\n    def splice(self, depth, item):\n        if depth == 0:\n            return [item]\n        else:\n            return self.concat([self.splice(depth - 1, subitem) for subitem in item])\n\n    def concat(self, lists):\n        return [x for xs in lists for x in xs]\n\n    def mult(self, x, y):\n        return x * y\n\n    def Node(self, name, range_, value, children=[]):\n        return Node(name, range_.start, range_.end, value, children)\n\n    def table(self, rows):\n        expanded = self.expand_rows(rows)\n        max_lengths = {}\n        for row in expanded:\n            for index, column in enumerate(row):\n                if index not in max_lengths:\n                    max_lengths[index] = len(column)\n                else:\n                    max_lengths[index] = max(len(column), max_lengths[index])\n        return "".join(\n            [\n                "".join(\n                    [\n                        column.ljust(max_lengths[index])\n                        for index, column in enumerate(row)\n                    ]\n                ).rstrip()\n                + "\\n"\n                for row in expanded\n            ]\n        )\n\n    def expand_rows(self, rows):\n        total = []\n        for row in rows:\n            expanded = []\n            extra = []\n            for column in row:\n                if isinstance(column, list):\n                    extra.extend(self.expand_rows(column))\n                else:\n                    expanded.append(column)\n            total.append(expanded)\n            total.extend(extra)\n        return total\n\n\nclass Node:\n\n    __slots__ = ["name", "range", "value", "children", "parent", "index", "path"]\n\n    def __init__(self, name, start, end, value, children=[]):\n        self.name = name\n        self.range = Range(start, end)\n        self.value = value\n        self.children = children\n        self.parent = None\n        self.index = 0\n        self.path = None\n        for index, child in enumerate(self.children):\n            child.parent = self\n            child.index = index\n\n    def get_first_child(self):\n        for child in self.children:\n            return child\n        return self\n\n    def get_path(self):\n        """\n        Paths are remembered, also for the ancestors on the way up, so they\n        are only worked out once for a node and its siblings:\n\n        >>> tree = Node("Root", 0, 2, "", [\n        ...     Node("A", 0, 1, ""),\n        ...     Node("B", 1, 2, ""),\n        ... ])\n        >>> tree.children[0].get_path()\n        [\'Root\', \'A\']\n        >>> tree.path, tree.children[1].get_depth()\n        ((\'Root\',), 1)\n        """\n        if self.path is None:\n            chain = []\n            node = self\n            while node is not None and node.path is None:\n                chain.append(node)\n                node = node.parent\n            path = () if node is None else node.path\n            for node in reversed(chain):\n                path = path + (node.name,)\n                node.path = path\n        return list(self.path)\n\n    def get_depth(self):\n        if self.path is None:\n            self.get_path()\n        return len(self.path) - 1\n\n    def forget_paths(self):\n        """\n        Forget remembered paths in my subtree. A node only remembers its path\n        if its parent does, so subtrees without paths are skipped.\n        """\n        stack = [self]\n        while stack:\n            node = stack.pop()\n            if node.path is not None:\n                node.path = None\n                stack.extend(node.children)\n\n    def get_next_sibling(self):\n        if self.parent is None:\n            return self\n        else:\n            return self.parent.get_sibling(self, +1)\n\n    def get_previous_sibling(self):\n        if self.parent is None:\n            return self\n        else:\n            return self.parent.get_sibling(self, -1)\n\n    def get_sibling(self, child, offset):\n        return self.children[(child.index + offset) % len(self.children)]\n\n    def shift(self, amount):\n        stack = [self]\n        while stack:\n            node = stack.pop()\n            node.range.start += amount\n            node.range.end += amount\n            stack.extend(node.children)\n\n    def replace(self, node):\n        """\n        Put node in my place in the tree and shift the ranges of everything\n        after me by the change in size.\n\n        >>> tree = Node("Root", 0, 6, "", [\n        ...     Node("A", 0, 2, ""),\n        ...     Node("B", 2, 4, "", [Node("C", 2, 3, "")]),\n        ...     Node("D", 4, 6, ""),\n        ... ])\n        >>> tree.children[1].children[0].replace(Node("E", 2, 5, ""))\n        >>> tree.pprint()\n        Root Range(0, 8)\n          A Range(0, 2)\n          B Range(2, 6)\n            E Range(2, 5)\n          D Range(6, 8)\n        """\n        amount = node.range.size - self.range.size\n        child = node\n        parent = self.parent\n        index = self.index\n        parent.children[index] = node\n        node.parent = parent\n        node.index = index\n        node.forget_paths()\n        while parent is not None:\n            parent.range.end += amount\n            for sibling in parent.children[index + 1 :]:\n                sibling.shift(amount)\n            child = parent\n            parent = parent.parent\n            index = child.index\n\n    def find_enclosing(self, range_, names):\n        """\n        Find the innermost node, with a name in names, that strictly contains\n        range_. That is, range_ does not touch its first or last position.\n        """\n        found = None\n        node = self\n        while node.range.start < range_.start and range_.end < node.range.end:\n            if node.name in names:\n                found = node\n            index = bisect.bisect_right(\n                node.children, range_.start, key=lambda x: x.range.start\n            )\n            if index == 0:\n                break\n            node = node.children[index - 1]\n        return found\n\n    def tokenize(self, window=None):\n        """\n        Split my range into tokens, each covered by the innermost node that\n        has no child covering it, and yield them as (name, start, end, node):\n\n        >>> tree = Node("Root", 0, 8, "", [\n        ...     Node("A", 1, 3, "", [Node("B", 2, 3, "")]),\n        ...     Node("C", 5, 5, ""),\n        ... ])\n        >>> for token in tree.tokenize():\n        ...     print(token[:3])\n        (\'Root\', 0, 1)\n        (\'A\', 1, 2)\n        (\'B\', 2, 3)\n        (\'Root\', 3, 8)\n\n        With a window, only the parts of tokens inside window are yielded,\n        and nodes outside of it are not visited:\n\n        >>> for token in tree.tokenize(Range(2, 6)):\n        ...     print(token[:3])\n        (\'B\', 2, 3)\n        (\'Root\', 3, 6)\n\n        Nodes are visited with an explicit stack, so how deep a tree can be\n        is not limited by the interpreter stack. Levels of the stack from\n        fresh and up have not produced a token yet, and all other levels\n        have produced the token that ends at cursor.\n        """\n        if window is None:\n            window = self.range\n        stack = [[self, self.get_first_child_index(window.start)]]\n        fresh = 0\n        cursor = self.range.start\n        while stack:\n            frame = stack[-1]\n            node, index = frame\n            if (\n                index < len(node.children)\n                and node.children[index].range.start < window.end\n            ):\n                child = node.children[index]\n                frame[1] += 1\n                stack.append([child, child.get_first_child_index(window.start)])\n                continue\n            level = len(stack) - 1\n            start = cursor if level < fresh else node.range.start\n            if start != node.range.end:\n                tokens = [(node.name, start, node.range.end, node)]\n                gap_end = start\n                for parent, _ in reversed(stack[fresh:level]):\n                    if parent.range.start != gap_end:\n                        tokens.append(\n                            (parent.name, parent.range.start, gap_end, parent)\n                        )\n                        gap_end = parent.range.start\n                if 0 < fresh <= level and cursor != gap_end:\n                    parent = stack[fresh - 1][0]\n                    tokens.append((parent.name, cursor, gap_end, parent))\n                for name, token_start, token_end, owner in reversed(tokens):\n                    token_start = max(token_start, window.start)\n                    token_end = min(token_end, window.end)\n                    if token_start < token_end:\n                        yield (name, token_start, token_end, owner)\n                cursor = node.range.end\n                fresh = level + 1\n            stack.pop()\n            fresh = min(fresh, len(stack))\n\n    def get_first_child_index(self, position):\n        """\n        Index of the first child that ends after position.\n        """\n        return bisect.bisect_right(self.children, position, key=lambda x: x.range.end)\n\n    def get_node_at(self, position):\n        """\n        The innermost node in my subtree that contains position, or None:\n\n        >>> tree = Node("Root", 0, 8, "", [\n        ...     Node("A", 1, 3, "", [Node("B", 2, 3, "")]),\n        ...     Node("C", 5, 5, ""),\n        ... ])\n        >>> [getattr(tree.get_node_at(x), "name", None) for x in [0, 2, 3, 5, 8]]\n        [\'Root\', \'B\', \'Root\', \'Root\', None]\n        """\n        if not self.range.start <= position < self.range.end:\n            return None\n        node = self\n        while True:\n            index = bisect.bisect_right(\n                node.children, position, key=lambda x: x.range.start\n            )\n            if index == 0 or node.children[index - 1].range.end <= position:\n                return node\n            node = node.children[index - 1]\n\n    def as_list(self):\n        result = [self.name, self.value]\n        stack = [(self, result)]\n        while stack:\n            node, items = stack.pop()\n            for child in node.children:\n                child_items = [child.name, child.value]\n                items.append(child_items)\n                stack.append((child, child_items))\n        return result\n\n    def pprint(self):\n        stack = [(self, 0)]\n        while stack:\n            node, indentation = stack.pop()\n            print(f"{\'  \'*indentation}{node.name} {node.range}")\n            stack.extend((child, indentation + 1) for child in reversed(node.children))\n\n\nclass CompactTree:\n    """\n    A read only tree stored in parallel arrays with one entry per node, in\n    the order nodes start. Nodes are handed out as CompactNode views with\n    the same interface as Node, so a large document does not need a Python\n    object per node:\n\n    >>> tree = CompactTree.from_node(Node("Root", 0, 8, "", [\n    ...     Node("A", 1, 3, "a", [Node("B", 2, 3, "")]),\n    ...     Node("C", 5, 5, ""),\n    ... ]))\n    >>> root = tree.get_root()\n    >>> root.pprint()\n    Root Range(0, 8)\n      A Range(1, 3)\n        B Range(2, 3)\n      C Range(5, 5)\n    >>> root.as_list()\n    [\'Root\', \'\', [\'A\', \'a\', [\'B\', \'\']], [\'C\', \'\']]\n    >>> for token in root.tokenize():\n    ...     print(token[:3])\n    (\'Root\', 0, 1)\n    (\'A\', 1, 2)\n    (\'B\', 2, 3)\n    (\'Root\', 3, 8)\n    >>> node = root.get_first_child().get_first_child()\n    >>> node.get_path()\n    [\'Root\', \'A\', \'B\']\n    >>> node.parent.get_next_sibling().name\n    \'C\'\n    >>> node.parent.get_previous_sibling() == node.parent.get_next_sibling()\n    True\n\n    Trees can be stored as bytes and turned back into nodes:\n\n    >>> CompactTree.from_bytes(tree.to_bytes()).to_node().pprint()\n    Root Range(0, 8)\n      A Range(1, 3)\n        B Range(2, 3)\n      C Range(5, 5)\n    """\n\n    ARRAYS = [\n        "name_ids",\n        "starts",\n        "ends",\n        "parents",\n        "first_children",\n        "last_children",\n        "next_siblings",\n        "previous_siblings",\n    ]\n\n    @classmethod\n    def from_node(cls, root):\n        tree = cls()\n        stack = [(root, -1)]\n        while stack:\n            node, parent = stack.pop()\n            index = tree.add(\n                node.name, node.range.start, node.range.end, node.value, parent\n            )\n            stack.extend((child, index) for child in reversed(node.children))\n        return tree\n\n    @classmethod\n    def from_bytes(cls, data):\n        names, values, *arrays = marshal.loads(data)\n        tree = cls()\n        tree.names = names\n        tree.name_lookup = {name: index for index, name in enumerate(names)}\n        tree.values = values\n        for name, items in zip(cls.ARRAYS, arrays):\n            getattr(tree, name).frombytes(items)\n        return tree\n\n    def __init__(self):\n        self.names = []\n        self.name_lookup = {}\n        self.name_ids = array.array("i")\n        self.starts = array.array("q")\n        self.ends = array.array("q")\n        self.values = []\n        self.parents = array.array("i")\n        self.first_children = array.array("i")\n        self.last_children = array.array("i")\n        self.next_siblings = array.array("i")\n        self.previous_siblings = array.array("i")\n\n    def add(self, name, start, end, value, parent):\n        """\n        Add a node as the last child of parent, or as the root if parent is\n        -1, and return its index.\n        """\n        index = len(self.starts)\n        self.name_ids.append(self.get_name_id(name))\n        self.starts.append(start)\n        self.ends.append(end)\n        self.values.append(value)\n        self.parents.append(parent)\n        self.first_children.append(-1)\n        self.last_children.append(-1)\n        self.next_siblings.append(-1)\n        previous = -1\n        if parent != -1:\n            previous = self.last_children[parent]\n            if previous == -1:\n                self.first_children[parent] = index\n            else:\n                self.next_siblings[previous] = index\n            self.last_children[parent] = index\n        self.previous_siblings.append(previous)\n        return index\n\n    def get_name_id(self, name):\n        if name not in self.name_lookup:\n            self.name_lookup[name] = len(self.names)\n            self.names.append(name)\n        return self.name_lookup[name]\n\n    def get_root(self):\n        return CompactNode(self, 0)\n\n    def copy(self):\n        tree = CompactTree()\n        tree.names = list(self.names)\n        tree.name_lookup = dict(self.name_lookup)\n        tree.values = list(self.values)\n        for name in self.ARRAYS:\n            items = getattr(self, name)\n            setattr(tree, name, array.array(items.typecode, items))\n        return tree\n\n    def replace(self, index, node):\n        """\n        Put node, a Node, in place of the subtree at index and shift the\n        ranges of everything after it by the change in size. The new nodes\n        are spliced into the arrays where the subtree was, so indices after\n        it move by the change in node count and views of them are stale:\n\n        >>> tree = CompactTree.from_node(Node("Root", 0, 6, "", [\n        ...     Node("A", 0, 2, ""),\n        ...     Node("B", 2, 4, "", [Node("C", 2, 3, "")]),\n        ...     Node("D", 4, 6, "", [Node("E", 4, 5, "")]),\n        ... ]))\n        >>> tree.replace(2, Node("F", 2, 5, "", [\n        ...     Node("G", 2, 3, ""),\n        ...     Node("H", 3, 5, ""),\n        ... ]))\n        >>> tree.get_root().pprint()\n        Root Range(0, 7)\n          A Range(0, 2)\n          F Range(2, 5)\n            G Range(2, 3)\n            H Range(3, 5)\n          D Range(5, 7)\n            E Range(5, 6)\n        >>> tree.get_root().children[2].get_previous_sibling().name\n        \'F\'\n        """\n        new = CompactTree.from_node(node)\n        end = self.get_subtree_end(index)\n        shift = len(new.starts) - (end - index)\n        amount = new.ends[0] - new.starts[0] - (self.ends[index] - self.starts[index])\n        if shift != 0:\n            for name in self.ARRAYS[3:]:\n                items = getattr(self, name)\n                items[:] = array.array(\n                    items.typecode, [x + shift if x >= end else x for x in items]\n                )\n        links = {}\n        for name in self.ARRAYS[3:]:\n            links[name] = array.array(\n                "i", [-1 if x == -1 else x + index for x in getattr(new, name)]\n            )\n        links["parents"][0] = self.parents[index]\n        links["next_siblings"][0] = self.next_siblings[index]\n        links["previous_siblings"][0] = self.previous_siblings[index]\n        self.name_ids[index:end] = array.array(\n            "i", [self.get_name_id(new.names[x]) for x in new.name_ids]\n        )\n        self.starts[index:end] = new.starts\n        self.ends[index:end] = new.ends\n        self.values[index:end] = new.values\n        for name in self.ARRAYS[3:]:\n            getattr(self, name)[index:end] = links[name]\n        if amount != 0:\n            after = index + len(new.starts)\n            for items in [self.starts, self.ends]:\n                items[after:] = array.array("q", [x + amount for x in items[after:]])\n            parent = self.parents[index]\n            while parent != -1:\n                self.ends[parent] += amount\n                parent = self.parents[parent]\n\n    def get_subtree_end(self, index):\n        """\n        The index after the last node in the subtree at index, which is the\n        next sibling of the node or of its closest ancestor that has one.\n        """\n        while index != -1:\n            if self.next_siblings[index] != -1:\n                return self.next_siblings[index]\n            index = self.parents[index]\n        return len(self.starts)\n\n    def to_bytes(self):\n        """\n        Raises ValueError if a value is not of a type that marshal handles.\n        """\n        return marshal.dumps(\n            [self.names, self.values]\n            + [getattr(self, name).tobytes() for name in self.ARRAYS]\n        )\n\n    def to_node(self):\n        """\n        Build Node objects for the whole tree. Children come after their\n        parent, so going backwards all children are built before the parent.\n        """\n        nodes = [None] * len(self.starts)\n        for index in reversed(range(len(self.starts))):\n            children = []\n            child = self.first_children[index]\n            while child != -1:\n                children.append(nodes[child])\n                child = self.next_siblings[child]\n            nodes[index] = Node(\n                self.names[self.name_ids[index]],\n                self.starts[index],\n                self.ends[index],\n                self.values[index],\n                children,\n            )\n        return nodes[0]\n\n\nclass CompactNode:\n    """\n    A node in a CompactTree. Views are created on demand, so they are\n    compared with == rather than is.\n    """\n\n    __slots__ = ["tree", "index"]\n\n    def __init__(self, tree, index):\n        self.tree = tree\n        self.index = index\n\n    def __eq__(self, other):\n        return (\n            isinstance(other, CompactNode)\n            and other.tree is self.tree\n            and other.index == self.index\n        )\n\n    def __hash__(self):\n        return hash((id(self.tree), self.index))\n\n    @property\n    def name(self):\n        return self.tree.names[self.tree.name_ids[self.index]]\n\n    @property\n    def range(self):\n        return Range(self.tree.starts[self.index], self.tree.ends[self.index])\n\n    @property\n    def value(self):\n        return self.tree.values[self.index]\n\n    @property\n    def parent(self):\n        return self.view(self.tree.parents[self.index])\n\n    @property\n    def children(self):\n        children = []\n        child = self.tree.first_children[self.index]\n        while child != -1:\n            children.append(CompactNode(self.tree, child))\n            child = self.tree.next_siblings[child]\n        return children\n\n    def view(self, index):\n        if index == -1:\n            return None\n        return CompactNode(self.tree, index)\n\n    def get_first_child(self):\n        return self.view(self.tree.first_children[self.index]) or self\n\n    def get_path(self):\n        path = []\n        index = self.index\n        while index != -1:\n            path.append(self.tree.names[self.tree.name_ids[index]])\n            index = self.tree.parents[index]\n        path.reverse()\n        return path\n\n    def get_depth(self):\n        return len(self.get_path()) - 1\n\n    def get_node_at(self, position):\n        """\n        The innermost node in my subtree that contains position, or None.\n        Nodes are stored in the order they start, so the last one that starts\n        at or before position is inside that node, or is that node.\n        """\n        tree = self.tree\n        if not tree.starts[self.index] <= position < tree.ends[self.index]:\n            return None\n        index = bisect.bisect_right(tree.starts, position, lo=self.index) - 1\n        while not tree.starts[index] <= position < tree.ends[index]:\n            index = tree.parents[index]\n        return CompactNode(tree, index)\n\n    def find_enclosing(self, range_, names):\n        """\n        Same as Node.find_enclosing. Every node that strictly contains range_\n        is an ancestor of the last node that starts before range_, so they\n        are found by walking up from it.\n        """\n        tree = self.tree\n        index = bisect.bisect_left(tree.starts, range_.start, lo=self.index) - 1\n        while index >= self.index:\n            if (\n                range_.end < tree.ends[index]\n                and tree.names[tree.name_ids[index]] in names\n            ):\n                return CompactNode(tree, index)\n            index = tree.parents[index]\n        return None\n\n    def replace(self, node):\n        self.tree.replace(self.index, node)\n\n    def get_next_sibling(self):\n        parent = self.tree.parents[self.index]\n        if parent == -1:\n            return self\n        sibling = self.tree.next_siblings[self.index]\n        if sibling == -1:\n            sibling = self.tree.first_children[parent]\n        return CompactNode(self.tree, sibling)\n\n    def get_previous_sibling(self):\n        parent = self.tree.parents[self.index]\n        if parent == -1:\n            return self\n        sibling = self.tree.previous_siblings[self.index]\n        if sibling == -1:\n            sibling = self.tree.last_children[parent]\n        return CompactNode(self.tree, sibling)\n\n    def tokenize(self, window=None):\n        """\n        The same walk as Node.tokenize, over the arrays of the tree.\n        """\n        tree = self.tree\n        starts = tree.starts\n        ends = tree.ends\n        if window is None:\n            window = self.range\n        stack = self.get_window_stack(window.start)\n        fresh = 0\n        cursor = starts[self.index]\n        while stack:\n            frame = stack[-1]\n            index, child = frame\n            if child != -1 and starts[child] < window.end:\n                frame[1] = tree.next_siblings[child]\n                stack.append([child, tree.first_children[child]])\n                continue\n            level = len(stack) - 1\n            start = cursor if level < fresh else starts[index]\n            if start != ends[index]:\n                tokens = [(index, start, ends[index])]\n                gap_end = start\n                for parent, _ in reversed(stack[fresh:level]):\n                    if starts[parent] != gap_end:\n                        tokens.append((parent, starts[parent], gap_end))\n                        gap_end = starts[parent]\n                if 0 < fresh <= level and cursor != gap_end:\n                    tokens.append((stack[fresh - 1][0], cursor, gap_end))\n                for owner, token_start, token_end in reversed(tokens):\n                    token_start = max(token_start, window.start)\n                    token_end = min(token_end, window.end)\n                    if token_start < token_end:\n                        node = CompactNode(tree, owner)\n                        yield (node.name, token_start, token_end, node)\n                cursor = ends[index]\n                fresh = level + 1\n            stack.pop()\n            fresh = min(fresh, len(stack))\n\n    def get_window_stack(self, position):\n        """\n        The stack that tokenize has when it first reaches a node that ends\n        after position. Everything before it ends at or before position, so\n        it is not visited, and the innermost node that contains position is\n        found with a binary search instead.\n        """\n        tree = self.tree\n        node = self.get_node_at(position)\n        if node is None:\n            if position < tree.starts[self.index]:\n                return [[self.index, tree.first_children[self.index]]]\n            return [[self.index, -1]]\n        chain = [node.index]\n        while chain[-1] != self.index:\n            chain.append(tree.parents[chain[-1]])\n        chain.reverse()\n        stack = [\n            [parent, tree.next_siblings[child]]\n            for parent, child in zip(chain, chain[1:])\n        ]\n        child = bisect.bisect_right(tree.starts, position, lo=node.index)\n        if child == len(tree.starts) or tree.parents[child] != node.index:\n            child = -1\n        stack.append([node.index, child])\n        return stack\n\n    def as_list(self):\n        tree = self.tree\n        result = [self.name, self.value]\n        stack = [(self.index, result)]\n        while stack:\n            index, items = stack.pop()\n            child = tree.first_children[index]\n            while child != -1:\n                child_items = [tree.names[tree.name_ids[child]], tree.values[child]]\n                items.append(child_items)\n                stack.append((child, child_items))\n                child = tree.next_siblings[child]\n        return result\n\n    def pprint(self):\n        stack = [(self, 0)]\n        while stack:\n            node, indentation = stack.pop()\n            print(f"{\'  \'*indentation}{node.name} {node.range}")\n            stack.extend((child, indentation + 1) for child in reversed(node.children))\n\n\nclass Range:\n\n    __slots__ = ["start", "end"]\n\n    def __init__(self, start, end=None):\n        self.start = start\n        if end is None:\n            self.end = start\n        else:\n            self.end = end\n\n    def contains(self, value):\n        if value == self.start == self.end:\n            return True\n        else:\n            return self.start <= value < self.end\n\n    def extend_left(self, amount):\n        self.start -= amount\n\n    def extend_right(self, amount):\n        self.end += amount\n\n    @property\n    def size(self):\n        return self.end - self.start\n\n    def overlap(self, other):\n        """\n        >>> Range(0, 5).overlap(Range(1, 8))\n        Range(1, 5)\n        """\n        if other.end <= self.start:\n            return Range(0, 0)\n        elif other.start >= self.end:\n            return Range(0, 0)\n        else:\n            return Range(max(self.start, other.start), min(self.end, other.end))\n\n    def is_same(self, other):\n        return self.start == other.start and self.end == other.end\n\n    def __repr__(self):\n        return f"Range({self.start!r}, {self.end!r})"\n\n\nclass Edit:\n    """\n    Describes how the source that tree was parsed from changed: the text in\n    range_ was replaced with length new characters.\n    """\n\n    @classmethod\n    def between(cls, tree, old, new):\n        """\n        Describe the change from old to new as a single replaced region:\n\n        >>> edit = Edit.between(None, "[1,2,3]", "[1, 2, 3]")\n        >>> edit.range, edit.length\n        (Range(3, 5), 4)\n        """\n        size = min(len(old), len(new))\n        step = 4096\n        prefix = 0\n        while prefix < size and (\n            old[prefix : prefix + step] == new[prefix : prefix + step]\n        ):\n            prefix += step\n        prefix = min(prefix, size)\n        while prefix < size and old[prefix] == new[prefix]:\n            prefix += 1\n        limit = size - prefix\n        suffix = 0\n        while suffix < limit and (\n            old[max(0, len(old) - suffix - step) : len(old) - suffix]\n            == new[max(0, len(new) - suffix - step) : len(new) - suffix]\n        ):\n            suffix += step\n        suffix = min(suffix, limit)\n        while suffix < limit and (\n            old[len(old) - suffix - 1] == new[len(new) - suffix - 1]\n        ):\n            suffix += 1\n        return cls(tree, Range(prefix, len(old) - suffix), len(new) - prefix - suffix)\n\n    def __init__(self, tree, range_, length):\n        self.tree = tree\n        self.range = range_\n        self.length = length\n\n    def then(self, range_, length):\n        """\n        Combine with a following edit of the changed source into a single\n        edit of the original source:\n\n        >>> edit = Edit(None, Range(2, 4), 3).then(Range(6, 6), 1)\n        >>> edit.range, edit.length\n        (Range(2, 5), 5)\n        """\n        changed_end = self.range.start + self.length\n        start = min(range_.start, self.range.start)\n        end = max(range_.end, changed_end)\n        return Edit(\n            self.tree,\n            Range(start, self.range.end + end - changed_end),\n            end - start - range_.size + length,\n        )\n\n\ndef reparse(edit, source, node_rules):\n    """\n    Re-run the grammar only over the innermost node surrounding the edit\n    and splice the result into the old tree. node_rules maps node names to\n    the rule that produces them.\n\n    Return the updated tree, or None if the edit can not be handled locally\n    and a full parse is needed.\n    """\n    node = edit.tree.find_enclosing(edit.range, node_rules)\n    if node is None:\n        return None\n    rule = node_rules[node.name]\n    end = node.range.end + edit.length - edit.range.size\n    stream = Stream(source, memoize.get(rule.split(".")[0]))\n    stream.index = node.range.start\n    result = rules[rule](stream)\n    if result is FAIL:\n        return None\n    new_node = result.eval(Runtime())\n    if (\n        stream.index != end\n        or new_node.name != node.name\n        or not new_node.range.is_same(Range(node.range.start, end))\n    ):\n        return None\n    node.replace(new_node)\n    return edit.tree\n\n\ndef run_deep(fn, *args, **kwargs):\n    """\n    Call fn on a long-lived thread with a large stack, so that a grammar can\n    match input that nests more deeply than the interpreter stack allows.\n    Calls from several threads take turns, and a call made on that thread\n    runs directly:\n\n    >>> run_deep(sum, [1, 2, 3])\n    6\n    >>> run_deep(run_deep, len, "nested")\n    6\n\n    The first call starts the thread with a stack of DEEP_STACK_SIZE. The\n    recursion limit is raised to DEEP_RECURSION_LIMIT only while fn runs:\n\n    >>> limit = sys.getrecursionlimit()\n    >>> run_deep(sys.getrecursionlimit) == max(limit, DEEP_RECURSION_LIMIT)\n    True\n    >>> sys.getrecursionlimit() == limit\n    True\n\n    The limit is process wide, so code that recurses deeply should run\n    through run_deep rather than on threads with ordinary stacks. Matching\n    one level of nesting takes a few dozen frames, so input can nest some\n    tens of thousands of levels deep before matching it raises\n    RecursionError.\n    """\n    return deep_thread.call(fn, args, kwargs)\n\n\nclass DeepThread:\n\n    def __init__(self):\n        self.lock = threading.Lock()\n        self.requests = queue.Queue()\n        self.thread = None\n\n    def call(self, fn, args, kwargs):\n        if threading.current_thread() is self.thread:\n            return fn(*args, **kwargs)\n        self.start()\n        outcome = queue.Queue()\n        self.requests.put((fn, args, kwargs, outcome))\n        succeeded, value = outcome.get()\n        if not succeeded:\n            raise value\n        return value\n\n    def start(self):\n        with self.lock:\n            if self.thread is None:\n                stack_size = threading.stack_size(DEEP_STACK_SIZE)\n                try:\n                    self.thread = threading.Thread(target=self.run, daemon=True)\n                    self.thread.start()\n                finally:\n                    threading.stack_size(stack_size)\n\n    def run(self):\n        while True:\n            fn, args, kwargs, outcome = self.requests.get()\n            limit = sys.getrecursionlimit()\n            sys.setrecursionlimit(max(limit, DEEP_RECURSION_LIMIT))\n            try:\n                result = (True, fn(*args, **kwargs))\n            except BaseException as e:\n                result = (False, e)\n            finally:\n                sys.setrecursionlimit(limit)\n            outcome.put(result)\n            del fn, args, kwargs, outcome, result\n\n\nDEEP_STACK_SIZE = 512 * 1024 * 1024\nDEEP_RECURSION_LIMIT = 1000000\ndeep_thread = DeepThread()\n\n\ndef compile_chain(grammars, source, explain=True):\n    """\n    Run source through each grammar in turn. A failed match exits with the\n    error. With explain, a failed match is run again without predicted\n    choices so that the error names what every alternative expected. Callers\n    that only need to know that a match failed turn it off to avoid the\n    second run.\n    """\n    import os\n    import sys\n    import pprint\n\n    runtime = Runtime()\n    for rule in grammars:\n        memo_size = memoize.get(rule.split(".")[0])\n        stream = Stream(source, memo_size)\n        result = rules[rule](stream)\n        if result is FAIL and explain:\n            # Predicted choices skip alternatives that can not match, and\n            # with them the errors those would record, so report the error\n            # from trying every alternative.\n            stream = Stream(source, memo_size, predict=False)\n            result = rules[rule](stream)\n        try:\n            if result is FAIL:\n                raise stream.get_error()\n            source = result.eval(runtime)\n        except MatchError as e:\n            marker = "<ERROR POSITION>"\n            if os.isatty(sys.stderr.fileno()):\n                marker = f"\\033[0;31m{marker}\\033[0m"\n            if isinstance(e.items, str):\n                stream_string = e.items[: e.index] + marker + e.items[e.index :]\n            else:\n                stream_string = pprint.pformat(e.items)\n            sys.exit(\n                "ERROR: {}\\nPOSITION: {}\\nSTREAM:\\n{}".format(\n                    str(e), e.index, runtime.indent(stream_string)\n                )\n            )\n    return source\n'
+import array
+import bisect
+import collections
+import marshal
+import queue
+import re
+import sys
+import threading
+
 rules = {}
+memoize = {}
+
+
+FAIL = object()
 
 
 class Stream:
+    """
+    Matchers return FAIL instead of raising when they do not match, and the
+    farthest failure is remembered in latest_error to report if the whole
+    match fails.
+    """
+
+    __slots__ = [
+        "items",
+        "predict",
+        "index",
+        "nesting",
+        "latest_error",
+        "scope",
+        "memo_size",
+        "memo",
+        "seeds",
+    ]
 
-    def __init__(self, items):
+    def __init__(self, items, memo_size=None, predict=True):
         self.items = items
+        self.predict = predict
         self.index = 0
         self.nesting = tuple()
         self.latest_error = None
         self.scope = None
+        self.memo_size = memo_size
+        self.memo = collections.OrderedDict()
+        self.seeds = {}
 
     def operator_or(self, matchers):
         for matcher in matchers:
             backtrack_index = self.index
-            try:
-                return matcher.run(self)
-            except MatchError:
-                self.index = backtrack_index
-        self.error("no or match")
+            result = matcher(self)
+            if result is not FAIL:
+                return result
+            self.index = backtrack_index
+        return self.fail("no or match")
+
+    def operator_dispatch(self, table, default, matchers):
+        indexes = range(len(matchers))
+        if self.predict:
+            if self.index >= len(self.items):
+                indexes = default
+            else:
+                item = self.items[self.index]
+                if isinstance(item, str) and len(item) == 1:
+                    indexes = table.get(item, default)
+        for index in indexes:
+            backtrack_index = self.index
+            result = matchers[index](self)
+            if result is not FAIL:
+                return result
+            self.index = backtrack_index
+        return self.fail("no or match")
 
     def operator_and(self, matchers):
-        result = self.action()
+        result = NONE
         for matcher in matchers:
-            result = matcher.run(self)
+            result = matcher(self)
+            if result is FAIL:
+                return FAIL
         return result
 
     def operator_star(self, matcher):
         results = []
         while True:
             backtrack_index = self.index
-            try:
-                results.append(matcher.run(self))
-            except MatchError:
+            result = matcher(self)
+            if result is FAIL:
                 self.index = backtrack_index
-                return self.action(lambda self: [x.eval(self.runtime) for x in results])
+                return ListAction(results)
+            results.append(result)
 
     def operator_not(self, matcher):
         backtrack_index = self.index
-        try:
-            matcher.run(self)
-        except MatchError:
-            return self.action()
-        finally:
-            self.index = backtrack_index
-        self.error("not matched")
+        result = matcher(self)
+        self.index = backtrack_index
+        if result is FAIL:
+            return NONE
+        return self.fail("not matched")
 
-    def action(self, fn=lambda self: None):
+    def action(self, fn):
         return SemanticAction(self.scope, fn)
 
     def with_scope(self, matcher):
         current_scope = self.scope
         self.scope = {}
-        try:
-            return matcher.run(self)
-        finally:
-            self.scope = current_scope
+        result = matcher(self)
+        self.scope = current_scope
+        return result
 
     def bind(self, name, semantic_action):
-        self.scope[name] = semantic_action
+        if semantic_action is not FAIL:
+            self.scope[name] = semantic_action
         return semantic_action
 
     def match_list(self, matcher):
         if self.index < len(self.items):
             items, index, nesting = self.items, self.index, self.nesting
-            try:
-                self.nesting = self.nesting + (self.index,)
-                self.items = self.items[self.index]
-                self.index = 0
-                result = matcher.run(self)
+            self.nesting = self.nesting + (self.index,)
+            self.items = self.items[self.index]
+            self.index = 0
+            result = matcher(self)
+            if result is not FAIL:
                 index += 1
-            finally:
-                self.items, self.index, self.nesting = items, index, nesting
+            self.items, self.index, self.nesting = items, index, nesting
             return result
-        self.error("no list found")
+        return self.fail("no list found")
 
     def match_range(self, matcher):
         start = self.index
-        matcher.run(self)
+        if matcher(self) is FAIL:
+            return FAIL
         end = self.index
-        return self.action(lambda self: Range(start, end))
+        return ValueAction(Range(start, end))
 
     def match_call_rule(self, namespace):
         try:
             rule_name = self.items[self.index]
         except:
-            self.error(f"Could not extract rule name.")
+            return self.fail(f"Could not extract rule name.")
         if not isinstance(rule_name, str):
-            self.error(f"Match call rule was not a string.")
+            return self.fail(f"Match call rule was not a string.")
         name = namespace + "." + rule_name
         if name in rules:
-            rule = rules[name]
             self.index += 1
-            return rule.run(self)
+            return self.match_rule(name)
         else:
-            self.error("unknown rule")
+            return self.fail("unknown rule")
+
+    def match_rule(self, name):
+        if self.memo_size is None:
+            return rules[name](self)
+        key = (name, self.nesting, self.index)
+        entry = self.memo.get(key)
+        if entry is not None:
+            # A remembered failure already contributed to latest_error, so
+            # it is reported the same as if the rule was run again.
+            result, self.index = entry
+            return result
+        start = self.index
+        result = rules[name](self)
+        if not self.seeds:
+            # Results that depend on a seed that is still growing are not
+            # final.
+            self.remember(key, result, start if result is FAIL else self.index)
+        return result
+
+    def grow_seed(self, name, matcher):
+        """
+        Match a left recursive rule by first matching it with the recursive
+        call failing, and then matching it again with the recursive call
+        giving the previous result for as long as that matches more:
+
+        >>> def number(stream):
+        ...     return stream.match(str.isdigit, "digit")
+        >>> def minus(stream):
+        ...     x = stream.match_rule("Example.minus")
+        ...     if x is FAIL or stream.match_set("-", "'-'") is FAIL:
+        ...         return FAIL
+        ...     y = number(stream)
+        ...     if y is FAIL:
+        ...         return FAIL
+        ...     return stream.action(lambda self: [
+        ...         x.eval(self.runtime), "-", y.eval(self.runtime)
+        ...     ])
+        >>> rules["Example.minus"] = lambda stream: stream.grow_seed(
+        ...     "Example.minus", lambda stream: stream.operator_or([minus, number])
+        ... )
+        >>> stream = Stream("1-2-3")
+        >>> stream.match_rule("Example.minus").eval(Runtime())
+        [['1', '-', '2'], '-', '3']
+        >>> stream.index
+        5
+        >>> del rules["Example.minus"]
+        """
+        key = (name, self.nesting, self.index)
+        if key in self.seeds:
+            result, self.index = self.seeds[key]
+            return result
+        start = self.index
+        self.seeds[key] = (FAIL, start)
+        while True:
+            self.index = start
+            result = matcher(self)
+            seed, end = self.seeds[key]
+            if result is FAIL or (seed is not FAIL and self.index <= end):
+                break
+            self.seeds[key] = (result, self.index)
+        result, self.index = self.seeds.pop(key)
+        return result
+
+    def remember(self, key, result, index):
+        self.memo[key] = (result, index)
+        if len(self.memo) > self.memo_size:
+            # Oldest entries are for positions the parser has most likely
+            # moved past.
+            self.memo.popitem(last=False)
 
     def match(self, fn, description):
         if self.index < len(self.items):
             item = self.items[self.index]
             if fn(item):
                 self.index += 1
-                return self.action(lambda self: item)
-        self.error(f"expected {description}")
+                return ValueAction(item)
+        return self.fail(f"expected {description}")
 
-    def error(self, name):
-        if not self.latest_error or (
-            (self.nesting + (self.index,))
-            > (self.latest_error[3] + (self.latest_error[2],))
+    def match_set(self, items, description):
+        if self.index < len(self.items):
+            item = self.items[self.index]
+            if isinstance(item, str) and item in items:
+                self.index += 1
+                return ValueAction(item)
+        return self.fail(f"expected {description}")
+
+    def match_pattern(self, pattern, matcher):
+        if not isinstance(self.items, str):
+            return matcher(self)
+        start = self.index
+        end = pattern.match(self.items, start).end()
+        if end == start:
+            return matcher(self)
+        self.index = end
+        # The repetition that stops matcher fails here, and running it
+        # records the same error as it would have.
+        matcher(self)
+        return ValueAction(list(self.items[start:end]))
+
+    def fail(self, name):
+        latest = self.latest_error
+        if latest is None or (
+            self.index > latest[2]
+            if not self.nesting and not latest[3]
+            else self.nesting + (self.index,) > latest[3] + (latest[2],)
         ):
             self.latest_error = (name, self.items, self.index, self.nesting)
-        raise MatchError(*self.latest_error[:-1])
+        return FAIL
+
+    def get_error(self):
+        return MatchError(*self.latest_error[:-1])
 
 
 class MatchError(Exception):
@@ -123,6 +268,8 @@ class MatchError(Exception):
 
 class SemanticAction:
 
+    __slots__ = ["scope", "fn", "runtime"]
+
     def __init__(self, scope, fn):
         self.scope = scope
         self.fn = fn
@@ -142,19 +289,80 @@ class SemanticAction:
             return self.runtime.lookup(name)
 
 
+class ValueAction:
+    """
+    The value of something matched that does not depend on the runtime.
+    """
+
+    __slots__ = ["value"]
+
+    def __init__(self, value):
+        self.value = value
+
+    def eval(self, runtime):
+        return self.value
+
+
+class ListAction:
+    """
+    The values of all matches of a repetition.
+    """
+
+    __slots__ = ["actions"]
+
+    def __init__(self, actions):
+        self.actions = actions
+
+    def eval(self, runtime):
+        return [action.eval(runtime) for action in self.actions]
+
+
+NONE = ValueAction(None)
+
+
 class Runtime:
+    """
+    Binding a name gives a new runtime that only holds the new variable
+    and refers to this one for the rest. Chains longer than max_depth are
+    flattened so that looking up a name stays cheap:
+
+    >>> runtime = Runtime().bind("x", 1).bind("y", 2).bind("x", 3)
+    >>> runtime.lookup("x"), runtime.lookup("y"), runtime.lookup("len")
+    (3, 2, <built-in function len>)
+    >>> for index in range(20):
+    ...     runtime = runtime.bind("x", index)
+    >>> runtime.depth <= runtime.max_depth
+    True
+    >>> runtime.lookup("x"), runtime.lookup("y")
+    (19, 2)
+    """
 
-    def __init__(self, extra={"len": len, "repr": repr, "int": int}):
+    max_depth = 8
+
+    def __init__(self, extra={"len": len, "repr": repr, "int": int}, parent=None):
         self.vars = extra
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
 
     def bind(self, name, value):
-        return Runtime(dict(self.vars, **{name: value}))
+        if self.depth < self.max_depth:
+            return Runtime({name: value}, self)
+        vars = {}
+        runtime = self
+        while runtime is not None:
+            for key, item in runtime.vars.items():
+                vars.setdefault(key, item)
+            runtime = runtime.parent
+        vars[name] = value
+        return Runtime(vars)
 
     def lookup(self, name):
-        if name in self.vars:
-            return self.vars[name]
-        else:
-            return getattr(self, name)
+        runtime = self
+        while runtime is not None:
+            if name in runtime.vars:
+                return runtime.vars[name]
+            runtime = runtime.parent
+        return getattr(self, name)
 
     def append(self, list, thing):
         list.append(thing)
@@ -222,14 +430,19 @@ class Runtime:
 
 class Node:
 
+    __slots__ = ["name", "range", "value", "children", "parent", "index", "path"]
+
     def __init__(self, name, start, end, value, children=[]):
         self.name = name
         self.range = Range(start, end)
         self.value = value
         self.children = children
         self.parent = None
-        for child in self.children:
+        self.index = 0
+        self.path = None
+        for index, child in enumerate(self.children):
             child.parent = self
+            child.index = index
 
     def get_first_child(self):
         for child in self.children:
@@ -237,11 +450,47 @@ class Node:
         return self
 
     def get_path(self):
-        if self.parent is None:
-            prefix = []
-        else:
-            prefix = self.parent.get_path()
-        return prefix + [self.name]
+        """
+        Paths are remembered, also for the ancestors on the way up, so they
+        are only worked out once for a node and its siblings:
+
+        >>> tree = Node("Root", 0, 2, "", [
+        ...     Node("A", 0, 1, ""),
+        ...     Node("B", 1, 2, ""),
+        ... ])
+        >>> tree.children[0].get_path()
+        ['Root', 'A']
+        >>> tree.path, tree.children[1].get_depth()
+        (('Root',), 1)
+        """
+        if self.path is None:
+            chain = []
+            node = self
+            while node is not None and node.path is None:
+                chain.append(node)
+                node = node.parent
+            path = () if node is None else node.path
+            for node in reversed(chain):
+                path = path + (node.name,)
+                node.path = path
+        return list(self.path)
+
+    def get_depth(self):
+        if self.path is None:
+            self.get_path()
+        return len(self.path) - 1
+
+    def forget_paths(self):
+        """
+        Forget remembered paths in my subtree. A node only remembers its path
+        if its parent does, so subtrees without paths are skipped.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.path is not None:
+                node.path = None
+                stack.extend(node.children)
 
     def get_next_sibling(self):
         if self.parent is None:
@@ -256,39 +505,634 @@ class Node:
             return self.parent.get_sibling(self, -1)
 
     def get_sibling(self, child, offset):
-        index = 0
-        for index, x in enumerate(self.children):
-            if x is child:
+        return self.children[(child.index + offset) % len(self.children)]
+
+    def shift(self, amount):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node.range.start += amount
+            node.range.end += amount
+            stack.extend(node.children)
+
+    def replace(self, node):
+        """
+        Put node in my place in the tree and shift the ranges of everything
+        after me by the change in size.
+
+        >>> tree = Node("Root", 0, 6, "", [
+        ...     Node("A", 0, 2, ""),
+        ...     Node("B", 2, 4, "", [Node("C", 2, 3, "")]),
+        ...     Node("D", 4, 6, ""),
+        ... ])
+        >>> tree.children[1].children[0].replace(Node("E", 2, 5, ""))
+        >>> tree.pprint()
+        Root Range(0, 8)
+          A Range(0, 2)
+          B Range(2, 6)
+            E Range(2, 5)
+          D Range(6, 8)
+        """
+        amount = node.range.size - self.range.size
+        child = node
+        parent = self.parent
+        index = self.index
+        parent.children[index] = node
+        node.parent = parent
+        node.index = index
+        node.forget_paths()
+        while parent is not None:
+            parent.range.end += amount
+            for sibling in parent.children[index + 1 :]:
+                sibling.shift(amount)
+            child = parent
+            parent = parent.parent
+            index = child.index
+
+    def find_enclosing(self, range_, names):
+        """
+        Find the innermost node, with a name in names, that strictly contains
+        range_. That is, range_ does not touch its first or last position.
+        """
+        found = None
+        node = self
+        while node.range.start < range_.start and range_.end < node.range.end:
+            if node.name in names:
+                found = node
+            index = bisect.bisect_right(
+                node.children, range_.start, key=lambda x: x.range.start
+            )
+            if index == 0:
                 break
-        return self.children[(index + offset) % len(self.children)]
+            node = node.children[index - 1]
+        return found
 
-    def tokenize(self):
-        pos = self.range.start
-        result = []
-        for child in self.children:
-            for name, child_start, child_end, d in child.tokenize():
-                if pos != child_start:
-                    result.append([self.name, pos, child_start, self])
-                result.append([name, child_start, child_end, d])
-                pos = child_end
-        if pos != self.range.end:
-            result.append([self.name, pos, self.range.end, self])
+    def tokenize(self, window=None):
+        """
+        Split my range into tokens, each covered by the innermost node that
+        has no child covering it, and yield them as (name, start, end, node):
+
+        >>> tree = Node("Root", 0, 8, "", [
+        ...     Node("A", 1, 3, "", [Node("B", 2, 3, "")]),
+        ...     Node("C", 5, 5, ""),
+        ... ])
+        >>> for token in tree.tokenize():
+        ...     print(token[:3])
+        ('Root', 0, 1)
+        ('A', 1, 2)
+        ('B', 2, 3)
+        ('Root', 3, 8)
+
+        With a window, only the parts of tokens inside window are yielded,
+        and nodes outside of it are not visited:
+
+        >>> for token in tree.tokenize(Range(2, 6)):
+        ...     print(token[:3])
+        ('B', 2, 3)
+        ('Root', 3, 6)
+
+        Nodes are visited with an explicit stack, so how deep a tree can be
+        is not limited by the interpreter stack. Levels of the stack from
+        fresh and up have not produced a token yet, and all other levels
+        have produced the token that ends at cursor.
+        """
+        if window is None:
+            window = self.range
+        stack = [[self, self.get_first_child_index(window.start)]]
+        fresh = 0
+        cursor = self.range.start
+        while stack:
+            frame = stack[-1]
+            node, index = frame
+            if (
+                index < len(node.children)
+                and node.children[index].range.start < window.end
+            ):
+                child = node.children[index]
+                frame[1] += 1
+                stack.append([child, child.get_first_child_index(window.start)])
+                continue
+            level = len(stack) - 1
+            start = cursor if level < fresh else node.range.start
+            if start != node.range.end:
+                tokens = [(node.name, start, node.range.end, node)]
+                gap_end = start
+                for parent, _ in reversed(stack[fresh:level]):
+                    if parent.range.start != gap_end:
+                        tokens.append(
+                            (parent.name, parent.range.start, gap_end, parent)
+                        )
+                        gap_end = parent.range.start
+                if 0 < fresh <= level and cursor != gap_end:
+                    parent = stack[fresh - 1][0]
+                    tokens.append((parent.name, cursor, gap_end, parent))
+                for name, token_start, token_end, owner in reversed(tokens):
+                    token_start = max(token_start, window.start)
+                    token_end = min(token_end, window.end)
+                    if token_start < token_end:
+                        yield (name, token_start, token_end, owner)
+                cursor = node.range.end
+                fresh = level + 1
+            stack.pop()
+            fresh = min(fresh, len(stack))
+
+    def get_first_child_index(self, position):
+        """
+        Index of the first child that ends after position.
+        """
+        return bisect.bisect_right(self.children, position, key=lambda x: x.range.end)
+
+    def get_node_at(self, position):
+        """
+        The innermost node in my subtree that contains position, or None:
+
+        >>> tree = Node("Root", 0, 8, "", [
+        ...     Node("A", 1, 3, "", [Node("B", 2, 3, "")]),
+        ...     Node("C", 5, 5, ""),
+        ... ])
+        >>> [getattr(tree.get_node_at(x), "name", None) for x in [0, 2, 3, 5, 8]]
+        ['Root', 'B', 'Root', 'Root', None]
+        """
+        if not self.range.start <= position < self.range.end:
+            return None
+        node = self
+        while True:
+            index = bisect.bisect_right(
+                node.children, position, key=lambda x: x.range.start
+            )
+            if index == 0 or node.children[index - 1].range.end <= position:
+                return node
+            node = node.children[index - 1]
+
+    def as_list(self):
+        result = [self.name, self.value]
+        stack = [(self, result)]
+        while stack:
+            node, items = stack.pop()
+            for child in node.children:
+                child_items = [child.name, child.value]
+                items.append(child_items)
+                stack.append((child, child_items))
         return result
 
+    def pprint(self):
+        stack = [(self, 0)]
+        while stack:
+            node, indentation = stack.pop()
+            print(f"{'  '*indentation}{node.name} {node.range}")
+            stack.extend((child, indentation + 1) for child in reversed(node.children))
+
+
+class CompactTree:
+    """
+    A read only tree stored in parallel arrays with one entry per node, in
+    the order nodes start. Nodes are handed out as CompactNode views with
+    the same interface as Node, so a large document does not need a Python
+    object per node:
+
+    >>> tree = CompactTree.from_node(Node("Root", 0, 8, "", [
+    ...     Node("A", 1, 3, "a", [Node("B", 2, 3, "")]),
+    ...     Node("C", 5, 5, ""),
+    ... ]))
+    >>> root = tree.get_root()
+    >>> root.pprint()
+    Root Range(0, 8)
+      A Range(1, 3)
+        B Range(2, 3)
+      C Range(5, 5)
+    >>> root.as_list()
+    ['Root', '', ['A', 'a', ['B', '']], ['C', '']]
+    >>> for token in root.tokenize():
+    ...     print(token[:3])
+    ('Root', 0, 1)
+    ('A', 1, 2)
+    ('B', 2, 3)
+    ('Root', 3, 8)
+    >>> node = root.get_first_child().get_first_child()
+    >>> node.get_path()
+    ['Root', 'A', 'B']
+    >>> node.parent.get_next_sibling().name
+    'C'
+    >>> node.parent.get_previous_sibling() == node.parent.get_next_sibling()
+    True
+
+    Trees can be stored as bytes and turned back into nodes:
+
+    >>> CompactTree.from_bytes(tree.to_bytes()).to_node().pprint()
+    Root Range(0, 8)
+      A Range(1, 3)
+        B Range(2, 3)
+      C Range(5, 5)
+    """
+
+    ARRAYS = [
+        "name_ids",
+        "starts",
+        "ends",
+        "parents",
+        "first_children",
+        "last_children",
+        "next_siblings",
+        "previous_siblings",
+    ]
+
+    @classmethod
+    def from_node(cls, root):
+        tree = cls()
+        stack = [(root, -1)]
+        while stack:
+            node, parent = stack.pop()
+            index = tree.add(
+                node.name, node.range.start, node.range.end, node.value, parent
+            )
+            stack.extend((child, index) for child in reversed(node.children))
+        return tree
+
+    @classmethod
+    def from_bytes(cls, data):
+        names, values, *arrays = marshal.loads(data)
+        tree = cls()
+        tree.names = names
+        tree.name_lookup = {name: index for index, name in enumerate(names)}
+        tree.values = values
+        for name, items in zip(cls.ARRAYS, arrays):
+            getattr(tree, name).frombytes(items)
+        return tree
+
+    def __init__(self):
+        self.names = []
+        self.name_lookup = {}
+        self.name_ids = array.array("i")
+        self.starts = array.array("q")
+        self.ends = array.array("q")
+        self.values = []
+        self.parents = array.array("i")
+        self.first_children = array.array("i")
+        self.last_children = array.array("i")
+        self.next_siblings = array.array("i")
+        self.previous_siblings = array.array("i")
+
+    def add(self, name, start, end, value, parent):
+        """
+        Add a node as the last child of parent, or as the root if parent is
+        -1, and return its index.
+        """
+        index = len(self.starts)
+        self.name_ids.append(self.get_name_id(name))
+        self.starts.append(start)
+        self.ends.append(end)
+        self.values.append(value)
+        self.parents.append(parent)
+        self.first_children.append(-1)
+        self.last_children.append(-1)
+        self.next_siblings.append(-1)
+        previous = -1
+        if parent != -1:
+            previous = self.last_children[parent]
+            if previous == -1:
+                self.first_children[parent] = index
+            else:
+                self.next_siblings[previous] = index
+            self.last_children[parent] = index
+        self.previous_siblings.append(previous)
+        return index
+
+    def get_name_id(self, name):
+        if name not in self.name_lookup:
+            self.name_lookup[name] = len(self.names)
+            self.names.append(name)
+        return self.name_lookup[name]
+
+    def get_root(self):
+        return CompactNode(self, 0)
+
+    def copy(self):
+        tree = CompactTree()
+        tree.names = list(self.names)
+        tree.name_lookup = dict(self.name_lookup)
+        tree.values = list(self.values)
+        for name in self.ARRAYS:
+            items = getattr(self, name)
+            setattr(tree, name, array.array(items.typecode, items))
+        return tree
+
+    def replace(self, index, node):
+        """
+        Put node, a Node, in place of the subtree at index and shift the
+        ranges of everything after it by the change in size. The new nodes
+        are spliced into the arrays where the subtree was, so indices after
+        it move by the change in node count and views of them are stale:
+
+        >>> tree = CompactTree.from_node(Node("Root", 0, 6, "", [
+        ...     Node("A", 0, 2, ""),
+        ...     Node("B", 2, 4, "", [Node("C", 2, 3, "")]),
+        ...     Node("D", 4, 6, "", [Node("E", 4, 5, "")]),
+        ... ]))
+        >>> tree.replace(2, Node("F", 2, 5, "", [
+        ...     Node("G", 2, 3, ""),
+        ...     Node("H", 3, 5, ""),
+        ... ]))
+        >>> tree.get_root().pprint()
+        Root Range(0, 7)
+          A Range(0, 2)
+          F Range(2, 5)
+            G Range(2, 3)
+            H Range(3, 5)
+          D Range(5, 7)
+            E Range(5, 6)
+        >>> tree.get_root().children[2].get_previous_sibling().name
+        'F'
+        """
+        new = CompactTree.from_node(node)
+        end = self.get_subtree_end(index)
+        shift = len(new.starts) - (end - index)
+        amount = new.ends[0] - new.starts[0] - (self.ends[index] - self.starts[index])
+        if shift != 0:
+            for name in self.ARRAYS[3:]:
+                items = getattr(self, name)
+                items[:] = array.array(
+                    items.typecode, [x + shift if x >= end else x for x in items]
+                )
+        links = {}
+        for name in self.ARRAYS[3:]:
+            links[name] = array.array(
+                "i", [-1 if x == -1 else x + index for x in getattr(new, name)]
+            )
+        links["parents"][0] = self.parents[index]
+        links["next_siblings"][0] = self.next_siblings[index]
+        links["previous_siblings"][0] = self.previous_siblings[index]
+        self.name_ids[index:end] = array.array(
+            "i", [self.get_name_id(new.names[x]) for x in new.name_ids]
+        )
+        self.starts[index:end] = new.starts
+        self.ends[index:end] = new.ends
+        self.values[index:end] = new.values
+        for name in self.ARRAYS[3:]:
+            getattr(self, name)[index:end] = links[name]
+        if amount != 0:
+            after = index + len(new.starts)
+            for items in [self.starts, self.ends]:
+                items[after:] = array.array("q", [x + amount for x in items[after:]])
+            parent = self.parents[index]
+            while parent != -1:
+                self.ends[parent] += amount
+                parent = self.parents[parent]
+
+    def get_subtree_end(self, index):
+        """
+        The index after the last node in the subtree at index, which is the
+        next sibling of the node or of its closest ancestor that has one.
+        """
+        while index != -1:
+            if self.next_siblings[index] != -1:
+                return self.next_siblings[index]
+            index = self.parents[index]
+        return len(self.starts)
+
+    def to_bytes(self):
+        """
+        Raises ValueError if a value is not of a type that marshal handles.
+        """
+        return marshal.dumps(
+            [self.names, self.values]
+            + [getattr(self, name).tobytes() for name in self.ARRAYS]
+        )
+
+    def to_node(self):
+        """
+        Build Node objects for the whole tree. Children come after their
+        parent, so going backwards all children are built before the parent.
+        """
+        nodes = [None] * len(self.starts)
+        for index in reversed(range(len(self.starts))):
+            children = []
+            child = self.first_children[index]
+            while child != -1:
+                children.append(nodes[child])
+                child = self.next_siblings[child]
+            nodes[index] = Node(
+                self.names[self.name_ids[index]],
+                self.starts[index],
+                self.ends[index],
+                self.values[index],
+                children,
+            )
+        return nodes[0]
+
+
+class CompactNode:
+    """
+    A node in a CompactTree. Views are created on demand, so they are
+    compared with == rather than is.
+    """
+
+    __slots__ = ["tree", "index"]
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, CompactNode)
+            and other.tree is self.tree
+            and other.index == self.index
+        )
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    @property
+    def name(self):
+        return self.tree.names[self.tree.name_ids[self.index]]
+
+    @property
+    def range(self):
+        return Range(self.tree.starts[self.index], self.tree.ends[self.index])
+
+    @property
+    def value(self):
+        return self.tree.values[self.index]
+
+    @property
+    def parent(self):
+        return self.view(self.tree.parents[self.index])
+
+    @property
+    def children(self):
+        children = []
+        child = self.tree.first_children[self.index]
+        while child != -1:
+            children.append(CompactNode(self.tree, child))
+            child = self.tree.next_siblings[child]
+        return children
+
+    def view(self, index):
+        if index == -1:
+            return None
+        return CompactNode(self.tree, index)
+
+    def get_first_child(self):
+        return self.view(self.tree.first_children[self.index]) or self
+
+    def get_path(self):
+        path = []
+        index = self.index
+        while index != -1:
+            path.append(self.tree.names[self.tree.name_ids[index]])
+            index = self.tree.parents[index]
+        path.reverse()
+        return path
+
+    def get_depth(self):
+        return len(self.get_path()) - 1
+
+    def get_node_at(self, position):
+        """
+        The innermost node in my subtree that contains position, or None.
+        Nodes are stored in the order they start, so the last one that starts
+        at or before position is inside that node, or is that node.
+        """
+        tree = self.tree
+        if not tree.starts[self.index] <= position < tree.ends[self.index]:
+            return None
+        index = bisect.bisect_right(tree.starts, position, lo=self.index) - 1
+        while not tree.starts[index] <= position < tree.ends[index]:
+            index = tree.parents[index]
+        return CompactNode(tree, index)
+
+    def find_enclosing(self, range_, names):
+        """
+        Same as Node.find_enclosing. Every node that strictly contains range_
+        is an ancestor of the last node that starts before range_, so they
+        are found by walking up from it.
+        """
+        tree = self.tree
+        index = bisect.bisect_left(tree.starts, range_.start, lo=self.index) - 1
+        while index >= self.index:
+            if (
+                range_.end < tree.ends[index]
+                and tree.names[tree.name_ids[index]] in names
+            ):
+                return CompactNode(tree, index)
+            index = tree.parents[index]
+        return None
+
+    def replace(self, node):
+        self.tree.replace(self.index, node)
+
+    def get_next_sibling(self):
+        parent = self.tree.parents[self.index]
+        if parent == -1:
+            return self
+        sibling = self.tree.next_siblings[self.index]
+        if sibling == -1:
+            sibling = self.tree.first_children[parent]
+        return CompactNode(self.tree, sibling)
+
+    def get_previous_sibling(self):
+        parent = self.tree.parents[self.index]
+        if parent == -1:
+            return self
+        sibling = self.tree.previous_siblings[self.index]
+        if sibling == -1:
+            sibling = self.tree.last_children[parent]
+        return CompactNode(self.tree, sibling)
+
+    def tokenize(self, window=None):
+        """
+        The same walk as Node.tokenize, over the arrays of the tree.
+        """
+        tree = self.tree
+        starts = tree.starts
+        ends = tree.ends
+        if window is None:
+            window = self.range
+        stack = self.get_window_stack(window.start)
+        fresh = 0
+        cursor = starts[self.index]
+        while stack:
+            frame = stack[-1]
+            index, child = frame
+            if child != -1 and starts[child] < window.end:
+                frame[1] = tree.next_siblings[child]
+                stack.append([child, tree.first_children[child]])
+                continue
+            level = len(stack) - 1
+            start = cursor if level < fresh else starts[index]
+            if start != ends[index]:
+                tokens = [(index, start, ends[index])]
+                gap_end = start
+                for parent, _ in reversed(stack[fresh:level]):
+                    if starts[parent] != gap_end:
+                        tokens.append((parent, starts[parent], gap_end))
+                        gap_end = starts[parent]
+                if 0 < fresh <= level and cursor != gap_end:
+                    tokens.append((stack[fresh - 1][0], cursor, gap_end))
+                for owner, token_start, token_end in reversed(tokens):
+                    token_start = max(token_start, window.start)
+                    token_end = min(token_end, window.end)
+                    if token_start < token_end:
+                        node = CompactNode(tree, owner)
+                        yield (node.name, token_start, token_end, node)
+                cursor = ends[index]
+                fresh = level + 1
+            stack.pop()
+            fresh = min(fresh, len(stack))
+
+    def get_window_stack(self, position):
+        """
+        The stack that tokenize has when it first reaches a node that ends
+        after position. Everything before it ends at or before position, so
+        it is not visited, and the innermost node that contains position is
+        found with a binary search instead.
+        """
+        tree = self.tree
+        node = self.get_node_at(position)
+        if node is None:
+            if position < tree.starts[self.index]:
+                return [[self.index, tree.first_children[self.index]]]
+            return [[self.index, -1]]
+        chain = [node.index]
+        while chain[-1] != self.index:
+            chain.append(tree.parents[chain[-1]])
+        chain.reverse()
+        stack = [
+            [parent, tree.next_siblings[child]]
+            for parent, child in zip(chain, chain[1:])
+        ]
+        child = bisect.bisect_right(tree.starts, position, lo=node.index)
+        if child == len(tree.starts) or tree.parents[child] != node.index:
+            child = -1
+        stack.append([node.index, child])
+        return stack
+
     def as_list(self):
-        return [
-            self.name,
-            self.value,
-        ] + [child.as_list() for child in self.children]
+        tree = self.tree
+        result = [self.name, self.value]
+        stack = [(self.index, result)]
+        while stack:
+            index, items = stack.pop()
+            child = tree.first_children[index]
+            while child != -1:
+                child_items = [tree.names[tree.name_ids[child]], tree.values[child]]
+                items.append(child_items)
+                stack.append((child, child_items))
+                child = tree.next_siblings[child]
+        return result
 
-    def pprint(self, indentation=0):
-        print(f"{'  '*indentation}{self.name} {self.range}")
-        for child in self.children:
-            child.pprint(indentation + 1)
+    def pprint(self):
+        stack = [(self, 0)]
+        while stack:
+            node, indentation = stack.pop()
+            print(f"{'  '*indentation}{node.name} {node.range}")
+            stack.extend((child, indentation + 1) for child in reversed(node.children))
 
 
 class Range:
 
+    __slots__ = ["start", "end"]
+
     def __init__(self, start, end=None):
         self.start = start
         if end is None:
@@ -331,15 +1175,204 @@ class Range:
         return f"Range({self.start!r}, {self.end!r})"
 
 
-def compile_chain(grammars, source):
+class Edit:
+    """
+    Describes how the source that tree was parsed from changed: the text in
+    range_ was replaced with length new characters.
+    """
+
+    @classmethod
+    def between(cls, tree, old, new):
+        """
+        Describe the change from old to new as a single replaced region:
+
+        >>> edit = Edit.between(None, "[1,2,3]", "[1, 2, 3]")
+        >>> edit.range, edit.length
+        (Range(3, 5), 4)
+        """
+        size = min(len(old), len(new))
+        step = 4096
+        prefix = 0
+        while prefix < size and (
+            old[prefix : prefix + step] == new[prefix : prefix + step]
+        ):
+            prefix += step
+        prefix = min(prefix, size)
+        while prefix < size and old[prefix] == new[prefix]:
+            prefix += 1
+        limit = size - prefix
+        suffix = 0
+        while suffix < limit and (
+            old[max(0, len(old) - suffix - step) : len(old) - suffix]
+            == new[max(0, len(new) - suffix - step) : len(new) - suffix]
+        ):
+            suffix += step
+        suffix = min(suffix, limit)
+        while suffix < limit and (
+            old[len(old) - suffix - 1] == new[len(new) - suffix - 1]
+        ):
+            suffix += 1
+        return cls(tree, Range(prefix, len(old) - suffix), len(new) - prefix - suffix)
+
+    def __init__(self, tree, range_, length):
+        self.tree = tree
+        self.range = range_
+        self.length = length
+
+    def then(self, range_, length):
+        """
+        Combine with a following edit of the changed source into a single
+        edit of the original source:
+
+        >>> edit = Edit(None, Range(2, 4), 3).then(Range(6, 6), 1)
+        >>> edit.range, edit.length
+        (Range(2, 5), 5)
+        """
+        changed_end = self.range.start + self.length
+        start = min(range_.start, self.range.start)
+        end = max(range_.end, changed_end)
+        return Edit(
+            self.tree,
+            Range(start, self.range.end + end - changed_end),
+            end - start - range_.size + length,
+        )
+
+
+def reparse(edit, source, node_rules):
+    """
+    Re-run the grammar only over the innermost node surrounding the edit
+    and splice the result into the old tree. node_rules maps node names to
+    the rule that produces them.
+
+    Return the updated tree, or None if the edit can not be handled locally
+    and a full parse is needed.
+    """
+    node = edit.tree.find_enclosing(edit.range, node_rules)
+    if node is None:
+        return None
+    rule = node_rules[node.name]
+    end = node.range.end + edit.length - edit.range.size
+    stream = Stream(source, memoize.get(rule.split(".")[0]))
+    stream.index = node.range.start
+    result = rules[rule](stream)
+    if result is FAIL:
+        return None
+    new_node = result.eval(Runtime())
+    if (
+        stream.index != end
+        or new_node.name != node.name
+        or not new_node.range.is_same(Range(node.range.start, end))
+    ):
+        return None
+    node.replace(new_node)
+    return edit.tree
+
+
+def run_deep(fn, *args, **kwargs):
+    """
+    Call fn on a long-lived thread with a large stack, so that a grammar can
+    match input that nests more deeply than the interpreter stack allows.
+    Calls from several threads take turns, and a call made on that thread
+    runs directly:
+
+    >>> run_deep(sum, [1, 2, 3])
+    6
+    >>> run_deep(run_deep, len, "nested")
+    6
+
+    The first call starts the thread with a stack of DEEP_STACK_SIZE. The
+    recursion limit is raised to DEEP_RECURSION_LIMIT only while fn runs:
+
+    >>> limit = sys.getrecursionlimit()
+    >>> run_deep(sys.getrecursionlimit) == max(limit, DEEP_RECURSION_LIMIT)
+    True
+    >>> sys.getrecursionlimit() == limit
+    True
+
+    The limit is process wide, so code that recurses deeply should run
+    through run_deep rather than on threads with ordinary stacks. Matching
+    one level of nesting takes a few dozen frames, so input can nest some
+    tens of thousands of levels deep before matching it raises
+    RecursionError.
+    """
+    return deep_thread.call(fn, args, kwargs)
+
+
+class DeepThread:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = queue.Queue()
+        self.thread = None
+
+    def call(self, fn, args, kwargs):
+        if threading.current_thread() is self.thread:
+            return fn(*args, **kwargs)
+        self.start()
+        outcome = queue.Queue()
+        self.requests.put((fn, args, kwargs, outcome))
+        succeeded, value = outcome.get()
+        if not succeeded:
+            raise value
+        return value
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                stack_size = threading.stack_size(DEEP_STACK_SIZE)
+                try:
+                    self.thread = threading.Thread(target=self.run, daemon=True)
+                    self.thread.start()
+                finally:
+                    threading.stack_size(stack_size)
+
+    def run(self):
+        while True:
+            fn, args, kwargs, outcome = self.requests.get()
+            limit = sys.getrecursionlimit()
+            sys.setrecursionlimit(max(limit, DEEP_RECURSION_LIMIT))
+            try:
+                result = (True, fn(*args, **kwargs))
+            except BaseException as e:
+                result = (False, e)
+            finally:
+                sys.setrecursionlimit(limit)
+            outcome.put(result)
+            del fn, args, kwargs, outcome, result
+
+
+DEEP_STACK_SIZE = 512 * 1024 * 1024
+DEEP_RECURSION_LIMIT = 1000000
+deep_thread = DeepThread()
+
+
+def compile_chain(grammars, source, explain=True):
+    """
+    Run source through each grammar in turn. A failed match exits with the
+    error. With explain, a failed match is run again without predicted
+    choices so that the error names what every alternative expected. Callers
+    that only need to know that a match failed turn it off to avoid the
+    second run.
+    """
     import os
     import sys
     import pprint
 
     runtime = Runtime()
     for rule in grammars:
+        memo_size = memoize.get(rule.split(".")[0])
+        stream = Stream(source, memo_size)
+        result = rules[rule](stream)
+        if result is FAIL and explain:
+            # Predicted choices skip alternatives that can not match, and
+            # with them the errors those would record, so report the error
+            # from trying every alternative.
+            stream = Stream(source, memo_size, predict=False)
+            result = rules[rule](stream)
         try:
-            source = rules[rule].run(Stream(source)).eval(runtime)
+            if result is FAIL:
+                raise stream.get_error()
+            source = result.eval(runtime)
         except MatchError as e:
             marker = "<ERROR POSITION>"
             if os.isatty(sys.stderr.fileno()):
@@ -356,28 +1389,28 @@ def compile_chain(grammars, source):
     return source
 class Matcher_Parser_0:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_1:
     def run(self, stream):
-        return rules['Parser.namespace'].run(stream)
+        return stream.match_rule('Parser.namespace')
 class Matcher_Parser_2:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_1())
+        return stream.operator_star(Matcher_Parser_1().run)
 class Matcher_Parser_3:
     def run(self, stream):
         return stream.bind('xs', Matcher_Parser_2().run(stream))
 class Matcher_Parser_4:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_5:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_3(),
-            Matcher_Parser_4()
+            Matcher_Parser_3().run,
+            Matcher_Parser_4().run
         ])
 class Matcher_Parser_6:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_5())
+        return stream.match_range(Matcher_Parser_5().run)
 class Matcher_Parser_7:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_6().run(stream))
@@ -386,7 +1419,7 @@ class Matcher_Parser_8:
         return stream.match(lambda item: True, 'any')
 class Matcher_Parser_9:
     def run(self, stream):
-        return stream.operator_not(Matcher_Parser_8())
+        return stream.operator_not(Matcher_Parser_8().run)
 class Matcher_Parser_10:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('Node')(
@@ -398,72 +1431,72 @@ class Matcher_Parser_10:
 class Matcher_Parser_11:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_0(),
-            Matcher_Parser_7(),
-            Matcher_Parser_9(),
-            Matcher_Parser_10()
+            Matcher_Parser_0().run,
+            Matcher_Parser_7().run,
+            Matcher_Parser_9().run,
+            Matcher_Parser_10().run
         ])
 class Matcher_Parser_12:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_11())
+        return stream.with_scope(Matcher_Parser_11().run)
 class Matcher_Parser_13:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_12()
+            Matcher_Parser_12().run
         ])
 class Matcher_Parser_14:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_15:
     def run(self, stream):
-        return rules['Parser.name'].run(stream)
+        return stream.match_rule('Parser.name')
 class Matcher_Parser_16:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_15().run(stream))
 class Matcher_Parser_17:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_18:
     def run(self, stream):
         return stream.match(lambda item: item == '{', "'{'")
 class Matcher_Parser_19:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_18()
+            Matcher_Parser_18().run
         ])
 class Matcher_Parser_20:
     def run(self, stream):
-        return rules['Parser.rule'].run(stream)
+        return stream.match_rule('Parser.rule')
 class Matcher_Parser_21:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_20())
+        return stream.operator_star(Matcher_Parser_20().run)
 class Matcher_Parser_22:
     def run(self, stream):
         return stream.bind('ys', Matcher_Parser_21().run(stream))
 class Matcher_Parser_23:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_24:
     def run(self, stream):
         return stream.match(lambda item: item == '}', "'}'")
 class Matcher_Parser_25:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_24()
+            Matcher_Parser_24().run
         ])
 class Matcher_Parser_26:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_16(),
-            Matcher_Parser_17(),
-            Matcher_Parser_19(),
-            Matcher_Parser_22(),
-            Matcher_Parser_23(),
-            Matcher_Parser_25()
+            Matcher_Parser_16().run,
+            Matcher_Parser_17().run,
+            Matcher_Parser_19().run,
+            Matcher_Parser_22().run,
+            Matcher_Parser_23().run,
+            Matcher_Parser_25().run
         ])
 class Matcher_Parser_27:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_26())
+        return stream.match_range(Matcher_Parser_26().run)
 class Matcher_Parser_28:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_27().run(stream))
@@ -478,55 +1511,55 @@ class Matcher_Parser_29:
 class Matcher_Parser_30:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_14(),
-            Matcher_Parser_28(),
-            Matcher_Parser_29()
+            Matcher_Parser_14().run,
+            Matcher_Parser_28().run,
+            Matcher_Parser_29().run
         ])
 class Matcher_Parser_31:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_30())
+        return stream.with_scope(Matcher_Parser_30().run)
 class Matcher_Parser_32:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_31()
+            Matcher_Parser_31().run
         ])
 class Matcher_Parser_33:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_34:
     def run(self, stream):
-        return rules['Parser.name'].run(stream)
+        return stream.match_rule('Parser.name')
 class Matcher_Parser_35:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_34().run(stream))
 class Matcher_Parser_36:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_37:
     def run(self, stream):
         return stream.match(lambda item: item == '=', "'='")
 class Matcher_Parser_38:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_37()
+            Matcher_Parser_37().run
         ])
 class Matcher_Parser_39:
     def run(self, stream):
-        return rules['Parser.choice'].run(stream)
+        return stream.match_rule('Parser.choice')
 class Matcher_Parser_40:
     def run(self, stream):
         return stream.bind('y', Matcher_Parser_39().run(stream))
 class Matcher_Parser_41:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_35(),
-            Matcher_Parser_36(),
-            Matcher_Parser_38(),
-            Matcher_Parser_40()
+            Matcher_Parser_35().run,
+            Matcher_Parser_36().run,
+            Matcher_Parser_38().run,
+            Matcher_Parser_40().run
         ])
 class Matcher_Parser_42:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_41())
+        return stream.match_range(Matcher_Parser_41().run)
 class Matcher_Parser_43:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_42().run(stream))
@@ -543,42 +1576,43 @@ class Matcher_Parser_44:
 class Matcher_Parser_45:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_33(),
-            Matcher_Parser_43(),
-            Matcher_Parser_44()
+            Matcher_Parser_33().run,
+            Matcher_Parser_43().run,
+            Matcher_Parser_44().run
         ])
 class Matcher_Parser_46:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_45())
+        return stream.with_scope(Matcher_Parser_45().run)
 class Matcher_Parser_47:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_46()
+            Matcher_Parser_46().run
         ])
+TABLE_Parser_0 = {'\n': (0, 1), ' ': (0, 1), '|': (0, 1)}
 class Matcher_Parser_48:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_49:
     def run(self, stream):
         return stream.match(lambda item: item == '|', "'|'")
 class Matcher_Parser_50:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_49()
+            Matcher_Parser_49().run
         ])
 class Matcher_Parser_51:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_48(),
-            Matcher_Parser_50()
+            Matcher_Parser_48().run,
+            Matcher_Parser_50().run
         ])
 class Matcher_Parser_52:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_51())
+        return stream.with_scope(Matcher_Parser_51().run)
 class Matcher_Parser_53:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_52()
+            Matcher_Parser_52().run
         ])
 class Matcher_Parser_54:
     def run(self, stream):
@@ -587,61 +1621,61 @@ class Matcher_Parser_54:
         ])
 class Matcher_Parser_55:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_53(),
-            Matcher_Parser_54()
+        return stream.operator_dispatch(TABLE_Parser_0, (1,), [
+            Matcher_Parser_53().run,
+            Matcher_Parser_54().run
         ])
 class Matcher_Parser_56:
     def run(self, stream):
-        return rules['Parser.sequence'].run(stream)
+        return stream.match_rule('Parser.sequence')
 class Matcher_Parser_57:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_56().run(stream))
 class Matcher_Parser_58:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_59:
     def run(self, stream):
         return stream.match(lambda item: item == '|', "'|'")
 class Matcher_Parser_60:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_59()
+            Matcher_Parser_59().run
         ])
 class Matcher_Parser_61:
     def run(self, stream):
-        return rules['Parser.sequence'].run(stream)
+        return stream.match_rule('Parser.sequence')
 class Matcher_Parser_62:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_58(),
-            Matcher_Parser_60(),
-            Matcher_Parser_61()
+            Matcher_Parser_58().run,
+            Matcher_Parser_60().run,
+            Matcher_Parser_61().run
         ])
 class Matcher_Parser_63:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_62())
+        return stream.with_scope(Matcher_Parser_62().run)
 class Matcher_Parser_64:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_63()
+            Matcher_Parser_63().run
         ])
 class Matcher_Parser_65:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_64())
+        return stream.operator_star(Matcher_Parser_64().run)
 class Matcher_Parser_66:
     def run(self, stream):
         return stream.bind('xs', Matcher_Parser_65().run(stream))
 class Matcher_Parser_67:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_55(),
-            Matcher_Parser_57(),
-            Matcher_Parser_66()
+            Matcher_Parser_55().run,
+            Matcher_Parser_57().run,
+            Matcher_Parser_66().run
         ])
 class Matcher_Parser_68:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_67())
+        return stream.match_range(Matcher_Parser_67().run)
 class Matcher_Parser_69:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_68().run(stream))
@@ -659,61 +1693,61 @@ class Matcher_Parser_70:
 class Matcher_Parser_71:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_69(),
-            Matcher_Parser_70()
+            Matcher_Parser_69().run,
+            Matcher_Parser_70().run
         ])
 class Matcher_Parser_72:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_71())
+        return stream.with_scope(Matcher_Parser_71().run)
 class Matcher_Parser_73:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_72()
+            Matcher_Parser_72().run
         ])
 class Matcher_Parser_74:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_75:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_76:
     def run(self, stream):
-        return rules['Parser.expr'].run(stream)
+        return stream.match_rule('Parser.expr')
 class Matcher_Parser_77:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_75(),
-            Matcher_Parser_76()
+            Matcher_Parser_75().run,
+            Matcher_Parser_76().run
         ])
 class Matcher_Parser_78:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_77())
+        return stream.with_scope(Matcher_Parser_77().run)
 class Matcher_Parser_79:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_78()
+            Matcher_Parser_78().run
         ])
 class Matcher_Parser_80:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_79())
+        return stream.operator_star(Matcher_Parser_79().run)
 class Matcher_Parser_81:
     def run(self, stream):
         return stream.bind('xs', Matcher_Parser_80().run(stream))
 class Matcher_Parser_82:
     def run(self, stream):
-        return rules['Parser.maybeAction'].run(stream)
+        return stream.match_rule('Parser.maybeAction')
 class Matcher_Parser_83:
     def run(self, stream):
         return stream.bind('ys', Matcher_Parser_82().run(stream))
 class Matcher_Parser_84:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_81(),
-            Matcher_Parser_83()
+            Matcher_Parser_81().run,
+            Matcher_Parser_83().run
         ])
 class Matcher_Parser_85:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_84())
+        return stream.match_range(Matcher_Parser_84().run)
 class Matcher_Parser_86:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_85().run(stream))
@@ -738,56 +1772,57 @@ class Matcher_Parser_87:
 class Matcher_Parser_88:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_74(),
-            Matcher_Parser_86(),
-            Matcher_Parser_87()
+            Matcher_Parser_74().run,
+            Matcher_Parser_86().run,
+            Matcher_Parser_87().run
         ])
 class Matcher_Parser_89:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_88())
+        return stream.with_scope(Matcher_Parser_88().run)
 class Matcher_Parser_90:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_89()
+            Matcher_Parser_89().run
         ])
+TABLE_Parser_1 = {'!': (0, 2), '%': (0, 2), "'": (0, 2), '(': (0, 2), '.': (0, 2), '<': (0, 2), 'A': (0, 2), 'B': (0, 2), 'C': (0, 2), 'D': (0, 2), 'E': (0, 2), 'F': (0, 2), 'G': (0, 2), 'H': (0, 2), 'I': (0, 2), 'J': (0, 2), 'K': (0, 2), 'L': (0, 2), 'M': (0, 2), 'N': (0, 2), 'O': (0, 2), 'P': (0, 2), 'Q': (0, 2), 'R': (0, 2), 'S': (0, 2), 'T': (0, 2), 'U': (0, 2), 'V': (0, 2), 'W': (0, 2), 'X': (0, 2), 'Y': (0, 2), 'Z': (0, 2), '[': (1,), 'a': (0, 2), 'b': (0, 2), 'c': (0, 2), 'd': (0, 2), 'e': (0, 2), 'f': (0, 2), 'g': (0, 2), 'h': (0, 2), 'i': (0, 2), 'j': (0, 2), 'k': (0, 2), 'l': (0, 2), 'm': (0, 2), 'n': (0, 2), 'o': (0, 2), 'p': (0, 2), 'q': (0, 2), 'r': (0, 2), 's': (0, 2), 't': (0, 2), 'u': (0, 2), 'v': (0, 2), 'w': (0, 2), 'x': (0, 2), 'y': (0, 2), 'z': (0, 2)}
 class Matcher_Parser_91:
     def run(self, stream):
-        return rules['Parser.expr1'].run(stream)
+        return stream.match_rule('Parser.expr1')
 class Matcher_Parser_92:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_91().run(stream))
 class Matcher_Parser_93:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_94:
     def run(self, stream):
         return stream.match(lambda item: item == ':', "':'")
 class Matcher_Parser_95:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_94()
+            Matcher_Parser_94().run
         ])
 class Matcher_Parser_96:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_97:
     def run(self, stream):
-        return rules['Parser.name'].run(stream)
+        return stream.match_rule('Parser.name')
 class Matcher_Parser_98:
     def run(self, stream):
         return stream.bind('y', Matcher_Parser_97().run(stream))
 class Matcher_Parser_99:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_92(),
-            Matcher_Parser_93(),
-            Matcher_Parser_95(),
-            Matcher_Parser_96(),
-            Matcher_Parser_98()
+            Matcher_Parser_92().run,
+            Matcher_Parser_93().run,
+            Matcher_Parser_95().run,
+            Matcher_Parser_96().run,
+            Matcher_Parser_98().run
         ])
 class Matcher_Parser_100:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_99())
+        return stream.match_range(Matcher_Parser_99().run)
 class Matcher_Parser_101:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_100().run(stream))
@@ -804,79 +1839,79 @@ class Matcher_Parser_102:
 class Matcher_Parser_103:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_101(),
-            Matcher_Parser_102()
+            Matcher_Parser_101().run,
+            Matcher_Parser_102().run
         ])
 class Matcher_Parser_104:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_103())
+        return stream.with_scope(Matcher_Parser_103().run)
 class Matcher_Parser_105:
     def run(self, stream):
         return stream.match(lambda item: item == '[', "'['")
 class Matcher_Parser_106:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_105()
+            Matcher_Parser_105().run
         ])
 class Matcher_Parser_107:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_108:
     def run(self, stream):
-        return rules['Parser.expr'].run(stream)
+        return stream.match_rule('Parser.expr')
 class Matcher_Parser_109:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_107(),
-            Matcher_Parser_108()
+            Matcher_Parser_107().run,
+            Matcher_Parser_108().run
         ])
 class Matcher_Parser_110:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_109())
+        return stream.with_scope(Matcher_Parser_109().run)
 class Matcher_Parser_111:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_110()
+            Matcher_Parser_110().run
         ])
 class Matcher_Parser_112:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_111())
+        return stream.operator_star(Matcher_Parser_111().run)
 class Matcher_Parser_113:
     def run(self, stream):
         return stream.bind('xs', Matcher_Parser_112().run(stream))
 class Matcher_Parser_114:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_113()
+            Matcher_Parser_113().run
         ])
 class Matcher_Parser_115:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_114())
+        return stream.match_range(Matcher_Parser_114().run)
 class Matcher_Parser_116:
     def run(self, stream):
         return stream.bind('r2', Matcher_Parser_115().run(stream))
 class Matcher_Parser_117:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_118:
     def run(self, stream):
         return stream.match(lambda item: item == ']', "']'")
 class Matcher_Parser_119:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_118()
+            Matcher_Parser_118().run
         ])
 class Matcher_Parser_120:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_106(),
-            Matcher_Parser_116(),
-            Matcher_Parser_117(),
-            Matcher_Parser_119()
+            Matcher_Parser_106().run,
+            Matcher_Parser_116().run,
+            Matcher_Parser_117().run,
+            Matcher_Parser_119().run
         ])
 class Matcher_Parser_121:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_120())
+        return stream.match_range(Matcher_Parser_120().run)
 class Matcher_Parser_122:
     def run(self, stream):
         return stream.bind('r1', Matcher_Parser_121().run(stream))
@@ -898,57 +1933,58 @@ class Matcher_Parser_123:
 class Matcher_Parser_124:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_122(),
-            Matcher_Parser_123()
+            Matcher_Parser_122().run,
+            Matcher_Parser_123().run
         ])
 class Matcher_Parser_125:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_124())
+        return stream.with_scope(Matcher_Parser_124().run)
 class Matcher_Parser_126:
     def run(self, stream):
-        return rules['Parser.expr1'].run(stream)
+        return stream.match_rule('Parser.expr1')
 class Matcher_Parser_127:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_126()
+            Matcher_Parser_126().run
         ])
 class Matcher_Parser_128:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_127())
+        return stream.with_scope(Matcher_Parser_127().run)
 class Matcher_Parser_129:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_104(),
-            Matcher_Parser_125(),
-            Matcher_Parser_128()
+        return stream.operator_dispatch(TABLE_Parser_1, (), [
+            Matcher_Parser_104().run,
+            Matcher_Parser_125().run,
+            Matcher_Parser_128().run
         ])
+TABLE_Parser_2 = {'!': (2,), '%': (3,), "'": (0, 1, 4), '(': (0, 1, 4), '.': (0, 1, 4), '<': (0, 1, 4), 'A': (0, 1, 4), 'B': (0, 1, 4), 'C': (0, 1, 4), 'D': (0, 1, 4), 'E': (0, 1, 4), 'F': (0, 1, 4), 'G': (0, 1, 4), 'H': (0, 1, 4), 'I': (0, 1, 4), 'J': (0, 1, 4), 'K': (0, 1, 4), 'L': (0, 1, 4), 'M': (0, 1, 4), 'N': (0, 1, 4), 'O': (0, 1, 4), 'P': (0, 1, 4), 'Q': (0, 1, 4), 'R': (0, 1, 4), 'S': (0, 1, 4), 'T': (0, 1, 4), 'U': (0, 1, 4), 'V': (0, 1, 4), 'W': (0, 1, 4), 'X': (0, 1, 4), 'Y': (0, 1, 4), 'Z': (0, 1, 4), 'a': (0, 1, 4), 'b': (0, 1, 4), 'c': (0, 1, 4), 'd': (0, 1, 4), 'e': (0, 1, 4), 'f': (0, 1, 4), 'g': (0, 1, 4), 'h': (0, 1, 4), 'i': (0, 1, 4), 'j': (0, 1, 4), 'k': (0, 1, 4), 'l': (0, 1, 4), 'm': (0, 1, 4), 'n': (0, 1, 4), 'o': (0, 1, 4), 'p': (0, 1, 4), 'q': (0, 1, 4), 'r': (0, 1, 4), 's': (0, 1, 4), 't': (0, 1, 4), 'u': (0, 1, 4), 'v': (0, 1, 4), 'w': (0, 1, 4), 'x': (0, 1, 4), 'y': (0, 1, 4), 'z': (0, 1, 4)}
 class Matcher_Parser_130:
     def run(self, stream):
-        return rules['Parser.expr2'].run(stream)
+        return stream.match_rule('Parser.expr2')
 class Matcher_Parser_131:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_130().run(stream))
 class Matcher_Parser_132:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_133:
     def run(self, stream):
         return stream.match(lambda item: item == '*', "'*'")
 class Matcher_Parser_134:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_133()
+            Matcher_Parser_133().run
         ])
 class Matcher_Parser_135:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_131(),
-            Matcher_Parser_132(),
-            Matcher_Parser_134()
+            Matcher_Parser_131().run,
+            Matcher_Parser_132().run,
+            Matcher_Parser_134().run
         ])
 class Matcher_Parser_136:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_135())
+        return stream.match_range(Matcher_Parser_135().run)
 class Matcher_Parser_137:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_136().run(stream))
@@ -965,39 +2001,39 @@ class Matcher_Parser_138:
 class Matcher_Parser_139:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_137(),
-            Matcher_Parser_138()
+            Matcher_Parser_137().run,
+            Matcher_Parser_138().run
         ])
 class Matcher_Parser_140:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_139())
+        return stream.with_scope(Matcher_Parser_139().run)
 class Matcher_Parser_141:
     def run(self, stream):
-        return rules['Parser.expr2'].run(stream)
+        return stream.match_rule('Parser.expr2')
 class Matcher_Parser_142:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_141().run(stream))
 class Matcher_Parser_143:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_144:
     def run(self, stream):
         return stream.match(lambda item: item == '?', "'?'")
 class Matcher_Parser_145:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_144()
+            Matcher_Parser_144().run
         ])
 class Matcher_Parser_146:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_142(),
-            Matcher_Parser_143(),
-            Matcher_Parser_145()
+            Matcher_Parser_142().run,
+            Matcher_Parser_143().run,
+            Matcher_Parser_145().run
         ])
 class Matcher_Parser_147:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_146())
+        return stream.match_range(Matcher_Parser_146().run)
 class Matcher_Parser_148:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_147().run(stream))
@@ -1019,39 +2055,39 @@ class Matcher_Parser_149:
 class Matcher_Parser_150:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_148(),
-            Matcher_Parser_149()
+            Matcher_Parser_148().run,
+            Matcher_Parser_149().run
         ])
 class Matcher_Parser_151:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_150())
+        return stream.with_scope(Matcher_Parser_150().run)
 class Matcher_Parser_152:
     def run(self, stream):
         return stream.match(lambda item: item == '!', "'!'")
 class Matcher_Parser_153:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_152()
+            Matcher_Parser_152().run
         ])
 class Matcher_Parser_154:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_155:
     def run(self, stream):
-        return rules['Parser.expr2'].run(stream)
+        return stream.match_rule('Parser.expr2')
 class Matcher_Parser_156:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_155().run(stream))
 class Matcher_Parser_157:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_153(),
-            Matcher_Parser_154(),
-            Matcher_Parser_156()
+            Matcher_Parser_153().run,
+            Matcher_Parser_154().run,
+            Matcher_Parser_156().run
         ])
 class Matcher_Parser_158:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_157())
+        return stream.match_range(Matcher_Parser_157().run)
 class Matcher_Parser_159:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_158().run(stream))
@@ -1068,28 +2104,28 @@ class Matcher_Parser_160:
 class Matcher_Parser_161:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_159(),
-            Matcher_Parser_160()
+            Matcher_Parser_159().run,
+            Matcher_Parser_160().run
         ])
 class Matcher_Parser_162:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_161())
+        return stream.with_scope(Matcher_Parser_161().run)
 class Matcher_Parser_163:
     def run(self, stream):
         return stream.match(lambda item: item == '%', "'%'")
 class Matcher_Parser_164:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_163()
+            Matcher_Parser_163().run
         ])
 class Matcher_Parser_165:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_164()
+            Matcher_Parser_164().run
         ])
 class Matcher_Parser_166:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_165())
+        return stream.match_range(Matcher_Parser_165().run)
 class Matcher_Parser_167:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_166().run(stream))
@@ -1103,15 +2139,15 @@ class Matcher_Parser_168:
 class Matcher_Parser_169:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_167(),
-            Matcher_Parser_168()
+            Matcher_Parser_167().run,
+            Matcher_Parser_168().run
         ])
 class Matcher_Parser_170:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_169())
+        return stream.with_scope(Matcher_Parser_169().run)
 class Matcher_Parser_171:
     def run(self, stream):
-        return rules['Parser.expr2'].run(stream)
+        return stream.match_rule('Parser.expr2')
 class Matcher_Parser_172:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_171().run(stream))
@@ -1121,66 +2157,67 @@ class Matcher_Parser_173:
 class Matcher_Parser_174:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_172(),
-            Matcher_Parser_173()
+            Matcher_Parser_172().run,
+            Matcher_Parser_173().run
         ])
 class Matcher_Parser_175:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_174())
+        return stream.with_scope(Matcher_Parser_174().run)
 class Matcher_Parser_176:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_140(),
-            Matcher_Parser_151(),
-            Matcher_Parser_162(),
-            Matcher_Parser_170(),
-            Matcher_Parser_175()
+        return stream.operator_dispatch(TABLE_Parser_2, (), [
+            Matcher_Parser_140().run,
+            Matcher_Parser_151().run,
+            Matcher_Parser_162().run,
+            Matcher_Parser_170().run,
+            Matcher_Parser_175().run
         ])
+TABLE_Parser_3 = {"'": (1, 2), '(': (4,), '.': (3,), '<': (5,), 'A': (0,), 'B': (0,), 'C': (0,), 'D': (0,), 'E': (0,), 'F': (0,), 'G': (0,), 'H': (0,), 'I': (0,), 'J': (0,), 'K': (0,), 'L': (0,), 'M': (0,), 'N': (0,), 'O': (0,), 'P': (0,), 'Q': (0,), 'R': (0,), 'S': (0,), 'T': (0,), 'U': (0,), 'V': (0,), 'W': (0,), 'X': (0,), 'Y': (0,), 'Z': (0,), 'a': (0,), 'b': (0,), 'c': (0,), 'd': (0,), 'e': (0,), 'f': (0,), 'g': (0,), 'h': (0,), 'i': (0,), 'j': (0,), 'k': (0,), 'l': (0,), 'm': (0,), 'n': (0,), 'o': (0,), 'p': (0,), 'q': (0,), 'r': (0,), 's': (0,), 't': (0,), 'u': (0,), 'v': (0,), 'w': (0,), 'x': (0,), 'y': (0,), 'z': (0,)}
 class Matcher_Parser_177:
     def run(self, stream):
-        return rules['Parser.name'].run(stream)
+        return stream.match_rule('Parser.name')
 class Matcher_Parser_178:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_177().run(stream))
 class Matcher_Parser_179:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_178()
+            Matcher_Parser_178().run
         ])
 class Matcher_Parser_180:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_179())
+        return stream.match_range(Matcher_Parser_179().run)
 class Matcher_Parser_181:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_180().run(stream))
 class Matcher_Parser_182:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_183:
     def run(self, stream):
         return stream.match(lambda item: item == '=', "'='")
 class Matcher_Parser_184:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_183()
+            Matcher_Parser_183().run
         ])
 class Matcher_Parser_185:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_182(),
-            Matcher_Parser_184()
+            Matcher_Parser_182().run,
+            Matcher_Parser_184().run
         ])
 class Matcher_Parser_186:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_185())
+        return stream.with_scope(Matcher_Parser_185().run)
 class Matcher_Parser_187:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_186()
+            Matcher_Parser_186().run
         ])
 class Matcher_Parser_188:
     def run(self, stream):
-        return stream.operator_not(Matcher_Parser_187())
+        return stream.operator_not(Matcher_Parser_187().run)
 class Matcher_Parser_189:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('Node')(
@@ -1191,16 +2228,16 @@ class Matcher_Parser_189:
 class Matcher_Parser_190:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_181(),
-            Matcher_Parser_188(),
-            Matcher_Parser_189()
+            Matcher_Parser_181().run,
+            Matcher_Parser_188().run,
+            Matcher_Parser_189().run
         ])
 class Matcher_Parser_191:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_190())
+        return stream.with_scope(Matcher_Parser_190().run)
 class Matcher_Parser_192:
     def run(self, stream):
-        return rules['Parser.char'].run(stream)
+        return stream.match_rule('Parser.char')
 class Matcher_Parser_193:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_192().run(stream))
@@ -1210,24 +2247,24 @@ class Matcher_Parser_194:
 class Matcher_Parser_195:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_194()
+            Matcher_Parser_194().run
         ])
 class Matcher_Parser_196:
     def run(self, stream):
-        return rules['Parser.char'].run(stream)
+        return stream.match_rule('Parser.char')
 class Matcher_Parser_197:
     def run(self, stream):
         return stream.bind('y', Matcher_Parser_196().run(stream))
 class Matcher_Parser_198:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_193(),
-            Matcher_Parser_195(),
-            Matcher_Parser_197()
+            Matcher_Parser_193().run,
+            Matcher_Parser_195().run,
+            Matcher_Parser_197().run
         ])
 class Matcher_Parser_199:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_198())
+        return stream.match_range(Matcher_Parser_198().run)
 class Matcher_Parser_200:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_199().run(stream))
@@ -1251,19 +2288,19 @@ class Matcher_Parser_201:
 class Matcher_Parser_202:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_200(),
-            Matcher_Parser_201()
+            Matcher_Parser_200().run,
+            Matcher_Parser_201().run
         ])
 class Matcher_Parser_203:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_202())
+        return stream.with_scope(Matcher_Parser_202().run)
 class Matcher_Parser_204:
     def run(self, stream):
         return stream.match(lambda item: item == "'", '"\'"')
 class Matcher_Parser_205:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_204()
+            Matcher_Parser_204().run
         ])
 class Matcher_Parser_206:
     def run(self, stream):
@@ -1271,31 +2308,31 @@ class Matcher_Parser_206:
 class Matcher_Parser_207:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_206()
+            Matcher_Parser_206().run
         ])
 class Matcher_Parser_208:
     def run(self, stream):
-        return stream.operator_not(Matcher_Parser_207())
+        return stream.operator_not(Matcher_Parser_207().run)
 class Matcher_Parser_209:
     def run(self, stream):
-        return rules['Parser.matchChar'].run(stream)
+        return stream.match_rule('Parser.matchChar')
 class Matcher_Parser_210:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_208(),
-            Matcher_Parser_209()
+            Matcher_Parser_208().run,
+            Matcher_Parser_209().run
         ])
 class Matcher_Parser_211:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_210())
+        return stream.with_scope(Matcher_Parser_210().run)
 class Matcher_Parser_212:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_211()
+            Matcher_Parser_211().run
         ])
 class Matcher_Parser_213:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_212())
+        return stream.operator_star(Matcher_Parser_212().run)
 class Matcher_Parser_214:
     def run(self, stream):
         return stream.bind('xs', Matcher_Parser_213().run(stream))
@@ -1305,18 +2342,18 @@ class Matcher_Parser_215:
 class Matcher_Parser_216:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_215()
+            Matcher_Parser_215().run
         ])
 class Matcher_Parser_217:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_205(),
-            Matcher_Parser_214(),
-            Matcher_Parser_216()
+            Matcher_Parser_205().run,
+            Matcher_Parser_214().run,
+            Matcher_Parser_216().run
         ])
 class Matcher_Parser_218:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_217())
+        return stream.match_range(Matcher_Parser_217().run)
 class Matcher_Parser_219:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_218().run(stream))
@@ -1331,28 +2368,28 @@ class Matcher_Parser_220:
 class Matcher_Parser_221:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_219(),
-            Matcher_Parser_220()
+            Matcher_Parser_219().run,
+            Matcher_Parser_220().run
         ])
 class Matcher_Parser_222:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_221())
+        return stream.with_scope(Matcher_Parser_221().run)
 class Matcher_Parser_223:
     def run(self, stream):
         return stream.match(lambda item: item == '.', "'.'")
 class Matcher_Parser_224:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_223()
+            Matcher_Parser_223().run
         ])
 class Matcher_Parser_225:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_224()
+            Matcher_Parser_224().run
         ])
 class Matcher_Parser_226:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_225())
+        return stream.match_range(Matcher_Parser_225().run)
 class Matcher_Parser_227:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_226().run(stream))
@@ -1373,48 +2410,48 @@ class Matcher_Parser_228:
 class Matcher_Parser_229:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_227(),
-            Matcher_Parser_228()
+            Matcher_Parser_227().run,
+            Matcher_Parser_228().run
         ])
 class Matcher_Parser_230:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_229())
+        return stream.with_scope(Matcher_Parser_229().run)
 class Matcher_Parser_231:
     def run(self, stream):
         return stream.match(lambda item: item == '(', "'('")
 class Matcher_Parser_232:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_231()
+            Matcher_Parser_231().run
         ])
 class Matcher_Parser_233:
     def run(self, stream):
-        return rules['Parser.choice'].run(stream)
+        return stream.match_rule('Parser.choice')
 class Matcher_Parser_234:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_233().run(stream))
 class Matcher_Parser_235:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_236:
     def run(self, stream):
         return stream.match(lambda item: item == ')', "')'")
 class Matcher_Parser_237:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_236()
+            Matcher_Parser_236().run
         ])
 class Matcher_Parser_238:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_232(),
-            Matcher_Parser_234(),
-            Matcher_Parser_235(),
-            Matcher_Parser_237()
+            Matcher_Parser_232().run,
+            Matcher_Parser_234().run,
+            Matcher_Parser_235().run,
+            Matcher_Parser_237().run
         ])
 class Matcher_Parser_239:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_238())
+        return stream.match_range(Matcher_Parser_238().run)
 class Matcher_Parser_240:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_239().run(stream))
@@ -1431,68 +2468,68 @@ class Matcher_Parser_241:
 class Matcher_Parser_242:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_240(),
-            Matcher_Parser_241()
+            Matcher_Parser_240().run,
+            Matcher_Parser_241().run
         ])
 class Matcher_Parser_243:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_242())
+        return stream.with_scope(Matcher_Parser_242().run)
 class Matcher_Parser_244:
     def run(self, stream):
         return stream.match(lambda item: item == '<', "'<'")
 class Matcher_Parser_245:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_244()
+            Matcher_Parser_244().run
         ])
 class Matcher_Parser_246:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_247:
     def run(self, stream):
-        return rules['Parser.expr'].run(stream)
+        return stream.match_rule('Parser.expr')
 class Matcher_Parser_248:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_246(),
-            Matcher_Parser_247()
+            Matcher_Parser_246().run,
+            Matcher_Parser_247().run
         ])
 class Matcher_Parser_249:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_248())
+        return stream.with_scope(Matcher_Parser_248().run)
 class Matcher_Parser_250:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_249()
+            Matcher_Parser_249().run
         ])
 class Matcher_Parser_251:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_250())
+        return stream.operator_star(Matcher_Parser_250().run)
 class Matcher_Parser_252:
     def run(self, stream):
         return stream.bind('xs', Matcher_Parser_251().run(stream))
 class Matcher_Parser_253:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_254:
     def run(self, stream):
         return stream.match(lambda item: item == '>', "'>'")
 class Matcher_Parser_255:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_254()
+            Matcher_Parser_254().run
         ])
 class Matcher_Parser_256:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_245(),
-            Matcher_Parser_252(),
-            Matcher_Parser_253(),
-            Matcher_Parser_255()
+            Matcher_Parser_245().run,
+            Matcher_Parser_252().run,
+            Matcher_Parser_253().run,
+            Matcher_Parser_255().run
         ])
 class Matcher_Parser_257:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_256())
+        return stream.match_range(Matcher_Parser_256().run)
 class Matcher_Parser_258:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_257().run(stream))
@@ -1514,36 +2551,36 @@ class Matcher_Parser_259:
 class Matcher_Parser_260:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_258(),
-            Matcher_Parser_259()
+            Matcher_Parser_258().run,
+            Matcher_Parser_259().run
         ])
 class Matcher_Parser_261:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_260())
+        return stream.with_scope(Matcher_Parser_260().run)
 class Matcher_Parser_262:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_191(),
-            Matcher_Parser_203(),
-            Matcher_Parser_222(),
-            Matcher_Parser_230(),
-            Matcher_Parser_243(),
-            Matcher_Parser_261()
+        return stream.operator_dispatch(TABLE_Parser_3, (), [
+            Matcher_Parser_191().run,
+            Matcher_Parser_203().run,
+            Matcher_Parser_222().run,
+            Matcher_Parser_230().run,
+            Matcher_Parser_243().run,
+            Matcher_Parser_261().run
         ])
 class Matcher_Parser_263:
     def run(self, stream):
-        return rules['Parser.innerChar'].run(stream)
+        return stream.match_rule('Parser.innerChar')
 class Matcher_Parser_264:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_263().run(stream))
 class Matcher_Parser_265:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_264()
+            Matcher_Parser_264().run
         ])
 class Matcher_Parser_266:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_265())
+        return stream.match_range(Matcher_Parser_265().run)
 class Matcher_Parser_267:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_266().run(stream))
@@ -1564,31 +2601,32 @@ class Matcher_Parser_268:
 class Matcher_Parser_269:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_267(),
-            Matcher_Parser_268()
+            Matcher_Parser_267().run,
+            Matcher_Parser_268().run
         ])
 class Matcher_Parser_270:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_269())
+        return stream.with_scope(Matcher_Parser_269().run)
 class Matcher_Parser_271:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_270()
+            Matcher_Parser_270().run
         ])
+TABLE_Parser_4 = {'\n': (0, 1), ' ': (0, 1), '-': (0, 1)}
 class Matcher_Parser_272:
     def run(self, stream):
-        return rules['Parser.actionExpr'].run(stream)
+        return stream.match_rule('Parser.actionExpr')
 class Matcher_Parser_273:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_272().run(stream))
 class Matcher_Parser_274:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_273()
+            Matcher_Parser_273().run
         ])
 class Matcher_Parser_275:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_274())
+        return stream.match_range(Matcher_Parser_274().run)
 class Matcher_Parser_276:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_275().run(stream))
@@ -1607,12 +2645,12 @@ class Matcher_Parser_277:
 class Matcher_Parser_278:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_276(),
-            Matcher_Parser_277()
+            Matcher_Parser_276().run,
+            Matcher_Parser_277().run
         ])
 class Matcher_Parser_279:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_278())
+        return stream.with_scope(Matcher_Parser_278().run)
 class Matcher_Parser_280:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('concat')([
@@ -1621,20 +2659,21 @@ class Matcher_Parser_280:
 class Matcher_Parser_281:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_280()
+            Matcher_Parser_280().run
         ])
 class Matcher_Parser_282:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_281())
+        return stream.with_scope(Matcher_Parser_281().run)
 class Matcher_Parser_283:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_279(),
-            Matcher_Parser_282()
+        return stream.operator_dispatch(TABLE_Parser_4, (1,), [
+            Matcher_Parser_279().run,
+            Matcher_Parser_282().run
         ])
+TABLE_Parser_5 = {'\n': (0, 1), ' ': (0, 1), '-': (0, 1)}
 class Matcher_Parser_284:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_285:
     def run(self, stream):
         return stream.match(lambda item: item == '-', "'-'")
@@ -1644,84 +2683,85 @@ class Matcher_Parser_286:
 class Matcher_Parser_287:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_285(),
-            Matcher_Parser_286()
+            Matcher_Parser_285().run,
+            Matcher_Parser_286().run
         ])
 class Matcher_Parser_288:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_289:
     def run(self, stream):
-        return rules['Parser.hostExpr'].run(stream)
+        return stream.match_rule('Parser.hostExpr')
 class Matcher_Parser_290:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_289().run(stream))
+TABLE_Parser_6 = {'\n': (0, 1), ' ': (0, 1), ':': (0, 1)}
 class Matcher_Parser_291:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_292:
     def run(self, stream):
         return stream.match(lambda item: item == ':', "':'")
 class Matcher_Parser_293:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_292()
+            Matcher_Parser_292().run
         ])
 class Matcher_Parser_294:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_295:
     def run(self, stream):
-        return rules['Parser.name'].run(stream)
+        return stream.match_rule('Parser.name')
 class Matcher_Parser_296:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_291(),
-            Matcher_Parser_293(),
-            Matcher_Parser_294(),
-            Matcher_Parser_295()
+            Matcher_Parser_291().run,
+            Matcher_Parser_293().run,
+            Matcher_Parser_294().run,
+            Matcher_Parser_295().run
         ])
 class Matcher_Parser_297:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_296())
+        return stream.with_scope(Matcher_Parser_296().run)
 class Matcher_Parser_298:
     def run(self, stream):
         return stream.action(lambda self: '')
 class Matcher_Parser_299:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_298()
+            Matcher_Parser_298().run
         ])
 class Matcher_Parser_300:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_299())
+        return stream.with_scope(Matcher_Parser_299().run)
 class Matcher_Parser_301:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_297(),
-            Matcher_Parser_300()
+        return stream.operator_dispatch(TABLE_Parser_6, (1,), [
+            Matcher_Parser_297().run,
+            Matcher_Parser_300().run
         ])
 class Matcher_Parser_302:
     def run(self, stream):
         return stream.bind('y', Matcher_Parser_301().run(stream))
 class Matcher_Parser_303:
     def run(self, stream):
-        return rules['Parser.actionExpr'].run(stream)
+        return stream.match_rule('Parser.actionExpr')
 class Matcher_Parser_304:
     def run(self, stream):
         return stream.bind('z', Matcher_Parser_303().run(stream))
 class Matcher_Parser_305:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_287(),
-            Matcher_Parser_288(),
-            Matcher_Parser_290(),
-            Matcher_Parser_302(),
-            Matcher_Parser_304()
+            Matcher_Parser_287().run,
+            Matcher_Parser_288().run,
+            Matcher_Parser_290().run,
+            Matcher_Parser_302().run,
+            Matcher_Parser_304().run
         ])
 class Matcher_Parser_306:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_305())
+        return stream.match_range(Matcher_Parser_305().run)
 class Matcher_Parser_307:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_306().run(stream))
@@ -1739,16 +2779,16 @@ class Matcher_Parser_308:
 class Matcher_Parser_309:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_284(),
-            Matcher_Parser_307(),
-            Matcher_Parser_308()
+            Matcher_Parser_284().run,
+            Matcher_Parser_307().run,
+            Matcher_Parser_308().run
         ])
 class Matcher_Parser_310:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_309())
+        return stream.with_scope(Matcher_Parser_309().run)
 class Matcher_Parser_311:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_312:
     def run(self, stream):
         return stream.match(lambda item: item == '-', "'-'")
@@ -1758,28 +2798,28 @@ class Matcher_Parser_313:
 class Matcher_Parser_314:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_312(),
-            Matcher_Parser_313()
+            Matcher_Parser_312().run,
+            Matcher_Parser_313().run
         ])
 class Matcher_Parser_315:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_316:
     def run(self, stream):
-        return rules['Parser.hostExpr'].run(stream)
+        return stream.match_rule('Parser.hostExpr')
 class Matcher_Parser_317:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_316().run(stream))
 class Matcher_Parser_318:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_314(),
-            Matcher_Parser_315(),
-            Matcher_Parser_317()
+            Matcher_Parser_314().run,
+            Matcher_Parser_315().run,
+            Matcher_Parser_317().run
         ])
 class Matcher_Parser_319:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_318())
+        return stream.match_range(Matcher_Parser_318().run)
 class Matcher_Parser_320:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_319().run(stream))
@@ -1789,33 +2829,34 @@ class Matcher_Parser_321:
 class Matcher_Parser_322:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_311(),
-            Matcher_Parser_320(),
-            Matcher_Parser_321()
+            Matcher_Parser_311().run,
+            Matcher_Parser_320().run,
+            Matcher_Parser_321().run
         ])
 class Matcher_Parser_323:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_322())
+        return stream.with_scope(Matcher_Parser_322().run)
 class Matcher_Parser_324:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_310(),
-            Matcher_Parser_323()
+        return stream.operator_dispatch(TABLE_Parser_5, (), [
+            Matcher_Parser_310().run,
+            Matcher_Parser_323().run
         ])
+TABLE_Parser_7 = {'"': (0,), 'A': (3, 4), 'B': (3, 4), 'C': (3, 4), 'D': (3, 4), 'E': (3, 4), 'F': (3, 4), 'G': (3, 4), 'H': (3, 4), 'I': (3, 4), 'J': (3, 4), 'K': (3, 4), 'L': (3, 4), 'M': (3, 4), 'N': (3, 4), 'O': (3, 4), 'P': (3, 4), 'Q': (3, 4), 'R': (3, 4), 'S': (3, 4), 'T': (3, 4), 'U': (3, 4), 'V': (3, 4), 'W': (3, 4), 'X': (3, 4), 'Y': (3, 4), 'Z': (3, 4), '[': (1,), 'a': (3, 4), 'b': (3, 4), 'c': (3, 4), 'd': (3, 4), 'e': (3, 4), 'f': (3, 4), 'g': (3, 4), 'h': (3, 4), 'i': (3, 4), 'j': (3, 4), 'k': (3, 4), 'l': (3, 4), 'm': (3, 4), 'n': (3, 4), 'o': (3, 4), 'p': (3, 4), 'q': (3, 4), 'r': (3, 4), 's': (3, 4), 't': (3, 4), 'u': (3, 4), 'v': (3, 4), 'w': (3, 4), 'x': (3, 4), 'y': (3, 4), 'z': (3, 4), '{': (2,)}
 class Matcher_Parser_325:
     def run(self, stream):
-        return rules['Parser.string'].run(stream)
+        return stream.match_rule('Parser.string')
 class Matcher_Parser_326:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_325().run(stream))
 class Matcher_Parser_327:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_326()
+            Matcher_Parser_326().run
         ])
 class Matcher_Parser_328:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_327())
+        return stream.match_range(Matcher_Parser_327().run)
 class Matcher_Parser_329:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_328().run(stream))
@@ -1829,51 +2870,51 @@ class Matcher_Parser_330:
 class Matcher_Parser_331:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_329(),
-            Matcher_Parser_330()
+            Matcher_Parser_329().run,
+            Matcher_Parser_330().run
         ])
 class Matcher_Parser_332:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_331())
+        return stream.with_scope(Matcher_Parser_331().run)
 class Matcher_Parser_333:
     def run(self, stream):
         return stream.match(lambda item: item == '[', "'['")
 class Matcher_Parser_334:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_333()
+            Matcher_Parser_333().run
         ])
 class Matcher_Parser_335:
     def run(self, stream):
-        return rules['Parser.hostListItem'].run(stream)
+        return stream.match_rule('Parser.hostListItem')
 class Matcher_Parser_336:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_335())
+        return stream.operator_star(Matcher_Parser_335().run)
 class Matcher_Parser_337:
     def run(self, stream):
         return stream.bind('xs', Matcher_Parser_336().run(stream))
 class Matcher_Parser_338:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_339:
     def run(self, stream):
         return stream.match(lambda item: item == ']', "']'")
 class Matcher_Parser_340:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_339()
+            Matcher_Parser_339().run
         ])
 class Matcher_Parser_341:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_334(),
-            Matcher_Parser_337(),
-            Matcher_Parser_338(),
-            Matcher_Parser_340()
+            Matcher_Parser_334().run,
+            Matcher_Parser_337().run,
+            Matcher_Parser_338().run,
+            Matcher_Parser_340().run
         ])
 class Matcher_Parser_342:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_341())
+        return stream.match_range(Matcher_Parser_341().run)
 class Matcher_Parser_343:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_342().run(stream))
@@ -1888,68 +2929,68 @@ class Matcher_Parser_344:
 class Matcher_Parser_345:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_343(),
-            Matcher_Parser_344()
+            Matcher_Parser_343().run,
+            Matcher_Parser_344().run
         ])
 class Matcher_Parser_346:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_345())
+        return stream.with_scope(Matcher_Parser_345().run)
 class Matcher_Parser_347:
     def run(self, stream):
         return stream.match(lambda item: item == '{', "'{'")
 class Matcher_Parser_348:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_347()
+            Matcher_Parser_347().run
         ])
 class Matcher_Parser_349:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_350:
     def run(self, stream):
-        return rules['Parser.hostExpr'].run(stream)
+        return stream.match_rule('Parser.hostExpr')
 class Matcher_Parser_351:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_349(),
-            Matcher_Parser_350()
+            Matcher_Parser_349().run,
+            Matcher_Parser_350().run
         ])
 class Matcher_Parser_352:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_351())
+        return stream.with_scope(Matcher_Parser_351().run)
 class Matcher_Parser_353:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_352()
+            Matcher_Parser_352().run
         ])
 class Matcher_Parser_354:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_353())
+        return stream.operator_star(Matcher_Parser_353().run)
 class Matcher_Parser_355:
     def run(self, stream):
         return stream.bind('xs', Matcher_Parser_354().run(stream))
 class Matcher_Parser_356:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_357:
     def run(self, stream):
         return stream.match(lambda item: item == '}', "'}'")
 class Matcher_Parser_358:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_357()
+            Matcher_Parser_357().run
         ])
 class Matcher_Parser_359:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_348(),
-            Matcher_Parser_355(),
-            Matcher_Parser_356(),
-            Matcher_Parser_358()
+            Matcher_Parser_348().run,
+            Matcher_Parser_355().run,
+            Matcher_Parser_356().run,
+            Matcher_Parser_358().run
         ])
 class Matcher_Parser_360:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_359())
+        return stream.match_range(Matcher_Parser_359().run)
 class Matcher_Parser_361:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_360().run(stream))
@@ -1964,79 +3005,79 @@ class Matcher_Parser_362:
 class Matcher_Parser_363:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_361(),
-            Matcher_Parser_362()
+            Matcher_Parser_361().run,
+            Matcher_Parser_362().run
         ])
 class Matcher_Parser_364:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_363())
+        return stream.with_scope(Matcher_Parser_363().run)
 class Matcher_Parser_365:
     def run(self, stream):
-        return rules['Parser.var'].run(stream)
+        return stream.match_rule('Parser.var')
 class Matcher_Parser_366:
     def run(self, stream):
         return stream.bind('x', Matcher_Parser_365().run(stream))
 class Matcher_Parser_367:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_368:
     def run(self, stream):
         return stream.match(lambda item: item == '(', "'('")
 class Matcher_Parser_369:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_368()
+            Matcher_Parser_368().run
         ])
 class Matcher_Parser_370:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_371:
     def run(self, stream):
-        return rules['Parser.hostExpr'].run(stream)
+        return stream.match_rule('Parser.hostExpr')
 class Matcher_Parser_372:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_370(),
-            Matcher_Parser_371()
+            Matcher_Parser_370().run,
+            Matcher_Parser_371().run
         ])
 class Matcher_Parser_373:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_372())
+        return stream.with_scope(Matcher_Parser_372().run)
 class Matcher_Parser_374:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_373()
+            Matcher_Parser_373().run
         ])
 class Matcher_Parser_375:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_374())
+        return stream.operator_star(Matcher_Parser_374().run)
 class Matcher_Parser_376:
     def run(self, stream):
         return stream.bind('ys', Matcher_Parser_375().run(stream))
 class Matcher_Parser_377:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_378:
     def run(self, stream):
         return stream.match(lambda item: item == ')', "')'")
 class Matcher_Parser_379:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_378()
+            Matcher_Parser_378().run
         ])
 class Matcher_Parser_380:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_366(),
-            Matcher_Parser_367(),
-            Matcher_Parser_369(),
-            Matcher_Parser_376(),
-            Matcher_Parser_377(),
-            Matcher_Parser_379()
+            Matcher_Parser_366().run,
+            Matcher_Parser_367().run,
+            Matcher_Parser_369().run,
+            Matcher_Parser_376().run,
+            Matcher_Parser_377().run,
+            Matcher_Parser_379().run
         ])
 class Matcher_Parser_381:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_380())
+        return stream.match_range(Matcher_Parser_380().run)
 class Matcher_Parser_382:
     def run(self, stream):
         return stream.bind('r', Matcher_Parser_381().run(stream))
@@ -2054,72 +3095,76 @@ class Matcher_Parser_383:
 class Matcher_Parser_384:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_382(),
-            Matcher_Parser_383()
+            Matcher_Parser_382().run,
+            Matcher_Parser_383().run
         ])
 class Matcher_Parser_385:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_384())
+        return stream.with_scope(Matcher_Parser_384().run)
 class Matcher_Parser_386:
     def run(self, stream):
-        return rules['Parser.var'].run(stream)
+        return stream.match_rule('Parser.var')
 class Matcher_Parser_387:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_386()
+            Matcher_Parser_386().run
         ])
 class Matcher_Parser_388:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_387())
+        return stream.with_scope(Matcher_Parser_387().run)
 class Matcher_Parser_389:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_332(),
-            Matcher_Parser_346(),
-            Matcher_Parser_364(),
-            Matcher_Parser_385(),
-            Matcher_Parser_388()
+        return stream.operator_dispatch(TABLE_Parser_7, (), [
+            Matcher_Parser_332().run,
+            Matcher_Parser_346().run,
+            Matcher_Parser_364().run,
+            Matcher_Parser_385().run,
+            Matcher_Parser_388().run
         ])
 class Matcher_Parser_390:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.match_rule('Parser.space')
+PATTERN_Parser_0 = re.compile('(?:\\~)*', re.DOTALL)
 class Matcher_Parser_391:
     def run(self, stream):
         return stream.match(lambda item: item == '~', "'~'")
 class Matcher_Parser_392:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_391()
+            Matcher_Parser_391().run
         ])
 class Matcher_Parser_393:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_392())
+        return stream.operator_star(Matcher_Parser_392().run)
 class Matcher_Parser_394:
     def run(self, stream):
-        return stream.bind('ys', Matcher_Parser_393().run(stream))
+        return stream.match_pattern(PATTERN_Parser_0, Matcher_Parser_393().run)
 class Matcher_Parser_395:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.bind('ys', Matcher_Parser_394().run(stream))
 class Matcher_Parser_396:
     def run(self, stream):
-        return rules['Parser.hostExpr'].run(stream)
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_397:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_396().run(stream))
+        return stream.match_rule('Parser.hostExpr')
 class Matcher_Parser_398:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_394(),
-            Matcher_Parser_395(),
-            Matcher_Parser_397()
-        ])
+        return stream.bind('x', Matcher_Parser_397().run(stream))
 class Matcher_Parser_399:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_398())
+        return stream.operator_and([
+            Matcher_Parser_395().run,
+            Matcher_Parser_396().run,
+            Matcher_Parser_398().run
+        ])
 class Matcher_Parser_400:
     def run(self, stream):
-        return stream.bind('r', Matcher_Parser_399().run(stream))
+        return stream.match_range(Matcher_Parser_399().run)
 class Matcher_Parser_401:
+    def run(self, stream):
+        return stream.bind('r', Matcher_Parser_400().run(stream))
+class Matcher_Parser_402:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('Node')(
             'ListItem',
@@ -2131,517 +3176,433 @@ class Matcher_Parser_401:
                 self.lookup('splice')(0, self.lookup('x'))
             ])
         ))
-class Matcher_Parser_402:
+class Matcher_Parser_403:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_390(),
-            Matcher_Parser_400(),
-            Matcher_Parser_401()
+            Matcher_Parser_390().run,
+            Matcher_Parser_401().run,
+            Matcher_Parser_402().run
         ])
-class Matcher_Parser_403:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_402())
 class Matcher_Parser_404:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_403()
-        ])
+        return stream.with_scope(Matcher_Parser_403().run)
 class Matcher_Parser_405:
     def run(self, stream):
-        return rules['Parser.name'].run(stream)
+        return stream.operator_or([
+            Matcher_Parser_404().run
+        ])
 class Matcher_Parser_406:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_405().run(stream))
+        return stream.match_rule('Parser.name')
 class Matcher_Parser_407:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_406()
-        ])
+        return stream.bind('x', Matcher_Parser_406().run(stream))
 class Matcher_Parser_408:
     def run(self, stream):
-        return stream.match_range(Matcher_Parser_407())
+        return stream.operator_and([
+            Matcher_Parser_407().run
+        ])
 class Matcher_Parser_409:
     def run(self, stream):
-        return stream.bind('r', Matcher_Parser_408().run(stream))
+        return stream.match_range(Matcher_Parser_408().run)
 class Matcher_Parser_410:
     def run(self, stream):
-        return rules['Parser.space'].run(stream)
+        return stream.bind('r', Matcher_Parser_409().run(stream))
 class Matcher_Parser_411:
     def run(self, stream):
-        return stream.match(lambda item: item == '=', "'='")
+        return stream.match_rule('Parser.space')
 class Matcher_Parser_412:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_411()
-        ])
+        return stream.match(lambda item: item == '=', "'='")
 class Matcher_Parser_413:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_410(),
-            Matcher_Parser_412()
+            Matcher_Parser_412().run
         ])
 class Matcher_Parser_414:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_413())
+        return stream.operator_and([
+            Matcher_Parser_411().run,
+            Matcher_Parser_413().run
+        ])
 class Matcher_Parser_415:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_414()
-        ])
+        return stream.with_scope(Matcher_Parser_414().run)
 class Matcher_Parser_416:
     def run(self, stream):
-        return stream.operator_not(Matcher_Parser_415())
+        return stream.operator_or([
+            Matcher_Parser_415().run
+        ])
 class Matcher_Parser_417:
+    def run(self, stream):
+        return stream.operator_not(Matcher_Parser_416().run)
+class Matcher_Parser_418:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('Node')(
             'Lookup',
             self.lookup('r'),
             self.lookup('x')
         ))
-class Matcher_Parser_418:
+class Matcher_Parser_419:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_409(),
-            Matcher_Parser_416(),
-            Matcher_Parser_417()
+            Matcher_Parser_410().run,
+            Matcher_Parser_417().run,
+            Matcher_Parser_418().run
         ])
-class Matcher_Parser_419:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_418())
 class Matcher_Parser_420:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_419().run)
+class Matcher_Parser_421:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_419()
+            Matcher_Parser_420().run
         ])
-class Matcher_Parser_421:
+class Matcher_Parser_422:
     def run(self, stream):
         return stream.match(lambda item: item == '"', '\'"\'')
-class Matcher_Parser_422:
+class Matcher_Parser_423:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_421()
+            Matcher_Parser_422().run
         ])
-class Matcher_Parser_423:
+class Matcher_Parser_424:
     def run(self, stream):
         return stream.match(lambda item: item == '"', '\'"\'')
-class Matcher_Parser_424:
+class Matcher_Parser_425:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_423()
+            Matcher_Parser_424().run
         ])
-class Matcher_Parser_425:
-    def run(self, stream):
-        return stream.operator_not(Matcher_Parser_424())
 class Matcher_Parser_426:
     def run(self, stream):
-        return rules['Parser.innerChar'].run(stream)
+        return stream.operator_not(Matcher_Parser_425().run)
 class Matcher_Parser_427:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_425(),
-            Matcher_Parser_426()
-        ])
+        return stream.match_rule('Parser.innerChar')
 class Matcher_Parser_428:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_427())
+        return stream.operator_and([
+            Matcher_Parser_426().run,
+            Matcher_Parser_427().run
+        ])
 class Matcher_Parser_429:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_428()
-        ])
+        return stream.with_scope(Matcher_Parser_428().run)
 class Matcher_Parser_430:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_429())
+        return stream.operator_or([
+            Matcher_Parser_429().run
+        ])
 class Matcher_Parser_431:
     def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_430().run(stream))
+        return stream.operator_star(Matcher_Parser_430().run)
 class Matcher_Parser_432:
     def run(self, stream):
-        return stream.match(lambda item: item == '"', '\'"\'')
+        return stream.bind('xs', Matcher_Parser_431().run(stream))
 class Matcher_Parser_433:
+    def run(self, stream):
+        return stream.match(lambda item: item == '"', '\'"\'')
+class Matcher_Parser_434:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_432()
+            Matcher_Parser_433().run
         ])
-class Matcher_Parser_434:
+class Matcher_Parser_435:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             self.lookup('xs')
         ]))
-class Matcher_Parser_435:
+class Matcher_Parser_436:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_422(),
-            Matcher_Parser_431(),
-            Matcher_Parser_433(),
-            Matcher_Parser_434()
+            Matcher_Parser_423().run,
+            Matcher_Parser_432().run,
+            Matcher_Parser_434().run,
+            Matcher_Parser_435().run
         ])
-class Matcher_Parser_436:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_435())
 class Matcher_Parser_437:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_436().run)
+class Matcher_Parser_438:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_436()
+            Matcher_Parser_437().run
         ])
-class Matcher_Parser_438:
+class Matcher_Parser_439:
     def run(self, stream):
         return stream.match(lambda item: item == "'", '"\'"')
-class Matcher_Parser_439:
+class Matcher_Parser_440:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_438()
+            Matcher_Parser_439().run
         ])
-class Matcher_Parser_440:
+class Matcher_Parser_441:
     def run(self, stream):
         return stream.match(lambda item: item == "'", '"\'"')
-class Matcher_Parser_441:
+class Matcher_Parser_442:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_440()
+            Matcher_Parser_441().run
         ])
-class Matcher_Parser_442:
-    def run(self, stream):
-        return stream.operator_not(Matcher_Parser_441())
 class Matcher_Parser_443:
     def run(self, stream):
-        return rules['Parser.innerChar'].run(stream)
+        return stream.operator_not(Matcher_Parser_442().run)
 class Matcher_Parser_444:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_443().run(stream))
+        return stream.match_rule('Parser.innerChar')
 class Matcher_Parser_445:
     def run(self, stream):
-        return stream.match(lambda item: item == "'", '"\'"')
+        return stream.bind('x', Matcher_Parser_444().run(stream))
 class Matcher_Parser_446:
+    def run(self, stream):
+        return stream.match(lambda item: item == "'", '"\'"')
+class Matcher_Parser_447:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_445()
+            Matcher_Parser_446().run
         ])
-class Matcher_Parser_447:
+class Matcher_Parser_448:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('x'))
-class Matcher_Parser_448:
+class Matcher_Parser_449:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_439(),
-            Matcher_Parser_442(),
-            Matcher_Parser_444(),
-            Matcher_Parser_446(),
-            Matcher_Parser_447()
+            Matcher_Parser_440().run,
+            Matcher_Parser_443().run,
+            Matcher_Parser_445().run,
+            Matcher_Parser_447().run,
+            Matcher_Parser_448().run
         ])
-class Matcher_Parser_449:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_448())
 class Matcher_Parser_450:
+    def run(self, stream):
+        return stream.with_scope(Matcher_Parser_449().run)
+class Matcher_Parser_451:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_449()
+            Matcher_Parser_450().run
         ])
-class Matcher_Parser_451:
+TABLE_Parser_8 = {'\\': (0, 1)}
+class Matcher_Parser_452:
     def run(self, stream):
         return stream.match(lambda item: item == '\\', "'\\\\'")
-class Matcher_Parser_452:
+class Matcher_Parser_453:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_451()
+            Matcher_Parser_452().run
         ])
-class Matcher_Parser_453:
-    def run(self, stream):
-        return rules['Parser.escape'].run(stream)
 class Matcher_Parser_454:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_452(),
-            Matcher_Parser_453()
-        ])
+        return stream.match_rule('Parser.escape')
 class Matcher_Parser_455:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_454())
+        return stream.operator_and([
+            Matcher_Parser_453().run,
+            Matcher_Parser_454().run
+        ])
 class Matcher_Parser_456:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.with_scope(Matcher_Parser_455().run)
 class Matcher_Parser_457:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_456()
-        ])
+        return stream.match(lambda item: True, 'any')
 class Matcher_Parser_458:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_457())
+        return stream.operator_and([
+            Matcher_Parser_457().run
+        ])
 class Matcher_Parser_459:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_455(),
-            Matcher_Parser_458()
-        ])
+        return stream.with_scope(Matcher_Parser_458().run)
 class Matcher_Parser_460:
     def run(self, stream):
-        return stream.match(lambda item: item == '\\', "'\\\\'")
+        return stream.operator_dispatch(TABLE_Parser_8, (1,), [
+            Matcher_Parser_456().run,
+            Matcher_Parser_459().run
+        ])
+TABLE_Parser_9 = {'"': (2,), "'": (1,), '\\': (0,), 'n': (3,)}
 class Matcher_Parser_461:
+    def run(self, stream):
+        return stream.match(lambda item: item == '\\', "'\\\\'")
+class Matcher_Parser_462:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_460()
+            Matcher_Parser_461().run
         ])
-class Matcher_Parser_462:
+class Matcher_Parser_463:
     def run(self, stream):
         return stream.action(lambda self: '\\')
-class Matcher_Parser_463:
+class Matcher_Parser_464:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_461(),
-            Matcher_Parser_462()
+            Matcher_Parser_462().run,
+            Matcher_Parser_463().run
         ])
-class Matcher_Parser_464:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_463())
 class Matcher_Parser_465:
     def run(self, stream):
-        return stream.match(lambda item: item == "'", '"\'"')
+        return stream.with_scope(Matcher_Parser_464().run)
 class Matcher_Parser_466:
+    def run(self, stream):
+        return stream.match(lambda item: item == "'", '"\'"')
+class Matcher_Parser_467:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_465()
+            Matcher_Parser_466().run
         ])
-class Matcher_Parser_467:
+class Matcher_Parser_468:
     def run(self, stream):
         return stream.action(lambda self: "'")
-class Matcher_Parser_468:
+class Matcher_Parser_469:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_466(),
-            Matcher_Parser_467()
+            Matcher_Parser_467().run,
+            Matcher_Parser_468().run
         ])
-class Matcher_Parser_469:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_468())
 class Matcher_Parser_470:
     def run(self, stream):
-        return stream.match(lambda item: item == '"', '\'"\'')
+        return stream.with_scope(Matcher_Parser_469().run)
 class Matcher_Parser_471:
+    def run(self, stream):
+        return stream.match(lambda item: item == '"', '\'"\'')
+class Matcher_Parser_472:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_470()
+            Matcher_Parser_471().run
         ])
-class Matcher_Parser_472:
+class Matcher_Parser_473:
     def run(self, stream):
         return stream.action(lambda self: '"')
-class Matcher_Parser_473:
+class Matcher_Parser_474:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_471(),
-            Matcher_Parser_472()
+            Matcher_Parser_472().run,
+            Matcher_Parser_473().run
         ])
-class Matcher_Parser_474:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_473())
 class Matcher_Parser_475:
     def run(self, stream):
-        return stream.match(lambda item: item == 'n', "'n'")
+        return stream.with_scope(Matcher_Parser_474().run)
 class Matcher_Parser_476:
+    def run(self, stream):
+        return stream.match(lambda item: item == 'n', "'n'")
+class Matcher_Parser_477:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_475()
+            Matcher_Parser_476().run
         ])
-class Matcher_Parser_477:
+class Matcher_Parser_478:
     def run(self, stream):
         return stream.action(lambda self: '\n')
-class Matcher_Parser_478:
+class Matcher_Parser_479:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_476(),
-            Matcher_Parser_477()
+            Matcher_Parser_477().run,
+            Matcher_Parser_478().run
         ])
-class Matcher_Parser_479:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_478())
 class Matcher_Parser_480:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_464(),
-            Matcher_Parser_469(),
-            Matcher_Parser_474(),
-            Matcher_Parser_479()
-        ])
+        return stream.with_scope(Matcher_Parser_479().run)
 class Matcher_Parser_481:
     def run(self, stream):
-        return rules['Parser.nameStart'].run(stream)
+        return stream.operator_dispatch(TABLE_Parser_9, (), [
+            Matcher_Parser_465().run,
+            Matcher_Parser_470().run,
+            Matcher_Parser_475().run,
+            Matcher_Parser_480().run
+        ])
 class Matcher_Parser_482:
     def run(self, stream):
-        return stream.bind('x', Matcher_Parser_481().run(stream))
+        return stream.match_rule('Parser.nameStart')
 class Matcher_Parser_483:
     def run(self, stream):
-        return rules['Parser.nameChar'].run(stream)
+        return stream.bind('x', Matcher_Parser_482().run(stream))
+PATTERN_Parser_1 = re.compile('(?:[0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz])*', re.DOTALL)
 class Matcher_Parser_484:
     def run(self, stream):
-        return stream.operator_star(Matcher_Parser_483())
+        return stream.match_rule('Parser.nameChar')
 class Matcher_Parser_485:
     def run(self, stream):
-        return stream.bind('xs', Matcher_Parser_484().run(stream))
+        return stream.operator_star(Matcher_Parser_484().run)
 class Matcher_Parser_486:
     def run(self, stream):
-        return stream.action(lambda self: self.lookup('join')([
-            self.lookup('x'),
-            self.lookup('xs')
-        ]))
+        return stream.match_pattern(PATTERN_Parser_1, Matcher_Parser_485().run)
 class Matcher_Parser_487:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_482(),
-            Matcher_Parser_485(),
-            Matcher_Parser_486()
-        ])
+        return stream.bind('xs', Matcher_Parser_486().run(stream))
 class Matcher_Parser_488:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_487())
+        return stream.action(lambda self: self.lookup('join')([
+            self.lookup('x'),
+            self.lookup('xs')
+        ]))
 class Matcher_Parser_489:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_488()
+        return stream.operator_and([
+            Matcher_Parser_483().run,
+            Matcher_Parser_487().run,
+            Matcher_Parser_488().run
         ])
 class Matcher_Parser_490:
     def run(self, stream):
-        return stream.match(lambda item: 'a' <= item <= 'z', "'a'-'z'")
+        return stream.with_scope(Matcher_Parser_489().run)
 class Matcher_Parser_491:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_490()
+        return stream.operator_or([
+            Matcher_Parser_490().run
         ])
+CHARS_Parser_0 = frozenset('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz')
 class Matcher_Parser_492:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_491())
+        return stream.match_set(CHARS_Parser_0, "'a'-'z'")
+CHARS_Parser_1 = frozenset('0123456789ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz')
 class Matcher_Parser_493:
     def run(self, stream):
-        return stream.match(lambda item: 'A' <= item <= 'Z', "'A'-'Z'")
+        return stream.match_set(CHARS_Parser_1, "'a'-'z'")
+PATTERN_Parser_2 = re.compile('(?:[\\\n\\ ])*', re.DOTALL)
+CHARS_Parser_2 = frozenset('\n ')
 class Matcher_Parser_494:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_493()
-        ])
+        return stream.match_set(CHARS_Parser_2, "' '")
 class Matcher_Parser_495:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_494())
+        return stream.operator_star(Matcher_Parser_494().run)
 class Matcher_Parser_496:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_492(),
-            Matcher_Parser_495()
-        ])
+        return stream.match_pattern(PATTERN_Parser_2, Matcher_Parser_495().run)
 class Matcher_Parser_497:
-    def run(self, stream):
-        return stream.match(lambda item: 'a' <= item <= 'z', "'a'-'z'")
-class Matcher_Parser_498:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_497()
-        ])
-class Matcher_Parser_499:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_498())
-class Matcher_Parser_500:
-    def run(self, stream):
-        return stream.match(lambda item: 'A' <= item <= 'Z', "'A'-'Z'")
-class Matcher_Parser_501:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_500()
-        ])
-class Matcher_Parser_502:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_501())
-class Matcher_Parser_503:
-    def run(self, stream):
-        return stream.match(lambda item: '0' <= item <= '9', "'0'-'9'")
-class Matcher_Parser_504:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_503()
-        ])
-class Matcher_Parser_505:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_504())
-class Matcher_Parser_506:
-    def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_499(),
-            Matcher_Parser_502(),
-            Matcher_Parser_505()
-        ])
-class Matcher_Parser_507:
-    def run(self, stream):
-        return stream.match(lambda item: item == ' ', "' '")
-class Matcher_Parser_508:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_507()
-        ])
-class Matcher_Parser_509:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_508()
-        ])
-class Matcher_Parser_510:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_509())
-class Matcher_Parser_511:
-    def run(self, stream):
-        return stream.match(lambda item: item == '\n', "'\\n'")
-class Matcher_Parser_512:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_511()
-        ])
-class Matcher_Parser_513:
-    def run(self, stream):
-        return stream.operator_and([
-            Matcher_Parser_512()
-        ])
-class Matcher_Parser_514:
-    def run(self, stream):
-        return stream.with_scope(Matcher_Parser_513())
-class Matcher_Parser_515:
-    def run(self, stream):
-        return stream.operator_or([
-            Matcher_Parser_510(),
-            Matcher_Parser_514()
-        ])
-class Matcher_Parser_516:
-    def run(self, stream):
-        return stream.operator_star(Matcher_Parser_515())
-class Matcher_Parser_517:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_Parser_516()
+            Matcher_Parser_496().run
         ])
-class Matcher_Parser_518:
+class Matcher_Parser_498:
     def run(self, stream):
-        return stream.with_scope(Matcher_Parser_517())
-class Matcher_Parser_519:
+        return stream.with_scope(Matcher_Parser_497().run)
+class Matcher_Parser_499:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_Parser_518()
-        ])
-rules['Parser.file'] = Matcher_Parser_13()
-rules['Parser.namespace'] = Matcher_Parser_32()
-rules['Parser.rule'] = Matcher_Parser_47()
-rules['Parser.choice'] = Matcher_Parser_73()
-rules['Parser.sequence'] = Matcher_Parser_90()
-rules['Parser.expr'] = Matcher_Parser_129()
-rules['Parser.expr1'] = Matcher_Parser_176()
-rules['Parser.expr2'] = Matcher_Parser_262()
-rules['Parser.matchChar'] = Matcher_Parser_271()
-rules['Parser.maybeAction'] = Matcher_Parser_283()
-rules['Parser.actionExpr'] = Matcher_Parser_324()
-rules['Parser.hostExpr'] = Matcher_Parser_389()
-rules['Parser.hostListItem'] = Matcher_Parser_404()
-rules['Parser.var'] = Matcher_Parser_420()
-rules['Parser.string'] = Matcher_Parser_437()
-rules['Parser.char'] = Matcher_Parser_450()
-rules['Parser.innerChar'] = Matcher_Parser_459()
-rules['Parser.escape'] = Matcher_Parser_480()
-rules['Parser.name'] = Matcher_Parser_489()
-rules['Parser.nameStart'] = Matcher_Parser_496()
-rules['Parser.nameChar'] = Matcher_Parser_506()
-rules['Parser.space'] = Matcher_Parser_519()
+            Matcher_Parser_498().run
+        ])
+rules['Parser.file'] = Matcher_Parser_13().run
+rules['Parser.namespace'] = Matcher_Parser_32().run
+rules['Parser.rule'] = Matcher_Parser_47().run
+rules['Parser.choice'] = Matcher_Parser_73().run
+rules['Parser.sequence'] = Matcher_Parser_90().run
+rules['Parser.expr'] = Matcher_Parser_129().run
+rules['Parser.expr1'] = Matcher_Parser_176().run
+rules['Parser.expr2'] = Matcher_Parser_262().run
+rules['Parser.matchChar'] = Matcher_Parser_271().run
+rules['Parser.maybeAction'] = Matcher_Parser_283().run
+rules['Parser.actionExpr'] = Matcher_Parser_324().run
+rules['Parser.hostExpr'] = Matcher_Parser_389().run
+rules['Parser.hostListItem'] = Matcher_Parser_405().run
+rules['Parser.var'] = Matcher_Parser_421().run
+rules['Parser.string'] = Matcher_Parser_438().run
+rules['Parser.char'] = Matcher_Parser_451().run
+rules['Parser.innerChar'] = Matcher_Parser_460().run
+rules['Parser.escape'] = Matcher_Parser_481().run
+rules['Parser.name'] = Matcher_Parser_491().run
+rules['Parser.nameStart'] = Matcher_Parser_492().run
+rules['Parser.nameChar'] = Matcher_Parser_493().run
+rules['Parser.space'] = Matcher_Parser_499().run
 class Matcher_CodeGenerator_0:
     def run(self, stream):
         return stream.match_call_rule('CodeGenerator')
@@ -2653,148 +3614,157 @@ class Matcher_CodeGenerator_2:
         return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_3:
     def run(self, stream):
-        return stream.operator_not(Matcher_CodeGenerator_2())
+        return stream.operator_not(Matcher_CodeGenerator_2().run)
 class Matcher_CodeGenerator_4:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('x'))
 class Matcher_CodeGenerator_5:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_1(),
-            Matcher_CodeGenerator_3(),
-            Matcher_CodeGenerator_4()
+            Matcher_CodeGenerator_1().run,
+            Matcher_CodeGenerator_3().run,
+            Matcher_CodeGenerator_4().run
         ])
 class Matcher_CodeGenerator_6:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_5())
+        return stream.with_scope(Matcher_CodeGenerator_5().run)
 class Matcher_CodeGenerator_7:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_6()
+            Matcher_CodeGenerator_6().run
         ])
 class Matcher_CodeGenerator_8:
     def run(self, stream):
-        return rules['CodeGenerator.astInner'].run(stream)
+        return stream.match_rule('CodeGenerator.astInner')
 class Matcher_CodeGenerator_9:
     def run(self, stream):
         return stream.bind('x', Matcher_CodeGenerator_8().run(stream))
 class Matcher_CodeGenerator_10:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_9()
+            Matcher_CodeGenerator_9().run
         ])
 class Matcher_CodeGenerator_11:
     def run(self, stream):
-        return stream.match_list(Matcher_CodeGenerator_10())
+        return stream.match_list(Matcher_CodeGenerator_10().run)
 class Matcher_CodeGenerator_12:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('x'))
 class Matcher_CodeGenerator_13:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_11(),
-            Matcher_CodeGenerator_12()
+            Matcher_CodeGenerator_11().run,
+            Matcher_CodeGenerator_12().run
         ])
 class Matcher_CodeGenerator_14:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_13())
+        return stream.with_scope(Matcher_CodeGenerator_13().run)
 class Matcher_CodeGenerator_15:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_14()
+            Matcher_CodeGenerator_14().run
         ])
 class Matcher_CodeGenerator_16:
     def run(self, stream):
         return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_17:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.bind('x', Matcher_CodeGenerator_16().run(stream))
 class Matcher_CodeGenerator_18:
     def run(self, stream):
-        return stream.operator_star(Matcher_CodeGenerator_17())
+        return stream.match_rule('CodeGenerator.ast')
 class Matcher_CodeGenerator_19:
     def run(self, stream):
-        return stream.bind('xs', Matcher_CodeGenerator_18().run(stream))
+        return stream.operator_star(Matcher_CodeGenerator_18().run)
 class Matcher_CodeGenerator_20:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.bind('xs', Matcher_CodeGenerator_19().run(stream))
 class Matcher_CodeGenerator_21:
     def run(self, stream):
-        return stream.operator_not(Matcher_CodeGenerator_20())
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_22:
     def run(self, stream):
-        return stream.action(lambda self: self.lookup('join')([
-            self.lookup('xs')
-        ]))
+        return stream.operator_not(Matcher_CodeGenerator_21().run)
 class Matcher_CodeGenerator_23:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_16(),
-            Matcher_CodeGenerator_19(),
-            Matcher_CodeGenerator_21(),
-            Matcher_CodeGenerator_22()
-        ])
+        return stream.action(lambda self: self.bind('backend', self.lookup('x'), lambda: self.lookup('join')([
+            self.lookup('xs')
+        ])))
 class Matcher_CodeGenerator_24:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_23())
+        return stream.operator_and([
+            Matcher_CodeGenerator_17().run,
+            Matcher_CodeGenerator_20().run,
+            Matcher_CodeGenerator_22().run,
+            Matcher_CodeGenerator_23().run
+        ])
 class Matcher_CodeGenerator_25:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_24()
-        ])
+        return stream.with_scope(Matcher_CodeGenerator_24().run)
 class Matcher_CodeGenerator_26:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.operator_or([
+            Matcher_CodeGenerator_25().run
+        ])
 class Matcher_CodeGenerator_27:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_26().run(stream))
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_28:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.bind('x', Matcher_CodeGenerator_27().run(stream))
 class Matcher_CodeGenerator_29:
     def run(self, stream):
-        return stream.operator_star(Matcher_CodeGenerator_28())
+        return stream.match_rule('CodeGenerator.ast')
 class Matcher_CodeGenerator_30:
     def run(self, stream):
-        return stream.bind('ys', Matcher_CodeGenerator_29().run(stream))
+        return stream.operator_star(Matcher_CodeGenerator_29().run)
 class Matcher_CodeGenerator_31:
+    def run(self, stream):
+        return stream.bind('ys', Matcher_CodeGenerator_30().run(stream))
+class Matcher_CodeGenerator_32:
     def run(self, stream):
         return stream.action(lambda self: self.bind('namespace', self.lookup('x'), lambda: self.bind('ids', self.lookup('concat')([
         
         ]), lambda: self.bind('matchers', self.lookup('concat')([
         
+        ]), lambda: self.bind('sets', self.lookup('concat')([
+        
+        ]), lambda: self.bind('patterns', self.lookup('concat')([
+        
+        ]), lambda: self.bind('tables', self.lookup('concat')([
+        
         ]), lambda: self.lookup('join')([
             self.lookup('matchers'),
             self.lookup('ys')
-        ])))))
-class Matcher_CodeGenerator_32:
+        ]))))))))
+class Matcher_CodeGenerator_33:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_27(),
-            Matcher_CodeGenerator_30(),
-            Matcher_CodeGenerator_31()
+            Matcher_CodeGenerator_28().run,
+            Matcher_CodeGenerator_31().run,
+            Matcher_CodeGenerator_32().run
         ])
-class Matcher_CodeGenerator_33:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_32())
 class Matcher_CodeGenerator_34:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_33()
-        ])
+        return stream.with_scope(Matcher_CodeGenerator_33().run)
 class Matcher_CodeGenerator_35:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.operator_or([
+            Matcher_CodeGenerator_34().run
+        ])
 class Matcher_CodeGenerator_36:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_35().run(stream))
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_37:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.bind('x', Matcher_CodeGenerator_36().run(stream))
 class Matcher_CodeGenerator_38:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_37().run(stream))
+        return stream.match_rule('CodeGenerator.ast')
 class Matcher_CodeGenerator_39:
+    def run(self, stream):
+        return stream.bind('y', Matcher_CodeGenerator_38().run(stream))
+class Matcher_CodeGenerator_40:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             "rules['",
@@ -2805,503 +3775,756 @@ class Matcher_CodeGenerator_39:
             self.lookup('y'),
             '\n'
         ]))
-class Matcher_CodeGenerator_40:
+class Matcher_CodeGenerator_41:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_36(),
-            Matcher_CodeGenerator_38(),
-            Matcher_CodeGenerator_39()
+            Matcher_CodeGenerator_37().run,
+            Matcher_CodeGenerator_39().run,
+            Matcher_CodeGenerator_40().run
         ])
-class Matcher_CodeGenerator_41:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_40())
 class Matcher_CodeGenerator_42:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_41()
-        ])
+        return stream.with_scope(Matcher_CodeGenerator_41().run)
 class Matcher_CodeGenerator_43:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.operator_or([
+            Matcher_CodeGenerator_42().run
+        ])
 class Matcher_CodeGenerator_44:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_45:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_44().run(stream))
+        return stream.bind('x', Matcher_CodeGenerator_44().run(stream))
 class Matcher_CodeGenerator_46:
     def run(self, stream):
-        return rules['CodeGenerator.astList'].run(stream)
+        return stream.match_rule('CodeGenerator.matcher')
 class Matcher_CodeGenerator_47:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_46().run(stream))
+        return stream.bind('m', Matcher_CodeGenerator_46().run(stream))
 class Matcher_CodeGenerator_48:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.operator_or([',
-            self.lookup('x'),
-            '])'
-        ]), lambda: self.lookup('m')))
+        return stream.match_rule('CodeGenerator.ast')
 class Matcher_CodeGenerator_49:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_43(),
-            Matcher_CodeGenerator_45(),
-            Matcher_CodeGenerator_47(),
-            Matcher_CodeGenerator_48()
-        ])
+        return stream.bind('y', Matcher_CodeGenerator_48().run(stream))
 class Matcher_CodeGenerator_50:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_49())
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            "stream.grow_seed('",
+            self.lookup('namespace'),
+            '.',
+            self.lookup('x'),
+            "', ",
+            self.lookup('y'),
+            ')'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_51:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_50()
+        return stream.operator_and([
+            Matcher_CodeGenerator_45().run,
+            Matcher_CodeGenerator_47().run,
+            Matcher_CodeGenerator_49().run,
+            Matcher_CodeGenerator_50().run
         ])
 class Matcher_CodeGenerator_52:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.with_scope(Matcher_CodeGenerator_51().run)
 class Matcher_CodeGenerator_53:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.operator_or([
+            Matcher_CodeGenerator_52().run
+        ])
 class Matcher_CodeGenerator_54:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_53().run(stream))
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_55:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.match_rule('CodeGenerator.matcher')
 class Matcher_CodeGenerator_56:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_55().run(stream))
+        return stream.bind('m', Matcher_CodeGenerator_55().run(stream))
 class Matcher_CodeGenerator_57:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.with_scope(',
-            self.lookup('x'),
-            ')'
-        ]), lambda: self.lookup('m')))
+        return stream.match_rule('CodeGenerator.astList')
 class Matcher_CodeGenerator_58:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_52(),
-            Matcher_CodeGenerator_54(),
-            Matcher_CodeGenerator_56(),
-            Matcher_CodeGenerator_57()
-        ])
+        return stream.bind('x', Matcher_CodeGenerator_57().run(stream))
 class Matcher_CodeGenerator_59:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_58())
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.operator_or([',
+            self.lookup('x'),
+            '])'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_60:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_59()
+        return stream.operator_and([
+            Matcher_CodeGenerator_54().run,
+            Matcher_CodeGenerator_56().run,
+            Matcher_CodeGenerator_58().run,
+            Matcher_CodeGenerator_59().run
         ])
 class Matcher_CodeGenerator_61:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.with_scope(Matcher_CodeGenerator_60().run)
 class Matcher_CodeGenerator_62:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
-class Matcher_CodeGenerator_63:
+        return stream.operator_or([
+            Matcher_CodeGenerator_61().run
+        ])
+class Matcher_CodeGenerator_63:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_62().run(stream))
+        return stream.match_rule('CodeGenerator.repr')
 class Matcher_CodeGenerator_64:
     def run(self, stream):
-        return rules['CodeGenerator.astList'].run(stream)
+        return stream.bind('x', Matcher_CodeGenerator_63().run(stream))
 class Matcher_CodeGenerator_65:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_64().run(stream))
+        return stream.match_rule('CodeGenerator.repr')
 class Matcher_CodeGenerator_66:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.operator_and([',
-            self.lookup('x'),
-            '])'
-        ]), lambda: self.lookup('m')))
+        return stream.bind('y', Matcher_CodeGenerator_65().run(stream))
 class Matcher_CodeGenerator_67:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_61(),
-            Matcher_CodeGenerator_63(),
-            Matcher_CodeGenerator_65(),
-            Matcher_CodeGenerator_66()
+            Matcher_CodeGenerator_64().run,
+            Matcher_CodeGenerator_66().run
         ])
 class Matcher_CodeGenerator_68:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_67())
+        return stream.match_list(Matcher_CodeGenerator_67().run)
 class Matcher_CodeGenerator_69:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_68()
-        ])
+        return stream.match_rule('CodeGenerator.matcher')
 class Matcher_CodeGenerator_70:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.bind('m', Matcher_CodeGenerator_69().run(stream))
 class Matcher_CodeGenerator_71:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_70().run(stream))
+        return stream.match_rule('CodeGenerator.astList')
 class Matcher_CodeGenerator_72:
     def run(self, stream):
-        return rules['CodeGenerator.repr'].run(stream)
+        return stream.bind('a', Matcher_CodeGenerator_71().run(stream))
 class Matcher_CodeGenerator_73:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_72().run(stream))
+        return stream.action(lambda self: self.bind('z', self.lookup('join')([
+            'TABLE_',
+            self.lookup('namespace'),
+            '_',
+            self.lookup('len')(
+                self.lookup('tables')
+            )
+        ]), lambda: self.bind('', self.lookup('append')(
+            self.lookup('tables'),
+            self.lookup('z')
+        ), lambda: self.bind('', self.lookup('append')(
+            self.lookup('matchers'),
+            self.lookup('join')([
+                self.lookup('z'),
+                ' = ',
+                self.lookup('x'),
+                '\n'
+            ])
+        ), lambda: self.bind('body', self.lookup('join')([
+            'stream.operator_dispatch(',
+            self.lookup('z'),
+            ', ',
+            self.lookup('y'),
+            ', [',
+            self.lookup('a'),
+            '])'
+        ]), lambda: self.lookup('m'))))))
 class Matcher_CodeGenerator_74:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.operator_and([
+            Matcher_CodeGenerator_68().run,
+            Matcher_CodeGenerator_70().run,
+            Matcher_CodeGenerator_72().run,
+            Matcher_CodeGenerator_73().run
+        ])
 class Matcher_CodeGenerator_75:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_74().run(stream))
+        return stream.with_scope(Matcher_CodeGenerator_74().run)
 class Matcher_CodeGenerator_76:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.bind(',
-            self.lookup('x'),
-            ', ',
-            self.lookup('y'),
-            '.run(stream))'
-        ]), lambda: self.lookup('m')))
+        return stream.operator_or([
+            Matcher_CodeGenerator_75().run
+        ])
 class Matcher_CodeGenerator_77:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_71(),
-            Matcher_CodeGenerator_73(),
-            Matcher_CodeGenerator_75(),
-            Matcher_CodeGenerator_76()
-        ])
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_78:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_77())
+        return stream.match_rule('CodeGenerator.matcher')
 class Matcher_CodeGenerator_79:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_78()
-        ])
+        return stream.bind('m', Matcher_CodeGenerator_78().run(stream))
 class Matcher_CodeGenerator_80:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.match_rule('CodeGenerator.ast')
 class Matcher_CodeGenerator_81:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.bind('x', Matcher_CodeGenerator_80().run(stream))
 class Matcher_CodeGenerator_82:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_81().run(stream))
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.with_scope(',
+            self.lookup('x'),
+            ')'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_83:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.operator_and([
+            Matcher_CodeGenerator_77().run,
+            Matcher_CodeGenerator_79().run,
+            Matcher_CodeGenerator_81().run,
+            Matcher_CodeGenerator_82().run
+        ])
 class Matcher_CodeGenerator_84:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_83().run(stream))
+        return stream.with_scope(Matcher_CodeGenerator_83().run)
 class Matcher_CodeGenerator_85:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.operator_star(',
-            self.lookup('x'),
-            ')'
-        ]), lambda: self.lookup('m')))
+        return stream.operator_or([
+            Matcher_CodeGenerator_84().run
+        ])
 class Matcher_CodeGenerator_86:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_80(),
-            Matcher_CodeGenerator_82(),
-            Matcher_CodeGenerator_84(),
-            Matcher_CodeGenerator_85()
-        ])
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_87:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_86())
+        return stream.match_rule('CodeGenerator.matcher')
 class Matcher_CodeGenerator_88:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_87()
-        ])
+        return stream.bind('m', Matcher_CodeGenerator_87().run(stream))
 class Matcher_CodeGenerator_89:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.match_rule('CodeGenerator.astList')
 class Matcher_CodeGenerator_90:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.bind('x', Matcher_CodeGenerator_89().run(stream))
 class Matcher_CodeGenerator_91:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_90().run(stream))
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.operator_and([',
+            self.lookup('x'),
+            '])'
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_92:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.operator_and([
+            Matcher_CodeGenerator_86().run,
+            Matcher_CodeGenerator_88().run,
+            Matcher_CodeGenerator_90().run,
+            Matcher_CodeGenerator_91().run
+        ])
 class Matcher_CodeGenerator_93:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_92().run(stream))
+        return stream.with_scope(Matcher_CodeGenerator_92().run)
 class Matcher_CodeGenerator_94:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.operator_not(',
-            self.lookup('x'),
-            ')'
-        ]), lambda: self.lookup('m')))
+        return stream.operator_or([
+            Matcher_CodeGenerator_93().run
+        ])
 class Matcher_CodeGenerator_95:
     def run(self, stream):
-        return stream.operator_and([
-            Matcher_CodeGenerator_89(),
-            Matcher_CodeGenerator_91(),
-            Matcher_CodeGenerator_93(),
-            Matcher_CodeGenerator_94()
-        ])
+        return stream.match_rule('CodeGenerator.matcher')
 class Matcher_CodeGenerator_96:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_95())
+        return stream.bind('m', Matcher_CodeGenerator_95().run(stream))
 class Matcher_CodeGenerator_97:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_96()
-        ])
+        return stream.match_rule('CodeGenerator.repr')
 class Matcher_CodeGenerator_98:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.bind('x', Matcher_CodeGenerator_97().run(stream))
 class Matcher_CodeGenerator_99:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.match_rule('CodeGenerator.ast')
 class Matcher_CodeGenerator_100:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_99().run(stream))
+        return stream.bind('y', Matcher_CodeGenerator_99().run(stream))
 class Matcher_CodeGenerator_101:
     def run(self, stream):
         return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            "stream.match_call_rule('",
-            self.lookup('namespace'),
-            "')"
+            'stream.bind(',
+            self.lookup('x'),
+            ', ',
+            self.lookup('y'),
+            '(stream))'
         ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_102:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_98(),
-            Matcher_CodeGenerator_100(),
-            Matcher_CodeGenerator_101()
+            Matcher_CodeGenerator_96().run,
+            Matcher_CodeGenerator_98().run,
+            Matcher_CodeGenerator_100().run,
+            Matcher_CodeGenerator_101().run
         ])
 class Matcher_CodeGenerator_103:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_102())
+        return stream.with_scope(Matcher_CodeGenerator_102().run)
 class Matcher_CodeGenerator_104:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_103()
+            Matcher_CodeGenerator_103().run
         ])
 class Matcher_CodeGenerator_105:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_106:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_105().run(stream))
+        return stream.match_rule('CodeGenerator.matcher')
 class Matcher_CodeGenerator_107:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.bind('m', Matcher_CodeGenerator_106().run(stream))
 class Matcher_CodeGenerator_108:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_107().run(stream))
+        return stream.match_rule('CodeGenerator.ast')
 class Matcher_CodeGenerator_109:
+    def run(self, stream):
+        return stream.bind('x', Matcher_CodeGenerator_108().run(stream))
+class Matcher_CodeGenerator_110:
     def run(self, stream):
         return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            "rules['",
-            self.lookup('namespace'),
-            '.',
+            'stream.operator_star(',
             self.lookup('x'),
-            "'].run(stream)"
+            ')'
         ]), lambda: self.lookup('m')))
-class Matcher_CodeGenerator_110:
+class Matcher_CodeGenerator_111:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_106(),
-            Matcher_CodeGenerator_108(),
-            Matcher_CodeGenerator_109()
+            Matcher_CodeGenerator_105().run,
+            Matcher_CodeGenerator_107().run,
+            Matcher_CodeGenerator_109().run,
+            Matcher_CodeGenerator_110().run
         ])
-class Matcher_CodeGenerator_111:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_110())
 class Matcher_CodeGenerator_112:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_111()
-        ])
+        return stream.with_scope(Matcher_CodeGenerator_111().run)
 class Matcher_CodeGenerator_113:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.operator_or([
+            Matcher_CodeGenerator_112().run
+        ])
 class Matcher_CodeGenerator_114:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_115:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_114().run(stream))
+        return stream.match_rule('CodeGenerator.matcher')
 class Matcher_CodeGenerator_116:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.bind('m', Matcher_CodeGenerator_115().run(stream))
 class Matcher_CodeGenerator_117:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_116().run(stream))
+        return stream.match_rule('CodeGenerator.ast')
 class Matcher_CodeGenerator_118:
+    def run(self, stream):
+        return stream.bind('x', Matcher_CodeGenerator_117().run(stream))
+class Matcher_CodeGenerator_119:
     def run(self, stream):
         return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.match(lambda item: ',
+            'stream.operator_not(',
             self.lookup('x'),
             ')'
         ]), lambda: self.lookup('m')))
-class Matcher_CodeGenerator_119:
+class Matcher_CodeGenerator_120:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_113(),
-            Matcher_CodeGenerator_115(),
-            Matcher_CodeGenerator_117(),
-            Matcher_CodeGenerator_118()
+            Matcher_CodeGenerator_114().run,
+            Matcher_CodeGenerator_116().run,
+            Matcher_CodeGenerator_118().run,
+            Matcher_CodeGenerator_119().run
         ])
-class Matcher_CodeGenerator_120:
-    def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_119())
 class Matcher_CodeGenerator_121:
     def run(self, stream):
-        return stream.operator_or([
-            Matcher_CodeGenerator_120()
-        ])
+        return stream.with_scope(Matcher_CodeGenerator_120().run)
 class Matcher_CodeGenerator_122:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
+        return stream.operator_or([
+            Matcher_CodeGenerator_121().run
+        ])
 class Matcher_CodeGenerator_123:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
+        return stream.match(lambda item: True, 'any')
 class Matcher_CodeGenerator_124:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_123().run(stream))
+        return stream.match_rule('CodeGenerator.matcher')
 class Matcher_CodeGenerator_125:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
+        return stream.bind('m', Matcher_CodeGenerator_124().run(stream))
 class Matcher_CodeGenerator_126:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_125().run(stream))
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            "stream.match_call_rule('",
+            self.lookup('namespace'),
+            "')"
+        ]), lambda: self.lookup('m')))
 class Matcher_CodeGenerator_127:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_123().run,
+            Matcher_CodeGenerator_125().run,
+            Matcher_CodeGenerator_126().run
+        ])
+class Matcher_CodeGenerator_128:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_127().run)
+class Matcher_CodeGenerator_129:
+    def run(self, stream):
+        return stream.operator_or([
+            Matcher_CodeGenerator_128().run
+        ])
+class Matcher_CodeGenerator_130:
+    def run(self, stream):
+        return stream.match_rule('CodeGenerator.matcher')
+class Matcher_CodeGenerator_131:
+    def run(self, stream):
+        return stream.bind('m', Matcher_CodeGenerator_130().run(stream))
+class Matcher_CodeGenerator_132:
+    def run(self, stream):
+        return stream.match(lambda item: True, 'any')
+class Matcher_CodeGenerator_133:
+    def run(self, stream):
+        return stream.bind('x', Matcher_CodeGenerator_132().run(stream))
+class Matcher_CodeGenerator_134:
+    def run(self, stream):
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            "stream.match_rule('",
+            self.lookup('namespace'),
+            '.',
+            self.lookup('x'),
+            "')"
+        ]), lambda: self.lookup('m')))
+class Matcher_CodeGenerator_135:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_131().run,
+            Matcher_CodeGenerator_133().run,
+            Matcher_CodeGenerator_134().run
+        ])
+class Matcher_CodeGenerator_136:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_135().run)
+class Matcher_CodeGenerator_137:
+    def run(self, stream):
+        return stream.operator_or([
+            Matcher_CodeGenerator_136().run
+        ])
+class Matcher_CodeGenerator_138:
+    def run(self, stream):
+        return stream.match(lambda item: True, 'any')
+class Matcher_CodeGenerator_139:
+    def run(self, stream):
+        return stream.match_rule('CodeGenerator.matcher')
+class Matcher_CodeGenerator_140:
+    def run(self, stream):
+        return stream.bind('m', Matcher_CodeGenerator_139().run(stream))
+class Matcher_CodeGenerator_141:
+    def run(self, stream):
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_142:
+    def run(self, stream):
+        return stream.bind('x', Matcher_CodeGenerator_141().run(stream))
+class Matcher_CodeGenerator_143:
+    def run(self, stream):
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.match(lambda item: ',
+            self.lookup('x'),
+            ')'
+        ]), lambda: self.lookup('m')))
+class Matcher_CodeGenerator_144:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_138().run,
+            Matcher_CodeGenerator_140().run,
+            Matcher_CodeGenerator_142().run,
+            Matcher_CodeGenerator_143().run
+        ])
+class Matcher_CodeGenerator_145:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_144().run)
+class Matcher_CodeGenerator_146:
+    def run(self, stream):
+        return stream.operator_or([
+            Matcher_CodeGenerator_145().run
+        ])
+class Matcher_CodeGenerator_147:
+    def run(self, stream):
+        return stream.match(lambda item: True, 'any')
+class Matcher_CodeGenerator_148:
+    def run(self, stream):
+        return stream.match_rule('CodeGenerator.matcher')
+class Matcher_CodeGenerator_149:
+    def run(self, stream):
+        return stream.bind('m', Matcher_CodeGenerator_148().run(stream))
+class Matcher_CodeGenerator_150:
+    def run(self, stream):
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_151:
+    def run(self, stream):
+        return stream.bind('x', Matcher_CodeGenerator_150().run(stream))
+class Matcher_CodeGenerator_152:
     def run(self, stream):
         return stream.action(lambda self: self.bind('body', self.lookup('join')([
             'stream.match_list(',
             self.lookup('x'),
             ')'
         ]), lambda: self.lookup('m')))
-class Matcher_CodeGenerator_128:
+class Matcher_CodeGenerator_153:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_122(),
-            Matcher_CodeGenerator_124(),
-            Matcher_CodeGenerator_126(),
-            Matcher_CodeGenerator_127()
+            Matcher_CodeGenerator_147().run,
+            Matcher_CodeGenerator_149().run,
+            Matcher_CodeGenerator_151().run,
+            Matcher_CodeGenerator_152().run
         ])
-class Matcher_CodeGenerator_129:
+class Matcher_CodeGenerator_154:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_128())
-class Matcher_CodeGenerator_130:
+        return stream.with_scope(Matcher_CodeGenerator_153().run)
+class Matcher_CodeGenerator_155:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_129()
+            Matcher_CodeGenerator_154().run
         ])
-class Matcher_CodeGenerator_131:
+class Matcher_CodeGenerator_156:
+    def run(self, stream):
+        return stream.match(lambda item: True, 'any')
+class Matcher_CodeGenerator_157:
+    def run(self, stream):
+        return stream.match_rule('CodeGenerator.matcher')
+class Matcher_CodeGenerator_158:
+    def run(self, stream):
+        return stream.bind('m', Matcher_CodeGenerator_157().run(stream))
+class Matcher_CodeGenerator_159:
+    def run(self, stream):
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_160:
+    def run(self, stream):
+        return stream.bind('x', Matcher_CodeGenerator_159().run(stream))
+class Matcher_CodeGenerator_161:
+    def run(self, stream):
+        return stream.action(lambda self: self.bind('body', self.lookup('join')([
+            'stream.match_range(',
+            self.lookup('x'),
+            ')'
+        ]), lambda: self.lookup('m')))
+class Matcher_CodeGenerator_162:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_156().run,
+            Matcher_CodeGenerator_158().run,
+            Matcher_CodeGenerator_160().run,
+            Matcher_CodeGenerator_161().run
+        ])
+class Matcher_CodeGenerator_163:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_162().run)
+class Matcher_CodeGenerator_164:
+    def run(self, stream):
+        return stream.operator_or([
+            Matcher_CodeGenerator_163().run
+        ])
+class Matcher_CodeGenerator_165:
+    def run(self, stream):
+        return stream.match_rule('CodeGenerator.repr')
+class Matcher_CodeGenerator_166:
+    def run(self, stream):
+        return stream.bind('x', Matcher_CodeGenerator_165().run(stream))
+class Matcher_CodeGenerator_167:
+    def run(self, stream):
+        return stream.match_rule('CodeGenerator.repr')
+class Matcher_CodeGenerator_168:
+    def run(self, stream):
+        return stream.bind('y', Matcher_CodeGenerator_167().run(stream))
+class Matcher_CodeGenerator_169:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_166().run,
+            Matcher_CodeGenerator_168().run
+        ])
+class Matcher_CodeGenerator_170:
+    def run(self, stream):
+        return stream.match_list(Matcher_CodeGenerator_169().run)
+class Matcher_CodeGenerator_171:
+    def run(self, stream):
+        return stream.match_rule('CodeGenerator.matcher')
+class Matcher_CodeGenerator_172:
+    def run(self, stream):
+        return stream.bind('m', Matcher_CodeGenerator_171().run(stream))
+class Matcher_CodeGenerator_173:
+    def run(self, stream):
+        return stream.action(lambda self: self.bind('z', self.lookup('join')([
+            'CHARS_',
+            self.lookup('namespace'),
+            '_',
+            self.lookup('len')(
+                self.lookup('sets')
+            )
+        ]), lambda: self.bind('', self.lookup('append')(
+            self.lookup('sets'),
+            self.lookup('z')
+        ), lambda: self.bind('', self.lookup('append')(
+            self.lookup('matchers'),
+            self.lookup('join')([
+                self.lookup('z'),
+                ' = frozenset(',
+                self.lookup('x'),
+                ')\n'
+            ])
+        ), lambda: self.bind('body', self.lookup('join')([
+            'stream.match_set(',
+            self.lookup('z'),
+            ', ',
+            self.lookup('y'),
+            ')'
+        ]), lambda: self.lookup('m'))))))
+class Matcher_CodeGenerator_174:
+    def run(self, stream):
+        return stream.operator_and([
+            Matcher_CodeGenerator_170().run,
+            Matcher_CodeGenerator_172().run,
+            Matcher_CodeGenerator_173().run
+        ])
+class Matcher_CodeGenerator_175:
+    def run(self, stream):
+        return stream.with_scope(Matcher_CodeGenerator_174().run)
+class Matcher_CodeGenerator_176:
+    def run(self, stream):
+        return stream.operator_or([
+            Matcher_CodeGenerator_175().run
+        ])
+class Matcher_CodeGenerator_177:
     def run(self, stream):
-        return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_132:
+        return stream.match_rule('CodeGenerator.repr')
+class Matcher_CodeGenerator_178:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
-class Matcher_CodeGenerator_133:
+        return stream.bind('x', Matcher_CodeGenerator_177().run(stream))
+class Matcher_CodeGenerator_179:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_132().run(stream))
-class Matcher_CodeGenerator_134:
+        return stream.match_rule('CodeGenerator.matcher')
+class Matcher_CodeGenerator_180:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_135:
+        return stream.bind('m', Matcher_CodeGenerator_179().run(stream))
+class Matcher_CodeGenerator_181:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_134().run(stream))
-class Matcher_CodeGenerator_136:
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_182:
     def run(self, stream):
-        return stream.action(lambda self: self.bind('body', self.lookup('join')([
-            'stream.match_range(',
-            self.lookup('x'),
+        return stream.bind('y', Matcher_CodeGenerator_181().run(stream))
+class Matcher_CodeGenerator_183:
+    def run(self, stream):
+        return stream.action(lambda self: self.bind('z', self.lookup('join')([
+            'PATTERN_',
+            self.lookup('namespace'),
+            '_',
+            self.lookup('len')(
+                self.lookup('patterns')
+            )
+        ]), lambda: self.bind('', self.lookup('append')(
+            self.lookup('patterns'),
+            self.lookup('z')
+        ), lambda: self.bind('', self.lookup('append')(
+            self.lookup('matchers'),
+            self.lookup('join')([
+                self.lookup('z'),
+                ' = re.compile(',
+                self.lookup('x'),
+                ', re.DOTALL)\n'
+            ])
+        ), lambda: self.bind('body', self.lookup('join')([
+            'stream.match_pattern(',
+            self.lookup('z'),
+            ', ',
+            self.lookup('y'),
             ')'
-        ]), lambda: self.lookup('m')))
-class Matcher_CodeGenerator_137:
+        ]), lambda: self.lookup('m'))))))
+class Matcher_CodeGenerator_184:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_131(),
-            Matcher_CodeGenerator_133(),
-            Matcher_CodeGenerator_135(),
-            Matcher_CodeGenerator_136()
+            Matcher_CodeGenerator_178().run,
+            Matcher_CodeGenerator_180().run,
+            Matcher_CodeGenerator_182().run,
+            Matcher_CodeGenerator_183().run
         ])
-class Matcher_CodeGenerator_138:
+class Matcher_CodeGenerator_185:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_137())
-class Matcher_CodeGenerator_139:
+        return stream.with_scope(Matcher_CodeGenerator_184().run)
+class Matcher_CodeGenerator_186:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_138()
+            Matcher_CodeGenerator_185().run
         ])
-class Matcher_CodeGenerator_140:
+class Matcher_CodeGenerator_187:
     def run(self, stream):
         return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_141:
+class Matcher_CodeGenerator_188:
     def run(self, stream):
-        return rules['CodeGenerator.matcher'].run(stream)
-class Matcher_CodeGenerator_142:
+        return stream.match_rule('CodeGenerator.matcher')
+class Matcher_CodeGenerator_189:
     def run(self, stream):
-        return stream.bind('m', Matcher_CodeGenerator_141().run(stream))
-class Matcher_CodeGenerator_143:
+        return stream.bind('m', Matcher_CodeGenerator_188().run(stream))
+class Matcher_CodeGenerator_190:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_144:
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_191:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_143().run(stream))
-class Matcher_CodeGenerator_145:
+        return stream.bind('x', Matcher_CodeGenerator_190().run(stream))
+class Matcher_CodeGenerator_192:
     def run(self, stream):
         return stream.action(lambda self: self.bind('body', self.lookup('join')([
             'stream.action(lambda self: ',
             self.lookup('x'),
             ')'
         ]), lambda: self.lookup('m')))
-class Matcher_CodeGenerator_146:
+class Matcher_CodeGenerator_193:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_140(),
-            Matcher_CodeGenerator_142(),
-            Matcher_CodeGenerator_144(),
-            Matcher_CodeGenerator_145()
+            Matcher_CodeGenerator_187().run,
+            Matcher_CodeGenerator_189().run,
+            Matcher_CodeGenerator_191().run,
+            Matcher_CodeGenerator_192().run
         ])
-class Matcher_CodeGenerator_147:
+class Matcher_CodeGenerator_194:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_146())
-class Matcher_CodeGenerator_148:
+        return stream.with_scope(Matcher_CodeGenerator_193().run)
+class Matcher_CodeGenerator_195:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_147()
+            Matcher_CodeGenerator_194().run
         ])
-class Matcher_CodeGenerator_149:
+class Matcher_CodeGenerator_196:
     def run(self, stream):
         return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_150:
+class Matcher_CodeGenerator_197:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             'True',
             ", 'any'"
         ]))
-class Matcher_CodeGenerator_151:
+class Matcher_CodeGenerator_198:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_149(),
-            Matcher_CodeGenerator_150()
+            Matcher_CodeGenerator_196().run,
+            Matcher_CodeGenerator_197().run
         ])
-class Matcher_CodeGenerator_152:
+class Matcher_CodeGenerator_199:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_151())
-class Matcher_CodeGenerator_153:
+        return stream.with_scope(Matcher_CodeGenerator_198().run)
+class Matcher_CodeGenerator_200:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_152()
+            Matcher_CodeGenerator_199().run
         ])
-class Matcher_CodeGenerator_154:
+class Matcher_CodeGenerator_201:
     def run(self, stream):
-        return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_155:
+        return stream.match_rule('CodeGenerator.repr')
+class Matcher_CodeGenerator_202:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_154().run(stream))
-class Matcher_CodeGenerator_156:
+        return stream.bind('x', Matcher_CodeGenerator_201().run(stream))
+class Matcher_CodeGenerator_203:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             'item == ',
@@ -3311,42 +4534,42 @@ class Matcher_CodeGenerator_156:
                 self.lookup('x')
             )
         ]))
-class Matcher_CodeGenerator_157:
+class Matcher_CodeGenerator_204:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_155(),
-            Matcher_CodeGenerator_156()
+            Matcher_CodeGenerator_202().run,
+            Matcher_CodeGenerator_203().run
         ])
-class Matcher_CodeGenerator_158:
+class Matcher_CodeGenerator_205:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_157())
-class Matcher_CodeGenerator_159:
+        return stream.with_scope(Matcher_CodeGenerator_204().run)
+class Matcher_CodeGenerator_206:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_158()
+            Matcher_CodeGenerator_205().run
         ])
-class Matcher_CodeGenerator_160:
+class Matcher_CodeGenerator_207:
     def run(self, stream):
-        return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_161:
+        return stream.match_rule('CodeGenerator.repr')
+class Matcher_CodeGenerator_208:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_160().run(stream))
-class Matcher_CodeGenerator_162:
+        return stream.bind('x', Matcher_CodeGenerator_207().run(stream))
+class Matcher_CodeGenerator_209:
     def run(self, stream):
-        return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_163:
+        return stream.match_rule('CodeGenerator.repr')
+class Matcher_CodeGenerator_210:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_162().run(stream))
-class Matcher_CodeGenerator_164:
+        return stream.bind('y', Matcher_CodeGenerator_209().run(stream))
+class Matcher_CodeGenerator_211:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_161(),
-            Matcher_CodeGenerator_163()
+            Matcher_CodeGenerator_208().run,
+            Matcher_CodeGenerator_210().run
         ])
-class Matcher_CodeGenerator_165:
+class Matcher_CodeGenerator_212:
     def run(self, stream):
-        return stream.match_list(Matcher_CodeGenerator_164())
-class Matcher_CodeGenerator_166:
+        return stream.match_list(Matcher_CodeGenerator_211().run)
+class Matcher_CodeGenerator_213:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             self.lookup('x'),
@@ -3358,39 +4581,39 @@ class Matcher_CodeGenerator_166:
             self.lookup('y'),
             '"'
         ]))
-class Matcher_CodeGenerator_167:
+class Matcher_CodeGenerator_214:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_165(),
-            Matcher_CodeGenerator_166()
+            Matcher_CodeGenerator_212().run,
+            Matcher_CodeGenerator_213().run
         ])
-class Matcher_CodeGenerator_168:
+class Matcher_CodeGenerator_215:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_167())
-class Matcher_CodeGenerator_169:
+        return stream.with_scope(Matcher_CodeGenerator_214().run)
+class Matcher_CodeGenerator_216:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_168()
+            Matcher_CodeGenerator_215().run
         ])
-class Matcher_CodeGenerator_170:
+class Matcher_CodeGenerator_217:
     def run(self, stream):
-        return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_171:
+        return stream.match_rule('CodeGenerator.repr')
+class Matcher_CodeGenerator_218:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_170().run(stream))
-class Matcher_CodeGenerator_172:
+        return stream.bind('x', Matcher_CodeGenerator_217().run(stream))
+class Matcher_CodeGenerator_219:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_173:
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_220:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_172().run(stream))
-class Matcher_CodeGenerator_174:
+        return stream.bind('y', Matcher_CodeGenerator_219().run(stream))
+class Matcher_CodeGenerator_221:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_175:
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_222:
     def run(self, stream):
-        return stream.bind('z', Matcher_CodeGenerator_174().run(stream))
-class Matcher_CodeGenerator_176:
+        return stream.bind('z', Matcher_CodeGenerator_221().run(stream))
+class Matcher_CodeGenerator_223:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             'self.bind(',
@@ -3401,82 +4624,82 @@ class Matcher_CodeGenerator_176:
             self.lookup('z'),
             ')'
         ]))
-class Matcher_CodeGenerator_177:
+class Matcher_CodeGenerator_224:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_171(),
-            Matcher_CodeGenerator_173(),
-            Matcher_CodeGenerator_175(),
-            Matcher_CodeGenerator_176()
+            Matcher_CodeGenerator_218().run,
+            Matcher_CodeGenerator_220().run,
+            Matcher_CodeGenerator_222().run,
+            Matcher_CodeGenerator_223().run
         ])
-class Matcher_CodeGenerator_178:
+class Matcher_CodeGenerator_225:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_177())
-class Matcher_CodeGenerator_179:
+        return stream.with_scope(Matcher_CodeGenerator_224().run)
+class Matcher_CodeGenerator_226:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_178()
+            Matcher_CodeGenerator_225().run
         ])
-class Matcher_CodeGenerator_180:
+class Matcher_CodeGenerator_227:
     def run(self, stream):
-        return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_181:
+        return stream.match_rule('CodeGenerator.repr')
+class Matcher_CodeGenerator_228:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_180()
+            Matcher_CodeGenerator_227().run
         ])
-class Matcher_CodeGenerator_182:
+class Matcher_CodeGenerator_229:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_181())
-class Matcher_CodeGenerator_183:
+        return stream.with_scope(Matcher_CodeGenerator_228().run)
+class Matcher_CodeGenerator_230:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_182()
+            Matcher_CodeGenerator_229().run
         ])
-class Matcher_CodeGenerator_184:
+class Matcher_CodeGenerator_231:
     def run(self, stream):
         return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_185:
+class Matcher_CodeGenerator_232:
     def run(self, stream):
-        return rules['CodeGenerator.astList'].run(stream)
-class Matcher_CodeGenerator_186:
+        return stream.match_rule('CodeGenerator.astList')
+class Matcher_CodeGenerator_233:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_185().run(stream))
-class Matcher_CodeGenerator_187:
+        return stream.bind('x', Matcher_CodeGenerator_232().run(stream))
+class Matcher_CodeGenerator_234:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             "self.lookup('concat')([",
             self.lookup('x'),
             '])'
         ]))
-class Matcher_CodeGenerator_188:
+class Matcher_CodeGenerator_235:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_184(),
-            Matcher_CodeGenerator_186(),
-            Matcher_CodeGenerator_187()
+            Matcher_CodeGenerator_231().run,
+            Matcher_CodeGenerator_233().run,
+            Matcher_CodeGenerator_234().run
         ])
-class Matcher_CodeGenerator_189:
+class Matcher_CodeGenerator_236:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_188())
-class Matcher_CodeGenerator_190:
+        return stream.with_scope(Matcher_CodeGenerator_235().run)
+class Matcher_CodeGenerator_237:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_189()
+            Matcher_CodeGenerator_236().run
         ])
-class Matcher_CodeGenerator_191:
+class Matcher_CodeGenerator_238:
     def run(self, stream):
-        return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_192:
+        return stream.match_rule('CodeGenerator.repr')
+class Matcher_CodeGenerator_239:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_191().run(stream))
-class Matcher_CodeGenerator_193:
+        return stream.bind('x', Matcher_CodeGenerator_238().run(stream))
+class Matcher_CodeGenerator_240:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_194:
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_241:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_193().run(stream))
-class Matcher_CodeGenerator_195:
+        return stream.bind('y', Matcher_CodeGenerator_240().run(stream))
+class Matcher_CodeGenerator_242:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             "self.lookup('splice')(",
@@ -3485,68 +4708,68 @@ class Matcher_CodeGenerator_195:
             self.lookup('y'),
             ')'
         ]))
-class Matcher_CodeGenerator_196:
+class Matcher_CodeGenerator_243:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_192(),
-            Matcher_CodeGenerator_194(),
-            Matcher_CodeGenerator_195()
+            Matcher_CodeGenerator_239().run,
+            Matcher_CodeGenerator_241().run,
+            Matcher_CodeGenerator_242().run
         ])
-class Matcher_CodeGenerator_197:
+class Matcher_CodeGenerator_244:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_196())
-class Matcher_CodeGenerator_198:
+        return stream.with_scope(Matcher_CodeGenerator_243().run)
+class Matcher_CodeGenerator_245:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_197()
+            Matcher_CodeGenerator_244().run
         ])
-class Matcher_CodeGenerator_199:
+class Matcher_CodeGenerator_246:
     def run(self, stream):
         return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_200:
+class Matcher_CodeGenerator_247:
     def run(self, stream):
-        return rules['CodeGenerator.astList'].run(stream)
-class Matcher_CodeGenerator_201:
+        return stream.match_rule('CodeGenerator.astList')
+class Matcher_CodeGenerator_248:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_200().run(stream))
-class Matcher_CodeGenerator_202:
+        return stream.bind('x', Matcher_CodeGenerator_247().run(stream))
+class Matcher_CodeGenerator_249:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             "self.lookup('join')([",
             self.lookup('x'),
             '])'
         ]))
-class Matcher_CodeGenerator_203:
+class Matcher_CodeGenerator_250:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_199(),
-            Matcher_CodeGenerator_201(),
-            Matcher_CodeGenerator_202()
+            Matcher_CodeGenerator_246().run,
+            Matcher_CodeGenerator_248().run,
+            Matcher_CodeGenerator_249().run
         ])
-class Matcher_CodeGenerator_204:
+class Matcher_CodeGenerator_251:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_203())
-class Matcher_CodeGenerator_205:
+        return stream.with_scope(Matcher_CodeGenerator_250().run)
+class Matcher_CodeGenerator_252:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_204()
+            Matcher_CodeGenerator_251().run
         ])
-class Matcher_CodeGenerator_206:
+class Matcher_CodeGenerator_253:
     def run(self, stream):
         return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_207:
+class Matcher_CodeGenerator_254:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_208:
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_255:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_207().run(stream))
-class Matcher_CodeGenerator_209:
+        return stream.bind('x', Matcher_CodeGenerator_254().run(stream))
+class Matcher_CodeGenerator_256:
     def run(self, stream):
-        return rules['CodeGenerator.astList'].run(stream)
-class Matcher_CodeGenerator_210:
+        return stream.match_rule('CodeGenerator.astList')
+class Matcher_CodeGenerator_257:
     def run(self, stream):
-        return stream.bind('y', Matcher_CodeGenerator_209().run(stream))
-class Matcher_CodeGenerator_211:
+        return stream.bind('y', Matcher_CodeGenerator_256().run(stream))
+class Matcher_CodeGenerator_258:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             self.lookup('x'),
@@ -3554,95 +4777,95 @@ class Matcher_CodeGenerator_211:
             self.lookup('y'),
             ')'
         ]))
-class Matcher_CodeGenerator_212:
+class Matcher_CodeGenerator_259:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_206(),
-            Matcher_CodeGenerator_208(),
-            Matcher_CodeGenerator_210(),
-            Matcher_CodeGenerator_211()
+            Matcher_CodeGenerator_253().run,
+            Matcher_CodeGenerator_255().run,
+            Matcher_CodeGenerator_257().run,
+            Matcher_CodeGenerator_258().run
         ])
-class Matcher_CodeGenerator_213:
+class Matcher_CodeGenerator_260:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_212())
-class Matcher_CodeGenerator_214:
+        return stream.with_scope(Matcher_CodeGenerator_259().run)
+class Matcher_CodeGenerator_261:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_213()
+            Matcher_CodeGenerator_260().run
         ])
-class Matcher_CodeGenerator_215:
+class Matcher_CodeGenerator_262:
     def run(self, stream):
-        return rules['CodeGenerator.repr'].run(stream)
-class Matcher_CodeGenerator_216:
+        return stream.match_rule('CodeGenerator.repr')
+class Matcher_CodeGenerator_263:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_215().run(stream))
-class Matcher_CodeGenerator_217:
+        return stream.bind('x', Matcher_CodeGenerator_262().run(stream))
+class Matcher_CodeGenerator_264:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             'self.lookup(',
             self.lookup('x'),
             ')'
         ]))
-class Matcher_CodeGenerator_218:
+class Matcher_CodeGenerator_265:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_216(),
-            Matcher_CodeGenerator_217()
+            Matcher_CodeGenerator_263().run,
+            Matcher_CodeGenerator_264().run
         ])
-class Matcher_CodeGenerator_219:
+class Matcher_CodeGenerator_266:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_218())
-class Matcher_CodeGenerator_220:
+        return stream.with_scope(Matcher_CodeGenerator_265().run)
+class Matcher_CodeGenerator_267:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_219()
+            Matcher_CodeGenerator_266().run
         ])
-class Matcher_CodeGenerator_221:
+class Matcher_CodeGenerator_268:
     def run(self, stream):
         return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_222:
+class Matcher_CodeGenerator_269:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_223:
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_270:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_221(),
-            Matcher_CodeGenerator_222()
+            Matcher_CodeGenerator_268().run,
+            Matcher_CodeGenerator_269().run
         ])
-class Matcher_CodeGenerator_224:
+class Matcher_CodeGenerator_271:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_223())
-class Matcher_CodeGenerator_225:
+        return stream.with_scope(Matcher_CodeGenerator_270().run)
+class Matcher_CodeGenerator_272:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_224()
+            Matcher_CodeGenerator_271().run
         ])
-class Matcher_CodeGenerator_226:
+class Matcher_CodeGenerator_273:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_227:
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_274:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_226()
+            Matcher_CodeGenerator_273().run
         ])
-class Matcher_CodeGenerator_228:
+class Matcher_CodeGenerator_275:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_227())
-class Matcher_CodeGenerator_229:
+        return stream.with_scope(Matcher_CodeGenerator_274().run)
+class Matcher_CodeGenerator_276:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_228()
+            Matcher_CodeGenerator_275().run
         ])
-class Matcher_CodeGenerator_230:
+class Matcher_CodeGenerator_277:
     def run(self, stream):
-        return rules['CodeGenerator.ast'].run(stream)
-class Matcher_CodeGenerator_231:
+        return stream.match_rule('CodeGenerator.ast')
+class Matcher_CodeGenerator_278:
     def run(self, stream):
-        return stream.operator_star(Matcher_CodeGenerator_230())
-class Matcher_CodeGenerator_232:
+        return stream.operator_star(Matcher_CodeGenerator_277().run)
+class Matcher_CodeGenerator_279:
     def run(self, stream):
-        return stream.bind('xs', Matcher_CodeGenerator_231().run(stream))
-class Matcher_CodeGenerator_233:
+        return stream.bind('xs', Matcher_CodeGenerator_278().run(stream))
+class Matcher_CodeGenerator_280:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('join')([
             '\n',
@@ -3654,21 +4877,21 @@ class Matcher_CodeGenerator_233:
             ),
             '\n'
         ]))
-class Matcher_CodeGenerator_234:
+class Matcher_CodeGenerator_281:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_232(),
-            Matcher_CodeGenerator_233()
+            Matcher_CodeGenerator_279().run,
+            Matcher_CodeGenerator_280().run
         ])
-class Matcher_CodeGenerator_235:
+class Matcher_CodeGenerator_282:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_234())
-class Matcher_CodeGenerator_236:
+        return stream.with_scope(Matcher_CodeGenerator_281().run)
+class Matcher_CodeGenerator_283:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_235()
+            Matcher_CodeGenerator_282().run
         ])
-class Matcher_CodeGenerator_237:
+class Matcher_CodeGenerator_284:
     def run(self, stream):
         return stream.action(lambda self: self.bind('id', self.lookup('join')([
             'Matcher_',
@@ -3680,99 +4903,450 @@ class Matcher_CodeGenerator_237:
         ]), lambda: self.bind('', self.lookup('append')(
             self.lookup('ids'),
             self.lookup('id')
-        ), lambda: self.bind('', self.lookup('append')(
+        ), lambda: self.bind('classesMatcher', self.lookup('join')([
+            'class ',
+            self.lookup('id'),
+            ':\n',
+            self.lookup('indent')(
+                self.lookup('join')([
+                    'def run(self, stream):\n',
+                    self.lookup('indent')(
+                        self.lookup('join')([
+                            'return ',
+                            self.lookup('body'),
+                            '\n'
+                        ])
+                    )
+                ])
+            )
+        ]), lambda: self.bind('classesReference', self.lookup('join')([
+            self.lookup('id'),
+            '().run'
+        ]), lambda: self.bind('functionsMatcher', self.lookup('join')([
+            'def ',
+            self.lookup('id'),
+            '(stream):\n',
+            self.lookup('indent')(
+                self.lookup('join')([
+                    'return ',
+                    self.lookup('body'),
+                    '\n'
+                ])
+            )
+        ]), lambda: self.bind('functionsReference', self.lookup('id'), lambda: self.bind('', self.lookup('append')(
             self.lookup('matchers'),
+            self.lookup('lookup')(
+                self.lookup('join')([
+                    self.lookup('backend'),
+                    'Matcher'
+                ])
+            )
+        ), lambda: self.lookup('lookup')(
             self.lookup('join')([
-                'class ',
-                self.lookup('id'),
-                ':\n',
-                self.lookup('indent')(
-                    self.lookup('join')([
-                        'def run(self, stream):\n',
-                        self.lookup('indent')(
-                            self.lookup('join')([
-                                'return ',
-                                self.lookup('body'),
-                                '\n'
-                            ])
-                        )
-                    ])
-                )
+                self.lookup('backend'),
+                'Reference'
             ])
-        ), lambda: self.lookup('join')([
-            self.lookup('id'),
-            '()'
-        ])))))
-class Matcher_CodeGenerator_238:
+        )))))))))
+class Matcher_CodeGenerator_285:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_237()
+            Matcher_CodeGenerator_284().run
         ])
-class Matcher_CodeGenerator_239:
+class Matcher_CodeGenerator_286:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_238())
-class Matcher_CodeGenerator_240:
+        return stream.with_scope(Matcher_CodeGenerator_285().run)
+class Matcher_CodeGenerator_287:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_239()
+            Matcher_CodeGenerator_286().run
         ])
-class Matcher_CodeGenerator_241:
+class Matcher_CodeGenerator_288:
     def run(self, stream):
         return stream.match(lambda item: True, 'any')
-class Matcher_CodeGenerator_242:
+class Matcher_CodeGenerator_289:
     def run(self, stream):
-        return stream.bind('x', Matcher_CodeGenerator_241().run(stream))
-class Matcher_CodeGenerator_243:
+        return stream.bind('x', Matcher_CodeGenerator_288().run(stream))
+class Matcher_CodeGenerator_290:
     def run(self, stream):
         return stream.action(lambda self: self.lookup('repr')(
             self.lookup('x')
         ))
-class Matcher_CodeGenerator_244:
+class Matcher_CodeGenerator_291:
     def run(self, stream):
         return stream.operator_and([
-            Matcher_CodeGenerator_242(),
-            Matcher_CodeGenerator_243()
+            Matcher_CodeGenerator_289().run,
+            Matcher_CodeGenerator_290().run
         ])
-class Matcher_CodeGenerator_245:
+class Matcher_CodeGenerator_292:
     def run(self, stream):
-        return stream.with_scope(Matcher_CodeGenerator_244())
-class Matcher_CodeGenerator_246:
+        return stream.with_scope(Matcher_CodeGenerator_291().run)
+class Matcher_CodeGenerator_293:
     def run(self, stream):
         return stream.operator_or([
-            Matcher_CodeGenerator_245()
-        ])
-rules['CodeGenerator.astInner'] = Matcher_CodeGenerator_7()
-rules['CodeGenerator.ast'] = Matcher_CodeGenerator_15()
-rules['CodeGenerator.File'] = Matcher_CodeGenerator_25()
-rules['CodeGenerator.Namespace'] = Matcher_CodeGenerator_34()
-rules['CodeGenerator.Rule'] = Matcher_CodeGenerator_42()
-rules['CodeGenerator.Or'] = Matcher_CodeGenerator_51()
-rules['CodeGenerator.Scope'] = Matcher_CodeGenerator_60()
-rules['CodeGenerator.And'] = Matcher_CodeGenerator_69()
-rules['CodeGenerator.Bind'] = Matcher_CodeGenerator_79()
-rules['CodeGenerator.Star'] = Matcher_CodeGenerator_88()
-rules['CodeGenerator.Not'] = Matcher_CodeGenerator_97()
-rules['CodeGenerator.MatchCallRule'] = Matcher_CodeGenerator_104()
-rules['CodeGenerator.MatchRule'] = Matcher_CodeGenerator_112()
-rules['CodeGenerator.MatchObject'] = Matcher_CodeGenerator_121()
-rules['CodeGenerator.MatchList'] = Matcher_CodeGenerator_130()
-rules['CodeGenerator.MatchRange'] = Matcher_CodeGenerator_139()
-rules['CodeGenerator.Action'] = Matcher_CodeGenerator_148()
-rules['CodeGenerator.Any'] = Matcher_CodeGenerator_153()
-rules['CodeGenerator.Eq'] = Matcher_CodeGenerator_159()
-rules['CodeGenerator.Range'] = Matcher_CodeGenerator_169()
-rules['CodeGenerator.Set'] = Matcher_CodeGenerator_179()
-rules['CodeGenerator.String'] = Matcher_CodeGenerator_183()
-rules['CodeGenerator.List'] = Matcher_CodeGenerator_190()
-rules['CodeGenerator.ListItem'] = Matcher_CodeGenerator_198()
-rules['CodeGenerator.Format'] = Matcher_CodeGenerator_205()
-rules['CodeGenerator.Call'] = Matcher_CodeGenerator_214()
-rules['CodeGenerator.Lookup'] = Matcher_CodeGenerator_220()
-rules['CodeGenerator.Paren'] = Matcher_CodeGenerator_225()
-rules['CodeGenerator.Placeholder'] = Matcher_CodeGenerator_229()
-rules['CodeGenerator.astList'] = Matcher_CodeGenerator_236()
-rules['CodeGenerator.matcher'] = Matcher_CodeGenerator_240()
-rules['CodeGenerator.repr'] = Matcher_CodeGenerator_246()
+            Matcher_CodeGenerator_292().run
+        ])
+rules['CodeGenerator.astInner'] = Matcher_CodeGenerator_7().run
+rules['CodeGenerator.ast'] = Matcher_CodeGenerator_15().run
+rules['CodeGenerator.File'] = Matcher_CodeGenerator_26().run
+rules['CodeGenerator.Namespace'] = Matcher_CodeGenerator_35().run
+rules['CodeGenerator.Rule'] = Matcher_CodeGenerator_43().run
+rules['CodeGenerator.LeftRecursion'] = Matcher_CodeGenerator_53().run
+rules['CodeGenerator.Or'] = Matcher_CodeGenerator_62().run
+rules['CodeGenerator.Dispatch'] = Matcher_CodeGenerator_76().run
+rules['CodeGenerator.Scope'] = Matcher_CodeGenerator_85().run
+rules['CodeGenerator.And'] = Matcher_CodeGenerator_94().run
+rules['CodeGenerator.Bind'] = Matcher_CodeGenerator_104().run
+rules['CodeGenerator.Star'] = Matcher_CodeGenerator_113().run
+rules['CodeGenerator.Not'] = Matcher_CodeGenerator_122().run
+rules['CodeGenerator.MatchCallRule'] = Matcher_CodeGenerator_129().run
+rules['CodeGenerator.MatchRule'] = Matcher_CodeGenerator_137().run
+rules['CodeGenerator.MatchObject'] = Matcher_CodeGenerator_146().run
+rules['CodeGenerator.MatchList'] = Matcher_CodeGenerator_155().run
+rules['CodeGenerator.MatchRange'] = Matcher_CodeGenerator_164().run
+rules['CodeGenerator.MatchSet'] = Matcher_CodeGenerator_176().run
+rules['CodeGenerator.MatchPattern'] = Matcher_CodeGenerator_186().run
+rules['CodeGenerator.Action'] = Matcher_CodeGenerator_195().run
+rules['CodeGenerator.Any'] = Matcher_CodeGenerator_200().run
+rules['CodeGenerator.Eq'] = Matcher_CodeGenerator_206().run
+rules['CodeGenerator.Range'] = Matcher_CodeGenerator_216().run
+rules['CodeGenerator.Set'] = Matcher_CodeGenerator_226().run
+rules['CodeGenerator.String'] = Matcher_CodeGenerator_230().run
+rules['CodeGenerator.List'] = Matcher_CodeGenerator_237().run
+rules['CodeGenerator.ListItem'] = Matcher_CodeGenerator_245().run
+rules['CodeGenerator.Format'] = Matcher_CodeGenerator_252().run
+rules['CodeGenerator.Call'] = Matcher_CodeGenerator_261().run
+rules['CodeGenerator.Lookup'] = Matcher_CodeGenerator_267().run
+rules['CodeGenerator.Paren'] = Matcher_CodeGenerator_272().run
+rules['CodeGenerator.Placeholder'] = Matcher_CodeGenerator_276().run
+rules['CodeGenerator.astList'] = Matcher_CodeGenerator_283().run
+rules['CodeGenerator.matcher'] = Matcher_CodeGenerator_287().run
+rules['CodeGenerator.repr'] = Matcher_CodeGenerator_293().run
+import re
+
+MAX_SET_RANGE = 256
+
+
+def optimize(node):
+    """
+    Rewrite the tree from Parser.file into an equivalent one that the code
+    generators turn into faster matchers.
+    """
+    node = Node(
+        node.name,
+        node.range.start,
+        node.range.end,
+        node.value,
+        [optimize(child) for child in node.children],
+    )
+    if node.name == "Or":
+        return match_set(node) or node
+    if node.name == "Namespace":
+        node = match_patterns(node, get_rules(node))
+        node = predict(node, get_rules(node))
+        return grow_seeds(node, get_rules(node))
+    return node
+
+
+def get_rules(namespace):
+    return {rule.value: rule.children[0] for rule in namespace.children}
+
+
+def match_set(node):
+    """
+    Turn a choice between single characters, like 'a'-'z' | '_', into a
+    MatchSet node with all the characters and the description of the first
+    alternative, which is what the choice reports when it fails.
+    """
+    chars = set()
+    descriptions = []
+    for branch in node.children:
+        char_class = get_char_class(branch)
+        if char_class is None:
+            return None
+        branch_chars, description = char_class
+        chars.update(branch_chars)
+        descriptions.append(description)
+    if not descriptions:
+        return None
+    return Node(
+        "MatchSet",
+        node.range.start,
+        node.range.end,
+        ["".join(sorted(chars)), descriptions[0]],
+    )
+
+
+def get_char_class(branch):
+    # An alternative is a Scope around the And of its sequence, and a quoted
+    # string is an And of one match per character, so both 'a' and 'a'-'z'
+    # as alternatives end in a single MatchObject once these are unwrapped.
+    while branch.name in ["Scope", "And"] and len(branch.children) == 1:
+        branch = branch.children[0]
+    if branch.name != "MatchObject" or len(branch.children) != 1:
+        return None
+    item = branch.children[0]
+    if item.name == "Eq":
+        return item.value, repr(item.value)
+    if item.name == "Range":
+        start, end = item.value
+        if ord(end) - ord(start) > MAX_SET_RANGE:
+            return None
+        return (
+            [chr(x) for x in range(ord(start), ord(end) + 1)],
+            f"{start!r}-{end!r}",
+        )
+    return None
+
+
+def match_patterns(node, rules):
+    """
+    Turn repetitions of single characters, like (!'"' .)*, into a
+    MatchPattern node with an equivalent regular expression. The original
+    repetition is kept as the only child for streams that are not strings.
+    """
+    if node.name == "Star":
+        pattern = get_char_pattern(node.children[0], rules, set())
+        if pattern is not None:
+            return Node(
+                "MatchPattern",
+                node.range.start,
+                node.range.end,
+                f"(?:{pattern})*",
+                [node],
+            )
+    return Node(
+        node.name,
+        node.range.start,
+        node.range.end,
+        node.value,
+        [match_patterns(child, rules) for child in node.children],
+    )
+
+
+def get_char_pattern(node, rules, seen):
+    """
+    Return a regular expression matching the same single character as
+    node, or None if node might match something else or bind names.
+    """
+    if node.name in ["Scope", "Paren"] and len(node.children) == 1:
+        return get_char_pattern(node.children[0], rules, seen)
+    if node.name == "And" and node.children:
+        *lookaheads, last = node.children
+        patterns = []
+        for child in lookaheads:
+            if child.name != "Not":
+                return None
+            pattern = get_char_pattern(child.children[0], rules, seen)
+            if pattern is None:
+                return None
+            patterns.append(f"(?!{pattern})")
+        pattern = get_char_pattern(last, rules, seen)
+        if pattern is None:
+            return None
+        return "".join(patterns) + pattern
+    if node.name == "Or" and node.children:
+        patterns = [get_char_pattern(child, rules, seen) for child in node.children]
+        if None in patterns:
+            return None
+        return "(?:{})".format("|".join(patterns))
+    if node.name == "MatchSet":
+        return "[{}]".format("".join(re.escape(char) for char in node.value[0]))
+    if node.name == "MatchRule":
+        if node.value in seen or node.value not in rules:
+            return None
+        return get_char_pattern(rules[node.value], rules, seen | {node.value})
+    if node.name == "MatchObject":
+        item = node.children[0]
+        if item.name == "Any":
+            return "."
+        if item.name == "Eq":
+            return re.escape(item.value)
+        if item.name == "Range" and item.value[0] <= item.value[1]:
+            return "[{}-{}]".format(*(re.escape(char) for char in item.value))
+    return None
+
+
+def predict(node, rules):
+    """
+    Turn choices where the next character rules out some alternatives into
+    a Dispatch node with a table from characters to the alternatives worth
+    trying, and the alternatives to try for all other characters.
+    """
+    if node.name == "MatchPattern":
+        return node
+    children = [predict(child, rules) for child in node.children]
+    if node.name == "Or" and len(children) > 1:
+        firsts = [get_first(child, rules, set()) for child in children]
+        default = tuple(
+            index
+            for index, (chars, nullable) in enumerate(firsts)
+            if chars is None or nullable
+        )
+        if len(default) < len(children):
+            table = {}
+            for char in sorted(set().union(*(x for x, _ in firsts if x is not None))):
+                table[char] = tuple(
+                    index
+                    for index, (chars, _) in enumerate(firsts)
+                    if index in default or char in chars
+                )
+            return Node(
+                "Dispatch",
+                node.range.start,
+                node.range.end,
+                [table, default],
+                children,
+            )
+    return Node(node.name, node.range.start, node.range.end, node.value, children)
+
+
+def get_first(node, rules, seen):
+    """
+    Return the characters that node can start with, or None if it can not
+    be known, and whether node can match without consuming anything.
+    """
+    if node.name in ["Scope", "Paren", "Bind", "MatchRange"]:
+        return get_first(node.children[0], rules, seen)
+    if node.name == "And":
+        chars = set()
+        for child in node.children:
+            child_chars, nullable = get_first(child, rules, seen)
+            if child_chars is None:
+                return None, True
+            chars |= child_chars
+            if not nullable:
+                return chars, False
+        return chars, True
+    if node.name in ["Or", "Dispatch"]:
+        chars = set()
+        nullable = False
+        for child in node.children:
+            child_chars, child_nullable = get_first(child, rules, seen)
+            if child_chars is None:
+                return None, True
+            chars |= child_chars
+            nullable = nullable or child_nullable
+        return chars, nullable
+    if node.name in ["Star", "MatchPattern"]:
+        chars, _ = get_first(node.children[0], rules, seen)
+        return chars, True
+    if node.name in ["Not", "Action"]:
+        return set(), True
+    if node.name == "MatchSet":
+        return set(node.value[0]), False
+    if node.name == "MatchRule":
+        if node.value in seen or node.value not in rules:
+            return None, True
+        return get_first(rules[node.value], rules, seen | {node.value})
+    if node.name == "MatchObject":
+        char_class = get_char_class(node)
+        if char_class is not None:
+            return set(char_class[0]), False
+    return None, True
+
+
+def grow_seeds(namespace, rules):
+    """
+    Wrap the bodies of left recursive rules in a LeftRecursion node.
+    """
+    calls = {name: get_left_calls(body, rules) for name, body in rules.items()}
+    children = []
+    for rule in namespace.children:
+        reachable = set()
+        todo = list(calls[rule.value])
+        while todo:
+            name = todo.pop()
+            if name not in reachable and name in calls:
+                reachable.add(name)
+                todo.extend(calls[name])
+        if rule.value in reachable:
+            body = rule.children[0]
+            rule = Node(
+                rule.name,
+                rule.range.start,
+                rule.range.end,
+                rule.value,
+                [
+                    Node(
+                        "LeftRecursion",
+                        body.range.start,
+                        body.range.end,
+                        rule.value,
+                        [body],
+                    )
+                ],
+            )
+        children.append(rule)
+    return Node(
+        namespace.name,
+        namespace.range.start,
+        namespace.range.end,
+        namespace.value,
+        children,
+    )
+
+
+def get_left_calls(node, rules):
+    """
+    Return the names of the rules that node might call before consuming
+    anything.
+    """
+    if node.name == "MatchRule":
+        return {node.value}
+    if node.name == "And":
+        calls = set()
+        for child in node.children:
+            calls |= get_left_calls(child, rules)
+            if not get_first(child, rules, set())[1]:
+                break
+        return calls
+    if node.name in ["Or", "Dispatch"]:
+        calls = set()
+        for child in node.children:
+            calls |= get_left_calls(child, rules)
+        return calls
+    if node.name in ["Scope", "Paren", "Bind", "MatchRange", "Star", "Not"]:
+        return get_left_calls(node.children[0], rules)
+    return set()
+
+
+def prediction_report(node):
+    """
+    Tell for every rule with choices if the alternative to try can always
+    be predicted from the next character, only sometimes, or never.
+    """
+    lines = []
+    for namespace in node.children:
+        for rule in namespace.children:
+            choices = [
+                x
+                for x in get_choices(rule)
+                if x.name in ["Or", "Dispatch"] and len(x.children) > 1
+            ]
+            if not choices:
+                continue
+            dispatches = [x for x in choices if x.name == "Dispatch"]
+            if not dispatches:
+                status = "not predicted"
+            elif len(dispatches) == len(choices) and all(
+                len(indexes) <= 1
+                for x in dispatches
+                for indexes in list(x.value[0].values()) + [x.value[1]]
+            ):
+                status = "predicted"
+            else:
+                status = "partly predicted"
+            lines.append(f"{namespace.value}.{rule.value}: {status}\n")
+    return "".join(lines)
+
+
+def get_choices(node):
+    if node.name == "MatchPattern":
+        return []
+    choices = [node]
+    for child in node.children:
+        choices.extend(get_choices(child))
+    return choices
 if __name__ == "__main__":
     import sys
 
@@ -3782,6 +5356,9 @@ if __name__ == "__main__":
         with open(path) as f:
             return f.read()
 
+    backends = ["classes", "functions"]
+    backend = "classes"
+    report = False
     args = sys.argv[1:] or ["--compile", "-"]
     while args:
         command = args.pop(0)
@@ -3791,9 +5368,20 @@ if __name__ == "__main__":
             sys.stdout.write(read(args.pop(0)))
         elif command == "--embed":
             sys.stdout.write("{} = {}\n".format(args.pop(0), repr(read(args.pop(0)))))
+        elif command == "--backend":
+            name = args.pop(0)
+            if name not in backends:
+                sys.exit("ERROR: Unknown backend '{}'".format(name))
+            backend = name
+        elif command == "--report":
+            report = True
         elif command == "--compile":
-            node = compile_chain(["Parser.file"], read(args.pop(0)))
-            output = compile_chain(["CodeGenerator.astInner"], node.as_list())
+            node = optimize(compile_chain(["Parser.file"], read(args.pop(0))))
+            if report:
+                sys.stderr.write(prediction_report(node))
+            ast = node.as_list()
+            ast[1] = backend
+            output = compile_chain(["CodeGenerator.astInner"], ast)
             sys.stdout.write(output)
         else:
             sys.exit("ERROR: Unknown command '{}'".format(command))
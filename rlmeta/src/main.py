@@ -7,6 +7,9 @@ if __name__ == "__main__":
         with open(path) as f:
             return f.read()
 
+    backends = ["classes", "functions"]
+    backend = "classes"
+    report = False
     args = sys.argv[1:] or ["--compile", "-"]
     while args:
         command = args.pop(0)
@@ -16,9 +19,20 @@ if __name__ == "__main__":
             sys.stdout.write(read(args.pop(0)))
         elif command == "--embed":
             sys.stdout.write("{} = {}\n".format(args.pop(0), repr(read(args.pop(0)))))
+        elif command == "--backend":
+            name = args.pop(0)
+            if name not in backends:
+                sys.exit("ERROR: Unknown backend '{}'".format(name))
+            backend = name
+        elif command == "--report":
+            report = True
         elif command == "--compile":
-            node = compile_chain(["Parser.file"], read(args.pop(0)))
-            output = compile_chain(["CodeGenerator.astInner"], node.as_list())
+            node = optimize(compile_chain(["Parser.file"], read(args.pop(0))))
+            if report:
+                sys.stderr.write(prediction_report(node))
+            ast = node.as_list()
+            ast[1] = backend
+            output = compile_chain(["CodeGenerator.astInner"], ast)
             sys.stdout.write(output)
         else:
             sys.exit("ERROR: Unknown command '{}'".format(command))
@@ -0,0 +1,326 @@
+import re
+
+MAX_SET_RANGE = 256
+
+
+def optimize(node):
+    """
+    Rewrite the tree from Parser.file into an equivalent one that the code
+    generators turn into faster matchers.
+    """
+    node = Node(
+        node.name,
+        node.range.start,
+        node.range.end,
+        node.value,
+        [optimize(child) for child in node.children],
+    )
+    if node.name == "Or":
+        return match_set(node) or node
+    if node.name == "Namespace":
+        node = match_patterns(node, get_rules(node))
+        node = predict(node, get_rules(node))
+        return grow_seeds(node, get_rules(node))
+    return node
+
+
+def get_rules(namespace):
+    return {rule.value: rule.children[0] for rule in namespace.children}
+
+
+def match_set(node):
+    """
+    Turn a choice between single characters, like 'a'-'z' | '_', into a
+    MatchSet node with all the characters and the description of the first
+    alternative, which is what the choice reports when it fails.
+    """
+    chars = set()
+    descriptions = []
+    for branch in node.children:
+        char_class = get_char_class(branch)
+        if char_class is None:
+            return None
+        branch_chars, description = char_class
+        chars.update(branch_chars)
+        descriptions.append(description)
+    if not descriptions:
+        return None
+    return Node(
+        "MatchSet",
+        node.range.start,
+        node.range.end,
+        ["".join(sorted(chars)), descriptions[0]],
+    )
+
+
+def get_char_class(branch):
+    # An alternative is a Scope around the And of its sequence, and a quoted
+    # string is an And of one match per character, so both 'a' and 'a'-'z'
+    # as alternatives end in a single MatchObject once these are unwrapped.
+    while branch.name in ["Scope", "And"] and len(branch.children) == 1:
+        branch = branch.children[0]
+    if branch.name != "MatchObject" or len(branch.children) != 1:
+        return None
+    item = branch.children[0]
+    if item.name == "Eq":
+        return item.value, repr(item.value)
+    if item.name == "Range":
+        start, end = item.value
+        if ord(end) - ord(start) > MAX_SET_RANGE:
+            return None
+        return (
+            [chr(x) for x in range(ord(start), ord(end) + 1)],
+            f"{start!r}-{end!r}",
+        )
+    return None
+
+
+def match_patterns(node, rules):
+    """
+    Turn repetitions of single characters, like (!'"' .)*, into a
+    MatchPattern node with an equivalent regular expression. The original
+    repetition is kept as the only child for streams that are not strings.
+    """
+    if node.name == "Star":
+        pattern = get_char_pattern(node.children[0], rules, set())
+        if pattern is not None:
+            return Node(
+                "MatchPattern",
+                node.range.start,
+                node.range.end,
+                f"(?:{pattern})*",
+                [node],
+            )
+    return Node(
+        node.name,
+        node.range.start,
+        node.range.end,
+        node.value,
+        [match_patterns(child, rules) for child in node.children],
+    )
+
+
+def get_char_pattern(node, rules, seen):
+    """
+    Return a regular expression matching the same single character as
+    node, or None if node might match something else or bind names.
+    """
+    if node.name in ["Scope", "Paren"] and len(node.children) == 1:
+        return get_char_pattern(node.children[0], rules, seen)
+    if node.name == "And" and node.children:
+        *lookaheads, last = node.children
+        patterns = []
+        for child in lookaheads:
+            if child.name != "Not":
+                return None
+            pattern = get_char_pattern(child.children[0], rules, seen)
+            if pattern is None:
+                return None
+            patterns.append(f"(?!{pattern})")
+        pattern = get_char_pattern(last, rules, seen)
+        if pattern is None:
+            return None
+        return "".join(patterns) + pattern
+    if node.name == "Or" and node.children:
+        patterns = [get_char_pattern(child, rules, seen) for child in node.children]
+        if None in patterns:
+            return None
+        return "(?:{})".format("|".join(patterns))
+    if node.name == "MatchSet":
+        return "[{}]".format("".join(re.escape(char) for char in node.value[0]))
+    if node.name == "MatchRule":
+        if node.value in seen or node.value not in rules:
+            return None
+        return get_char_pattern(rules[node.value], rules, seen | {node.value})
+    if node.name == "MatchObject":
+        item = node.children[0]
+        if item.name == "Any":
+            return "."
+        if item.name == "Eq":
+            return re.escape(item.value)
+        if item.name == "Range" and item.value[0] <= item.value[1]:
+            return "[{}-{}]".format(*(re.escape(char) for char in item.value))
+    return None
+
+
+def predict(node, rules):
+    """
+    Turn choices where the next character rules out some alternatives into
+    a Dispatch node with a table from characters to the alternatives worth
+    trying, and the alternatives to try for all other characters.
+    """
+    if node.name == "MatchPattern":
+        return node
+    children = [predict(child, rules) for child in node.children]
+    if node.name == "Or" and len(children) > 1:
+        firsts = [get_first(child, rules, set()) for child in children]
+        default = tuple(
+            index
+            for index, (chars, nullable) in enumerate(firsts)
+            if chars is None or nullable
+        )
+        if len(default) < len(children):
+            table = {}
+            for char in sorted(set().union(*(x for x, _ in firsts if x is not None))):
+                table[char] = tuple(
+                    index
+                    for index, (chars, _) in enumerate(firsts)
+                    if index in default or char in chars
+                )
+            return Node(
+                "Dispatch",
+                node.range.start,
+                node.range.end,
+                [table, default],
+                children,
+            )
+    return Node(node.name, node.range.start, node.range.end, node.value, children)
+
+
+def get_first(node, rules, seen):
+    """
+    Return the characters that node can start with, or None if it can not
+    be known, and whether node can match without consuming anything.
+    """
+    if node.name in ["Scope", "Paren", "Bind", "MatchRange"]:
+        return get_first(node.children[0], rules, seen)
+    if node.name == "And":
+        chars = set()
+        for child in node.children:
+            child_chars, nullable = get_first(child, rules, seen)
+            if child_chars is None:
+                return None, True
+            chars |= child_chars
+            if not nullable:
+                return chars, False
+        return chars, True
+    if node.name in ["Or", "Dispatch"]:
+        chars = set()
+        nullable = False
+        for child in node.children:
+            child_chars, child_nullable = get_first(child, rules, seen)
+            if child_chars is None:
+                return None, True
+            chars |= child_chars
+            nullable = nullable or child_nullable
+        return chars, nullable
+    if node.name in ["Star", "MatchPattern"]:
+        chars, _ = get_first(node.children[0], rules, seen)
+        return chars, True
+    if node.name in ["Not", "Action"]:
+        return set(), True
+    if node.name == "MatchSet":
+        return set(node.value[0]), False
+    if node.name == "MatchRule":
+        if node.value in seen or node.value not in rules:
+            return None, True
+        return get_first(rules[node.value], rules, seen | {node.value})
+    if node.name == "MatchObject":
+        char_class = get_char_class(node)
+        if char_class is not None:
+            return set(char_class[0]), False
+    return None, True
+
+
+def grow_seeds(namespace, rules):
+    """
+    Wrap the bodies of left recursive rules in a LeftRecursion node.
+    """
+    calls = {name: get_left_calls(body, rules) for name, body in rules.items()}
+    children = []
+    for rule in namespace.children:
+        reachable = set()
+        todo = list(calls[rule.value])
+        while todo:
+            name = todo.pop()
+            if name not in reachable and name in calls:
+                reachable.add(name)
+                todo.extend(calls[name])
+        if rule.value in reachable:
+            body = rule.children[0]
+            rule = Node(
+                rule.name,
+                rule.range.start,
+                rule.range.end,
+                rule.value,
+                [
+                    Node(
+                        "LeftRecursion",
+                        body.range.start,
+                        body.range.end,
+                        rule.value,
+                        [body],
+                    )
+                ],
+            )
+        children.append(rule)
+    return Node(
+        namespace.name,
+        namespace.range.start,
+        namespace.range.end,
+        namespace.value,
+        children,
+    )
+
+
+def get_left_calls(node, rules):
+    """
+    Return the names of the rules that node might call before consuming
+    anything.
+    """
+    if node.name == "MatchRule":
+        return {node.value}
+    if node.name == "And":
+        calls = set()
+        for child in node.children:
+            calls |= get_left_calls(child, rules)
+            if not get_first(child, rules, set())[1]:
+                break
+        return calls
+    if node.name in ["Or", "Dispatch"]:
+        calls = set()
+        for child in node.children:
+            calls |= get_left_calls(child, rules)
+        return calls
+    if node.name in ["Scope", "Paren", "Bind", "MatchRange", "Star", "Not"]:
+        return get_left_calls(node.children[0], rules)
+    return set()
+
+
+def prediction_report(node):
+    """
+    Tell for every rule with choices if the alternative to try can always
+    be predicted from the next character, only sometimes, or never.
+    """
+    lines = []
+    for namespace in node.children:
+        for rule in namespace.children:
+            choices = [
+                x
+                for x in get_choices(rule)
+                if x.name in ["Or", "Dispatch"] and len(x.children) > 1
+            ]
+            if not choices:
+                continue
+            dispatches = [x for x in choices if x.name == "Dispatch"]
+            if not dispatches:
+                status = "not predicted"
+            elif len(dispatches) == len(choices) and all(
+                len(indexes) <= 1
+                for x in dispatches
+                for indexes in list(x.value[0].values()) + [x.value[1]]
+            ):
+                status = "predicted"
+            else:
+                status = "partly predicted"
+            lines.append(f"{namespace.value}.{rule.value}: {status}\n")
+    return "".join(lines)
+
+
+def get_choices(node):
+    if node.name == "MatchPattern":
+        return []
+    choices = [node]
+    for child in node.children:
+        choices.extend(get_choices(child))
+    return choices
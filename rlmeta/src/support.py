@@ -1,115 +1,260 @@
+import array
+import bisect
+import collections
+import marshal
+import queue
+import re
+import sys
+import threading
+
 rules = {}
+memoize = {}
+
+
+FAIL = object()
 
 
 class Stream:
+    """
+    Matchers return FAIL instead of raising when they do not match, and the
+    farthest failure is remembered in latest_error to report if the whole
+    match fails.
+    """
+
+    __slots__ = [
+        "items",
+        "predict",
+        "index",
+        "nesting",
+        "latest_error",
+        "scope",
+        "memo_size",
+        "memo",
+        "seeds",
+    ]
 
-    def __init__(self, items):
+    def __init__(self, items, memo_size=None, predict=True):
         self.items = items
+        self.predict = predict
         self.index = 0
         self.nesting = tuple()
         self.latest_error = None
         self.scope = None
+        self.memo_size = memo_size
+        self.memo = collections.OrderedDict()
+        self.seeds = {}
 
     def operator_or(self, matchers):
         for matcher in matchers:
             backtrack_index = self.index
-            try:
-                return matcher.run(self)
-            except MatchError:
-                self.index = backtrack_index
-        self.error("no or match")
+            result = matcher(self)
+            if result is not FAIL:
+                return result
+            self.index = backtrack_index
+        return self.fail("no or match")
+
+    def operator_dispatch(self, table, default, matchers):
+        indexes = range(len(matchers))
+        if self.predict:
+            if self.index >= len(self.items):
+                indexes = default
+            else:
+                item = self.items[self.index]
+                if isinstance(item, str) and len(item) == 1:
+                    indexes = table.get(item, default)
+        for index in indexes:
+            backtrack_index = self.index
+            result = matchers[index](self)
+            if result is not FAIL:
+                return result
+            self.index = backtrack_index
+        return self.fail("no or match")
 
     def operator_and(self, matchers):
-        result = self.action()
+        result = NONE
         for matcher in matchers:
-            result = matcher.run(self)
+            result = matcher(self)
+            if result is FAIL:
+                return FAIL
         return result
 
     def operator_star(self, matcher):
         results = []
         while True:
             backtrack_index = self.index
-            try:
-                results.append(matcher.run(self))
-            except MatchError:
+            result = matcher(self)
+            if result is FAIL:
                 self.index = backtrack_index
-                return self.action(lambda self: [x.eval(self.runtime) for x in results])
+                return ListAction(results)
+            results.append(result)
 
     def operator_not(self, matcher):
         backtrack_index = self.index
-        try:
-            matcher.run(self)
-        except MatchError:
-            return self.action()
-        finally:
-            self.index = backtrack_index
-        self.error("not matched")
+        result = matcher(self)
+        self.index = backtrack_index
+        if result is FAIL:
+            return NONE
+        return self.fail("not matched")
 
-    def action(self, fn=lambda self: None):
+    def action(self, fn):
         return SemanticAction(self.scope, fn)
 
     def with_scope(self, matcher):
         current_scope = self.scope
         self.scope = {}
-        try:
-            return matcher.run(self)
-        finally:
-            self.scope = current_scope
+        result = matcher(self)
+        self.scope = current_scope
+        return result
 
     def bind(self, name, semantic_action):
-        self.scope[name] = semantic_action
+        if semantic_action is not FAIL:
+            self.scope[name] = semantic_action
         return semantic_action
 
     def match_list(self, matcher):
         if self.index < len(self.items):
             items, index, nesting = self.items, self.index, self.nesting
-            try:
-                self.nesting = self.nesting + (self.index,)
-                self.items = self.items[self.index]
-                self.index = 0
-                result = matcher.run(self)
+            self.nesting = self.nesting + (self.index,)
+            self.items = self.items[self.index]
+            self.index = 0
+            result = matcher(self)
+            if result is not FAIL:
                 index += 1
-            finally:
-                self.items, self.index, self.nesting = items, index, nesting
+            self.items, self.index, self.nesting = items, index, nesting
             return result
-        self.error("no list found")
+        return self.fail("no list found")
 
     def match_range(self, matcher):
         start = self.index
-        matcher.run(self)
+        if matcher(self) is FAIL:
+            return FAIL
         end = self.index
-        return self.action(lambda self: Range(start, end))
+        return ValueAction(Range(start, end))
 
     def match_call_rule(self, namespace):
         try:
             rule_name = self.items[self.index]
         except:
-            self.error(f"Could not extract rule name.")
+            return self.fail(f"Could not extract rule name.")
         if not isinstance(rule_name, str):
-            self.error(f"Match call rule was not a string.")
+            return self.fail(f"Match call rule was not a string.")
         name = namespace + "." + rule_name
         if name in rules:
-            rule = rules[name]
             self.index += 1
-            return rule.run(self)
+            return self.match_rule(name)
         else:
-            self.error("unknown rule")
+            return self.fail("unknown rule")
+
+    def match_rule(self, name):
+        if self.memo_size is None:
+            return rules[name](self)
+        key = (name, self.nesting, self.index)
+        entry = self.memo.get(key)
+        if entry is not None:
+            # A remembered failure already contributed to latest_error, so
+            # it is reported the same as if the rule was run again.
+            result, self.index = entry
+            return result
+        start = self.index
+        result = rules[name](self)
+        if not self.seeds:
+            # Results that depend on a seed that is still growing are not
+            # final.
+            self.remember(key, result, start if result is FAIL else self.index)
+        return result
+
+    def grow_seed(self, name, matcher):
+        """
+        Match a left recursive rule by first matching it with the recursive
+        call failing, and then matching it again with the recursive call
+        giving the previous result for as long as that matches more:
+
+        >>> def number(stream):
+        ...     return stream.match(str.isdigit, "digit")
+        >>> def minus(stream):
+        ...     x = stream.match_rule("Example.minus")
+        ...     if x is FAIL or stream.match_set("-", "'-'") is FAIL:
+        ...         return FAIL
+        ...     y = number(stream)
+        ...     if y is FAIL:
+        ...         return FAIL
+        ...     return stream.action(lambda self: [
+        ...         x.eval(self.runtime), "-", y.eval(self.runtime)
+        ...     ])
+        >>> rules["Example.minus"] = lambda stream: stream.grow_seed(
+        ...     "Example.minus", lambda stream: stream.operator_or([minus, number])
+        ... )
+        >>> stream = Stream("1-2-3")
+        >>> stream.match_rule("Example.minus").eval(Runtime())
+        [['1', '-', '2'], '-', '3']
+        >>> stream.index
+        5
+        >>> del rules["Example.minus"]
+        """
+        key = (name, self.nesting, self.index)
+        if key in self.seeds:
+            result, self.index = self.seeds[key]
+            return result
+        start = self.index
+        self.seeds[key] = (FAIL, start)
+        while True:
+            self.index = start
+            result = matcher(self)
+            seed, end = self.seeds[key]
+            if result is FAIL or (seed is not FAIL and self.index <= end):
+                break
+            self.seeds[key] = (result, self.index)
+        result, self.index = self.seeds.pop(key)
+        return result
+
+    def remember(self, key, result, index):
+        self.memo[key] = (result, index)
+        if len(self.memo) > self.memo_size:
+            # Oldest entries are for positions the parser has most likely
+            # moved past.
+            self.memo.popitem(last=False)
 
     def match(self, fn, description):
         if self.index < len(self.items):
             item = self.items[self.index]
             if fn(item):
                 self.index += 1
-                return self.action(lambda self: item)
-        self.error(f"expected {description}")
+                return ValueAction(item)
+        return self.fail(f"expected {description}")
+
+    def match_set(self, items, description):
+        if self.index < len(self.items):
+            item = self.items[self.index]
+            if isinstance(item, str) and item in items:
+                self.index += 1
+                return ValueAction(item)
+        return self.fail(f"expected {description}")
+
+    def match_pattern(self, pattern, matcher):
+        if not isinstance(self.items, str):
+            return matcher(self)
+        start = self.index
+        end = pattern.match(self.items, start).end()
+        if end == start:
+            return matcher(self)
+        self.index = end
+        # The repetition that stops matcher fails here, and running it
+        # records the same error as it would have.
+        matcher(self)
+        return ValueAction(list(self.items[start:end]))
 
-    def error(self, name):
-        if not self.latest_error or (
-            (self.nesting + (self.index,))
-            > (self.latest_error[3] + (self.latest_error[2],))
+    def fail(self, name):
+        latest = self.latest_error
+        if latest is None or (
+            self.index > latest[2]
+            if not self.nesting and not latest[3]
+            else self.nesting + (self.index,) > latest[3] + (latest[2],)
         ):
             self.latest_error = (name, self.items, self.index, self.nesting)
-        raise MatchError(*self.latest_error[:-1])
+        return FAIL
+
+    def get_error(self):
+        return MatchError(*self.latest_error[:-1])
 
 
 class MatchError(Exception):
@@ -122,6 +267,8 @@ class MatchError(Exception):
 
 class SemanticAction:
 
+    __slots__ = ["scope", "fn", "runtime"]
+
     def __init__(self, scope, fn):
         self.scope = scope
         self.fn = fn
@@ -141,19 +288,80 @@ class SemanticAction:
             return self.runtime.lookup(name)
 
 
+class ValueAction:
+    """
+    The value of something matched that does not depend on the runtime.
+    """
+
+    __slots__ = ["value"]
+
+    def __init__(self, value):
+        self.value = value
+
+    def eval(self, runtime):
+        return self.value
+
+
+class ListAction:
+    """
+    The values of all matches of a repetition.
+    """
+
+    __slots__ = ["actions"]
+
+    def __init__(self, actions):
+        self.actions = actions
+
+    def eval(self, runtime):
+        return [action.eval(runtime) for action in self.actions]
+
+
+NONE = ValueAction(None)
+
+
 class Runtime:
+    """
+    Binding a name gives a new runtime that only holds the new variable
+    and refers to this one for the rest. Chains longer than max_depth are
+    flattened so that looking up a name stays cheap:
+
+    >>> runtime = Runtime().bind("x", 1).bind("y", 2).bind("x", 3)
+    >>> runtime.lookup("x"), runtime.lookup("y"), runtime.lookup("len")
+    (3, 2, <built-in function len>)
+    >>> for index in range(20):
+    ...     runtime = runtime.bind("x", index)
+    >>> runtime.depth <= runtime.max_depth
+    True
+    >>> runtime.lookup("x"), runtime.lookup("y")
+    (19, 2)
+    """
 
-    def __init__(self, extra={"len": len, "repr": repr, "int": int}):
+    max_depth = 8
+
+    def __init__(self, extra={"len": len, "repr": repr, "int": int}, parent=None):
         self.vars = extra
+        self.parent = parent
+        self.depth = 0 if parent is None else parent.depth + 1
 
     def bind(self, name, value):
-        return Runtime(dict(self.vars, **{name: value}))
+        if self.depth < self.max_depth:
+            return Runtime({name: value}, self)
+        vars = {}
+        runtime = self
+        while runtime is not None:
+            for key, item in runtime.vars.items():
+                vars.setdefault(key, item)
+            runtime = runtime.parent
+        vars[name] = value
+        return Runtime(vars)
 
     def lookup(self, name):
-        if name in self.vars:
-            return self.vars[name]
-        else:
-            return getattr(self, name)
+        runtime = self
+        while runtime is not None:
+            if name in runtime.vars:
+                return runtime.vars[name]
+            runtime = runtime.parent
+        return getattr(self, name)
 
     def append(self, list, thing):
         list.append(thing)
@@ -221,14 +429,19 @@ class Runtime:
 
 class Node:
 
+    __slots__ = ["name", "range", "value", "children", "parent", "index", "path"]
+
     def __init__(self, name, start, end, value, children=[]):
         self.name = name
         self.range = Range(start, end)
         self.value = value
         self.children = children
         self.parent = None
-        for child in self.children:
+        self.index = 0
+        self.path = None
+        for index, child in enumerate(self.children):
             child.parent = self
+            child.index = index
 
     def get_first_child(self):
         for child in self.children:
@@ -236,11 +449,47 @@ class Node:
         return self
 
     def get_path(self):
-        if self.parent is None:
-            prefix = []
-        else:
-            prefix = self.parent.get_path()
-        return prefix + [self.name]
+        """
+        Paths are remembered, also for the ancestors on the way up, so they
+        are only worked out once for a node and its siblings:
+
+        >>> tree = Node("Root", 0, 2, "", [
+        ...     Node("A", 0, 1, ""),
+        ...     Node("B", 1, 2, ""),
+        ... ])
+        >>> tree.children[0].get_path()
+        ['Root', 'A']
+        >>> tree.path, tree.children[1].get_depth()
+        (('Root',), 1)
+        """
+        if self.path is None:
+            chain = []
+            node = self
+            while node is not None and node.path is None:
+                chain.append(node)
+                node = node.parent
+            path = () if node is None else node.path
+            for node in reversed(chain):
+                path = path + (node.name,)
+                node.path = path
+        return list(self.path)
+
+    def get_depth(self):
+        if self.path is None:
+            self.get_path()
+        return len(self.path) - 1
+
+    def forget_paths(self):
+        """
+        Forget remembered paths in my subtree. A node only remembers its path
+        if its parent does, so subtrees without paths are skipped.
+        """
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            if node.path is not None:
+                node.path = None
+                stack.extend(node.children)
 
     def get_next_sibling(self):
         if self.parent is None:
@@ -255,39 +504,634 @@ class Node:
             return self.parent.get_sibling(self, -1)
 
     def get_sibling(self, child, offset):
-        index = 0
-        for index, x in enumerate(self.children):
-            if x is child:
+        return self.children[(child.index + offset) % len(self.children)]
+
+    def shift(self, amount):
+        stack = [self]
+        while stack:
+            node = stack.pop()
+            node.range.start += amount
+            node.range.end += amount
+            stack.extend(node.children)
+
+    def replace(self, node):
+        """
+        Put node in my place in the tree and shift the ranges of everything
+        after me by the change in size.
+
+        >>> tree = Node("Root", 0, 6, "", [
+        ...     Node("A", 0, 2, ""),
+        ...     Node("B", 2, 4, "", [Node("C", 2, 3, "")]),
+        ...     Node("D", 4, 6, ""),
+        ... ])
+        >>> tree.children[1].children[0].replace(Node("E", 2, 5, ""))
+        >>> tree.pprint()
+        Root Range(0, 8)
+          A Range(0, 2)
+          B Range(2, 6)
+            E Range(2, 5)
+          D Range(6, 8)
+        """
+        amount = node.range.size - self.range.size
+        child = node
+        parent = self.parent
+        index = self.index
+        parent.children[index] = node
+        node.parent = parent
+        node.index = index
+        node.forget_paths()
+        while parent is not None:
+            parent.range.end += amount
+            for sibling in parent.children[index + 1 :]:
+                sibling.shift(amount)
+            child = parent
+            parent = parent.parent
+            index = child.index
+
+    def find_enclosing(self, range_, names):
+        """
+        Find the innermost node, with a name in names, that strictly contains
+        range_. That is, range_ does not touch its first or last position.
+        """
+        found = None
+        node = self
+        while node.range.start < range_.start and range_.end < node.range.end:
+            if node.name in names:
+                found = node
+            index = bisect.bisect_right(
+                node.children, range_.start, key=lambda x: x.range.start
+            )
+            if index == 0:
                 break
-        return self.children[(index + offset) % len(self.children)]
+            node = node.children[index - 1]
+        return found
 
-    def tokenize(self):
-        pos = self.range.start
-        result = []
-        for child in self.children:
-            for name, child_start, child_end, d in child.tokenize():
-                if pos != child_start:
-                    result.append([self.name, pos, child_start, self])
-                result.append([name, child_start, child_end, d])
-                pos = child_end
-        if pos != self.range.end:
-            result.append([self.name, pos, self.range.end, self])
+    def tokenize(self, window=None):
+        """
+        Split my range into tokens, each covered by the innermost node that
+        has no child covering it, and yield them as (name, start, end, node):
+
+        >>> tree = Node("Root", 0, 8, "", [
+        ...     Node("A", 1, 3, "", [Node("B", 2, 3, "")]),
+        ...     Node("C", 5, 5, ""),
+        ... ])
+        >>> for token in tree.tokenize():
+        ...     print(token[:3])
+        ('Root', 0, 1)
+        ('A', 1, 2)
+        ('B', 2, 3)
+        ('Root', 3, 8)
+
+        With a window, only the parts of tokens inside window are yielded,
+        and nodes outside of it are not visited:
+
+        >>> for token in tree.tokenize(Range(2, 6)):
+        ...     print(token[:3])
+        ('B', 2, 3)
+        ('Root', 3, 6)
+
+        Nodes are visited with an explicit stack, so how deep a tree can be
+        is not limited by the interpreter stack. Levels of the stack from
+        fresh and up have not produced a token yet, and all other levels
+        have produced the token that ends at cursor.
+        """
+        if window is None:
+            window = self.range
+        stack = [[self, self.get_first_child_index(window.start)]]
+        fresh = 0
+        cursor = self.range.start
+        while stack:
+            frame = stack[-1]
+            node, index = frame
+            if (
+                index < len(node.children)
+                and node.children[index].range.start < window.end
+            ):
+                child = node.children[index]
+                frame[1] += 1
+                stack.append([child, child.get_first_child_index(window.start)])
+                continue
+            level = len(stack) - 1
+            start = cursor if level < fresh else node.range.start
+            if start != node.range.end:
+                tokens = [(node.name, start, node.range.end, node)]
+                gap_end = start
+                for parent, _ in reversed(stack[fresh:level]):
+                    if parent.range.start != gap_end:
+                        tokens.append(
+                            (parent.name, parent.range.start, gap_end, parent)
+                        )
+                        gap_end = parent.range.start
+                if 0 < fresh <= level and cursor != gap_end:
+                    parent = stack[fresh - 1][0]
+                    tokens.append((parent.name, cursor, gap_end, parent))
+                for name, token_start, token_end, owner in reversed(tokens):
+                    token_start = max(token_start, window.start)
+                    token_end = min(token_end, window.end)
+                    if token_start < token_end:
+                        yield (name, token_start, token_end, owner)
+                cursor = node.range.end
+                fresh = level + 1
+            stack.pop()
+            fresh = min(fresh, len(stack))
+
+    def get_first_child_index(self, position):
+        """
+        Index of the first child that ends after position.
+        """
+        return bisect.bisect_right(self.children, position, key=lambda x: x.range.end)
+
+    def get_node_at(self, position):
+        """
+        The innermost node in my subtree that contains position, or None:
+
+        >>> tree = Node("Root", 0, 8, "", [
+        ...     Node("A", 1, 3, "", [Node("B", 2, 3, "")]),
+        ...     Node("C", 5, 5, ""),
+        ... ])
+        >>> [getattr(tree.get_node_at(x), "name", None) for x in [0, 2, 3, 5, 8]]
+        ['Root', 'B', 'Root', 'Root', None]
+        """
+        if not self.range.start <= position < self.range.end:
+            return None
+        node = self
+        while True:
+            index = bisect.bisect_right(
+                node.children, position, key=lambda x: x.range.start
+            )
+            if index == 0 or node.children[index - 1].range.end <= position:
+                return node
+            node = node.children[index - 1]
+
+    def as_list(self):
+        result = [self.name, self.value]
+        stack = [(self, result)]
+        while stack:
+            node, items = stack.pop()
+            for child in node.children:
+                child_items = [child.name, child.value]
+                items.append(child_items)
+                stack.append((child, child_items))
         return result
 
+    def pprint(self):
+        stack = [(self, 0)]
+        while stack:
+            node, indentation = stack.pop()
+            print(f"{'  '*indentation}{node.name} {node.range}")
+            stack.extend((child, indentation + 1) for child in reversed(node.children))
+
+
+class CompactTree:
+    """
+    A read only tree stored in parallel arrays with one entry per node, in
+    the order nodes start. Nodes are handed out as CompactNode views with
+    the same interface as Node, so a large document does not need a Python
+    object per node:
+
+    >>> tree = CompactTree.from_node(Node("Root", 0, 8, "", [
+    ...     Node("A", 1, 3, "a", [Node("B", 2, 3, "")]),
+    ...     Node("C", 5, 5, ""),
+    ... ]))
+    >>> root = tree.get_root()
+    >>> root.pprint()
+    Root Range(0, 8)
+      A Range(1, 3)
+        B Range(2, 3)
+      C Range(5, 5)
+    >>> root.as_list()
+    ['Root', '', ['A', 'a', ['B', '']], ['C', '']]
+    >>> for token in root.tokenize():
+    ...     print(token[:3])
+    ('Root', 0, 1)
+    ('A', 1, 2)
+    ('B', 2, 3)
+    ('Root', 3, 8)
+    >>> node = root.get_first_child().get_first_child()
+    >>> node.get_path()
+    ['Root', 'A', 'B']
+    >>> node.parent.get_next_sibling().name
+    'C'
+    >>> node.parent.get_previous_sibling() == node.parent.get_next_sibling()
+    True
+
+    Trees can be stored as bytes and turned back into nodes:
+
+    >>> CompactTree.from_bytes(tree.to_bytes()).to_node().pprint()
+    Root Range(0, 8)
+      A Range(1, 3)
+        B Range(2, 3)
+      C Range(5, 5)
+    """
+
+    ARRAYS = [
+        "name_ids",
+        "starts",
+        "ends",
+        "parents",
+        "first_children",
+        "last_children",
+        "next_siblings",
+        "previous_siblings",
+    ]
+
+    @classmethod
+    def from_node(cls, root):
+        tree = cls()
+        stack = [(root, -1)]
+        while stack:
+            node, parent = stack.pop()
+            index = tree.add(
+                node.name, node.range.start, node.range.end, node.value, parent
+            )
+            stack.extend((child, index) for child in reversed(node.children))
+        return tree
+
+    @classmethod
+    def from_bytes(cls, data):
+        names, values, *arrays = marshal.loads(data)
+        tree = cls()
+        tree.names = names
+        tree.name_lookup = {name: index for index, name in enumerate(names)}
+        tree.values = values
+        for name, items in zip(cls.ARRAYS, arrays):
+            getattr(tree, name).frombytes(items)
+        return tree
+
+    def __init__(self):
+        self.names = []
+        self.name_lookup = {}
+        self.name_ids = array.array("i")
+        self.starts = array.array("q")
+        self.ends = array.array("q")
+        self.values = []
+        self.parents = array.array("i")
+        self.first_children = array.array("i")
+        self.last_children = array.array("i")
+        self.next_siblings = array.array("i")
+        self.previous_siblings = array.array("i")
+
+    def add(self, name, start, end, value, parent):
+        """
+        Add a node as the last child of parent, or as the root if parent is
+        -1, and return its index.
+        """
+        index = len(self.starts)
+        self.name_ids.append(self.get_name_id(name))
+        self.starts.append(start)
+        self.ends.append(end)
+        self.values.append(value)
+        self.parents.append(parent)
+        self.first_children.append(-1)
+        self.last_children.append(-1)
+        self.next_siblings.append(-1)
+        previous = -1
+        if parent != -1:
+            previous = self.last_children[parent]
+            if previous == -1:
+                self.first_children[parent] = index
+            else:
+                self.next_siblings[previous] = index
+            self.last_children[parent] = index
+        self.previous_siblings.append(previous)
+        return index
+
+    def get_name_id(self, name):
+        if name not in self.name_lookup:
+            self.name_lookup[name] = len(self.names)
+            self.names.append(name)
+        return self.name_lookup[name]
+
+    def get_root(self):
+        return CompactNode(self, 0)
+
+    def copy(self):
+        tree = CompactTree()
+        tree.names = list(self.names)
+        tree.name_lookup = dict(self.name_lookup)
+        tree.values = list(self.values)
+        for name in self.ARRAYS:
+            items = getattr(self, name)
+            setattr(tree, name, array.array(items.typecode, items))
+        return tree
+
+    def replace(self, index, node):
+        """
+        Put node, a Node, in place of the subtree at index and shift the
+        ranges of everything after it by the change in size. The new nodes
+        are spliced into the arrays where the subtree was, so indices after
+        it move by the change in node count and views of them are stale:
+
+        >>> tree = CompactTree.from_node(Node("Root", 0, 6, "", [
+        ...     Node("A", 0, 2, ""),
+        ...     Node("B", 2, 4, "", [Node("C", 2, 3, "")]),
+        ...     Node("D", 4, 6, "", [Node("E", 4, 5, "")]),
+        ... ]))
+        >>> tree.replace(2, Node("F", 2, 5, "", [
+        ...     Node("G", 2, 3, ""),
+        ...     Node("H", 3, 5, ""),
+        ... ]))
+        >>> tree.get_root().pprint()
+        Root Range(0, 7)
+          A Range(0, 2)
+          F Range(2, 5)
+            G Range(2, 3)
+            H Range(3, 5)
+          D Range(5, 7)
+            E Range(5, 6)
+        >>> tree.get_root().children[2].get_previous_sibling().name
+        'F'
+        """
+        new = CompactTree.from_node(node)
+        end = self.get_subtree_end(index)
+        shift = len(new.starts) - (end - index)
+        amount = new.ends[0] - new.starts[0] - (self.ends[index] - self.starts[index])
+        if shift != 0:
+            for name in self.ARRAYS[3:]:
+                items = getattr(self, name)
+                items[:] = array.array(
+                    items.typecode, [x + shift if x >= end else x for x in items]
+                )
+        links = {}
+        for name in self.ARRAYS[3:]:
+            links[name] = array.array(
+                "i", [-1 if x == -1 else x + index for x in getattr(new, name)]
+            )
+        links["parents"][0] = self.parents[index]
+        links["next_siblings"][0] = self.next_siblings[index]
+        links["previous_siblings"][0] = self.previous_siblings[index]
+        self.name_ids[index:end] = array.array(
+            "i", [self.get_name_id(new.names[x]) for x in new.name_ids]
+        )
+        self.starts[index:end] = new.starts
+        self.ends[index:end] = new.ends
+        self.values[index:end] = new.values
+        for name in self.ARRAYS[3:]:
+            getattr(self, name)[index:end] = links[name]
+        if amount != 0:
+            after = index + len(new.starts)
+            for items in [self.starts, self.ends]:
+                items[after:] = array.array("q", [x + amount for x in items[after:]])
+            parent = self.parents[index]
+            while parent != -1:
+                self.ends[parent] += amount
+                parent = self.parents[parent]
+
+    def get_subtree_end(self, index):
+        """
+        The index after the last node in the subtree at index, which is the
+        next sibling of the node or of its closest ancestor that has one.
+        """
+        while index != -1:
+            if self.next_siblings[index] != -1:
+                return self.next_siblings[index]
+            index = self.parents[index]
+        return len(self.starts)
+
+    def to_bytes(self):
+        """
+        Raises ValueError if a value is not of a type that marshal handles.
+        """
+        return marshal.dumps(
+            [self.names, self.values]
+            + [getattr(self, name).tobytes() for name in self.ARRAYS]
+        )
+
+    def to_node(self):
+        """
+        Build Node objects for the whole tree. Children come after their
+        parent, so going backwards all children are built before the parent.
+        """
+        nodes = [None] * len(self.starts)
+        for index in reversed(range(len(self.starts))):
+            children = []
+            child = self.first_children[index]
+            while child != -1:
+                children.append(nodes[child])
+                child = self.next_siblings[child]
+            nodes[index] = Node(
+                self.names[self.name_ids[index]],
+                self.starts[index],
+                self.ends[index],
+                self.values[index],
+                children,
+            )
+        return nodes[0]
+
+
+class CompactNode:
+    """
+    A node in a CompactTree. Views are created on demand, so they are
+    compared with == rather than is.
+    """
+
+    __slots__ = ["tree", "index"]
+
+    def __init__(self, tree, index):
+        self.tree = tree
+        self.index = index
+
+    def __eq__(self, other):
+        return (
+            isinstance(other, CompactNode)
+            and other.tree is self.tree
+            and other.index == self.index
+        )
+
+    def __hash__(self):
+        return hash((id(self.tree), self.index))
+
+    @property
+    def name(self):
+        return self.tree.names[self.tree.name_ids[self.index]]
+
+    @property
+    def range(self):
+        return Range(self.tree.starts[self.index], self.tree.ends[self.index])
+
+    @property
+    def value(self):
+        return self.tree.values[self.index]
+
+    @property
+    def parent(self):
+        return self.view(self.tree.parents[self.index])
+
+    @property
+    def children(self):
+        children = []
+        child = self.tree.first_children[self.index]
+        while child != -1:
+            children.append(CompactNode(self.tree, child))
+            child = self.tree.next_siblings[child]
+        return children
+
+    def view(self, index):
+        if index == -1:
+            return None
+        return CompactNode(self.tree, index)
+
+    def get_first_child(self):
+        return self.view(self.tree.first_children[self.index]) or self
+
+    def get_path(self):
+        path = []
+        index = self.index
+        while index != -1:
+            path.append(self.tree.names[self.tree.name_ids[index]])
+            index = self.tree.parents[index]
+        path.reverse()
+        return path
+
+    def get_depth(self):
+        return len(self.get_path()) - 1
+
+    def get_node_at(self, position):
+        """
+        The innermost node in my subtree that contains position, or None.
+        Nodes are stored in the order they start, so the last one that starts
+        at or before position is inside that node, or is that node.
+        """
+        tree = self.tree
+        if not tree.starts[self.index] <= position < tree.ends[self.index]:
+            return None
+        index = bisect.bisect_right(tree.starts, position, lo=self.index) - 1
+        while not tree.starts[index] <= position < tree.ends[index]:
+            index = tree.parents[index]
+        return CompactNode(tree, index)
+
+    def find_enclosing(self, range_, names):
+        """
+        Same as Node.find_enclosing. Every node that strictly contains range_
+        is an ancestor of the last node that starts before range_, so they
+        are found by walking up from it.
+        """
+        tree = self.tree
+        index = bisect.bisect_left(tree.starts, range_.start, lo=self.index) - 1
+        while index >= self.index:
+            if (
+                range_.end < tree.ends[index]
+                and tree.names[tree.name_ids[index]] in names
+            ):
+                return CompactNode(tree, index)
+            index = tree.parents[index]
+        return None
+
+    def replace(self, node):
+        self.tree.replace(self.index, node)
+
+    def get_next_sibling(self):
+        parent = self.tree.parents[self.index]
+        if parent == -1:
+            return self
+        sibling = self.tree.next_siblings[self.index]
+        if sibling == -1:
+            sibling = self.tree.first_children[parent]
+        return CompactNode(self.tree, sibling)
+
+    def get_previous_sibling(self):
+        parent = self.tree.parents[self.index]
+        if parent == -1:
+            return self
+        sibling = self.tree.previous_siblings[self.index]
+        if sibling == -1:
+            sibling = self.tree.last_children[parent]
+        return CompactNode(self.tree, sibling)
+
+    def tokenize(self, window=None):
+        """
+        The same walk as Node.tokenize, over the arrays of the tree.
+        """
+        tree = self.tree
+        starts = tree.starts
+        ends = tree.ends
+        if window is None:
+            window = self.range
+        stack = self.get_window_stack(window.start)
+        fresh = 0
+        cursor = starts[self.index]
+        while stack:
+            frame = stack[-1]
+            index, child = frame
+            if child != -1 and starts[child] < window.end:
+                frame[1] = tree.next_siblings[child]
+                stack.append([child, tree.first_children[child]])
+                continue
+            level = len(stack) - 1
+            start = cursor if level < fresh else starts[index]
+            if start != ends[index]:
+                tokens = [(index, start, ends[index])]
+                gap_end = start
+                for parent, _ in reversed(stack[fresh:level]):
+                    if starts[parent] != gap_end:
+                        tokens.append((parent, starts[parent], gap_end))
+                        gap_end = starts[parent]
+                if 0 < fresh <= level and cursor != gap_end:
+                    tokens.append((stack[fresh - 1][0], cursor, gap_end))
+                for owner, token_start, token_end in reversed(tokens):
+                    token_start = max(token_start, window.start)
+                    token_end = min(token_end, window.end)
+                    if token_start < token_end:
+                        node = CompactNode(tree, owner)
+                        yield (node.name, token_start, token_end, node)
+                cursor = ends[index]
+                fresh = level + 1
+            stack.pop()
+            fresh = min(fresh, len(stack))
+
+    def get_window_stack(self, position):
+        """
+        The stack that tokenize has when it first reaches a node that ends
+        after position. Everything before it ends at or before position, so
+        it is not visited, and the innermost node that contains position is
+        found with a binary search instead.
+        """
+        tree = self.tree
+        node = self.get_node_at(position)
+        if node is None:
+            if position < tree.starts[self.index]:
+                return [[self.index, tree.first_children[self.index]]]
+            return [[self.index, -1]]
+        chain = [node.index]
+        while chain[-1] != self.index:
+            chain.append(tree.parents[chain[-1]])
+        chain.reverse()
+        stack = [
+            [parent, tree.next_siblings[child]]
+            for parent, child in zip(chain, chain[1:])
+        ]
+        child = bisect.bisect_right(tree.starts, position, lo=node.index)
+        if child == len(tree.starts) or tree.parents[child] != node.index:
+            child = -1
+        stack.append([node.index, child])
+        return stack
+
     def as_list(self):
-        return [
-            self.name,
-            self.value,
-        ] + [child.as_list() for child in self.children]
+        tree = self.tree
+        result = [self.name, self.value]
+        stack = [(self.index, result)]
+        while stack:
+            index, items = stack.pop()
+            child = tree.first_children[index]
+            while child != -1:
+                child_items = [tree.names[tree.name_ids[child]], tree.values[child]]
+                items.append(child_items)
+                stack.append((child, child_items))
+                child = tree.next_siblings[child]
+        return result
 
-    def pprint(self, indentation=0):
-        print(f"{'  '*indentation}{self.name} {self.range}")
-        for child in self.children:
-            child.pprint(indentation + 1)
+    def pprint(self):
+        stack = [(self, 0)]
+        while stack:
+            node, indentation = stack.pop()
+            print(f"{'  '*indentation}{node.name} {node.range}")
+            stack.extend((child, indentation + 1) for child in reversed(node.children))
 
 
 class Range:
 
+    __slots__ = ["start", "end"]
+
     def __init__(self, start, end=None):
         self.start = start
         if end is None:
@@ -330,15 +1174,204 @@ class Range:
         return f"Range({self.start!r}, {self.end!r})"
 
 
-def compile_chain(grammars, source):
+class Edit:
+    """
+    Describes how the source that tree was parsed from changed: the text in
+    range_ was replaced with length new characters.
+    """
+
+    @classmethod
+    def between(cls, tree, old, new):
+        """
+        Describe the change from old to new as a single replaced region:
+
+        >>> edit = Edit.between(None, "[1,2,3]", "[1, 2, 3]")
+        >>> edit.range, edit.length
+        (Range(3, 5), 4)
+        """
+        size = min(len(old), len(new))
+        step = 4096
+        prefix = 0
+        while prefix < size and (
+            old[prefix : prefix + step] == new[prefix : prefix + step]
+        ):
+            prefix += step
+        prefix = min(prefix, size)
+        while prefix < size and old[prefix] == new[prefix]:
+            prefix += 1
+        limit = size - prefix
+        suffix = 0
+        while suffix < limit and (
+            old[max(0, len(old) - suffix - step) : len(old) - suffix]
+            == new[max(0, len(new) - suffix - step) : len(new) - suffix]
+        ):
+            suffix += step
+        suffix = min(suffix, limit)
+        while suffix < limit and (
+            old[len(old) - suffix - 1] == new[len(new) - suffix - 1]
+        ):
+            suffix += 1
+        return cls(tree, Range(prefix, len(old) - suffix), len(new) - prefix - suffix)
+
+    def __init__(self, tree, range_, length):
+        self.tree = tree
+        self.range = range_
+        self.length = length
+
+    def then(self, range_, length):
+        """
+        Combine with a following edit of the changed source into a single
+        edit of the original source:
+
+        >>> edit = Edit(None, Range(2, 4), 3).then(Range(6, 6), 1)
+        >>> edit.range, edit.length
+        (Range(2, 5), 5)
+        """
+        changed_end = self.range.start + self.length
+        start = min(range_.start, self.range.start)
+        end = max(range_.end, changed_end)
+        return Edit(
+            self.tree,
+            Range(start, self.range.end + end - changed_end),
+            end - start - range_.size + length,
+        )
+
+
+def reparse(edit, source, node_rules):
+    """
+    Re-run the grammar only over the innermost node surrounding the edit
+    and splice the result into the old tree. node_rules maps node names to
+    the rule that produces them.
+
+    Return the updated tree, or None if the edit can not be handled locally
+    and a full parse is needed.
+    """
+    node = edit.tree.find_enclosing(edit.range, node_rules)
+    if node is None:
+        return None
+    rule = node_rules[node.name]
+    end = node.range.end + edit.length - edit.range.size
+    stream = Stream(source, memoize.get(rule.split(".")[0]))
+    stream.index = node.range.start
+    result = rules[rule](stream)
+    if result is FAIL:
+        return None
+    new_node = result.eval(Runtime())
+    if (
+        stream.index != end
+        or new_node.name != node.name
+        or not new_node.range.is_same(Range(node.range.start, end))
+    ):
+        return None
+    node.replace(new_node)
+    return edit.tree
+
+
+def run_deep(fn, *args, **kwargs):
+    """
+    Call fn on a long-lived thread with a large stack, so that a grammar can
+    match input that nests more deeply than the interpreter stack allows.
+    Calls from several threads take turns, and a call made on that thread
+    runs directly:
+
+    >>> run_deep(sum, [1, 2, 3])
+    6
+    >>> run_deep(run_deep, len, "nested")
+    6
+
+    The first call starts the thread with a stack of DEEP_STACK_SIZE. The
+    recursion limit is raised to DEEP_RECURSION_LIMIT only while fn runs:
+
+    >>> limit = sys.getrecursionlimit()
+    >>> run_deep(sys.getrecursionlimit) == max(limit, DEEP_RECURSION_LIMIT)
+    True
+    >>> sys.getrecursionlimit() == limit
+    True
+
+    The limit is process wide, so code that recurses deeply should run
+    through run_deep rather than on threads with ordinary stacks. Matching
+    one level of nesting takes a few dozen frames, so input can nest some
+    tens of thousands of levels deep before matching it raises
+    RecursionError.
+    """
+    return deep_thread.call(fn, args, kwargs)
+
+
+class DeepThread:
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.requests = queue.Queue()
+        self.thread = None
+
+    def call(self, fn, args, kwargs):
+        if threading.current_thread() is self.thread:
+            return fn(*args, **kwargs)
+        self.start()
+        outcome = queue.Queue()
+        self.requests.put((fn, args, kwargs, outcome))
+        succeeded, value = outcome.get()
+        if not succeeded:
+            raise value
+        return value
+
+    def start(self):
+        with self.lock:
+            if self.thread is None:
+                stack_size = threading.stack_size(DEEP_STACK_SIZE)
+                try:
+                    self.thread = threading.Thread(target=self.run, daemon=True)
+                    self.thread.start()
+                finally:
+                    threading.stack_size(stack_size)
+
+    def run(self):
+        while True:
+            fn, args, kwargs, outcome = self.requests.get()
+            limit = sys.getrecursionlimit()
+            sys.setrecursionlimit(max(limit, DEEP_RECURSION_LIMIT))
+            try:
+                result = (True, fn(*args, **kwargs))
+            except BaseException as e:
+                result = (False, e)
+            finally:
+                sys.setrecursionlimit(limit)
+            outcome.put(result)
+            del fn, args, kwargs, outcome, result
+
+
+DEEP_STACK_SIZE = 512 * 1024 * 1024
+DEEP_RECURSION_LIMIT = 1000000
+deep_thread = DeepThread()
+
+
+def compile_chain(grammars, source, explain=True):
+    """
+    Run source through each grammar in turn. A failed match exits with the
+    error. With explain, a failed match is run again without predicted
+    choices so that the error names what every alternative expected. Callers
+    that only need to know that a match failed turn it off to avoid the
+    second run.
+    """
     import os
     import sys
     import pprint
 
     runtime = Runtime()
     for rule in grammars:
+        memo_size = memoize.get(rule.split(".")[0])
+        stream = Stream(source, memo_size)
+        result = rules[rule](stream)
+        if result is FAIL and explain:
+            # Predicted choices skip alternatives that can not match, and
+            # with them the errors those would record, so report the error
+            # from trying every alternative.
+            stream = Stream(source, memo_size, predict=False)
+            result = rules[rule](stream)
         try:
-            source = rules[rule].run(Stream(source)).eval(runtime)
+            if result is FAIL:
+                raise stream.get_error()
+            source = result.eval(runtime)
         except MatchError as e:
             marker = "<ERROR POSITION>"
             if os.isatty(sys.stderr.fileno()):